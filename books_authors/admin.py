@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Author, Book
+from .models import Author, Book, Genre, Job, Language
 
 
 class BookInline(admin.TabularInline):
@@ -30,3 +30,18 @@ class BookAdmin(admin.ModelAdmin):
     exclude = ("authors",)
     search_fields = ("title", "isbn", "authors__last_name", "authors__first_name")
     inlines = [AuthorInline]
+
+
+@admin.register(Genre, Language)
+class LookupAdmin(admin.ModelAdmin):
+    list_display = ("name",)
+    search_fields = ("name",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "progress", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    exclude = ("params",)
+    readonly_fields = ("kind", "status", "progress", "result", "error", "attempts", "worker", "created_by",
+                       "created_at", "started_at", "heartbeat_at", "finished_at")
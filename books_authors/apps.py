@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class LibrosAutoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'books_authors'
-    verbose_name = 'Libros y Autores'
\ No newline at end of file
+    verbose_name = 'Libros y Autores'
+
+    def ready(self):
+        from . import signals  # noqa: F401
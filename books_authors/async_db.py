@@ -0,0 +1,33 @@
+"""
+Consultas concurrentes para las vistas asíncronas (books_authors.async_views).
+
+El ORM asíncrono de Django ejecuta cada consulta en un único hilo compartido
+(``sync_to_async(thread_sensitive=True)``), así que dos ``await`` seguidos nunca
+se solapan. ``gather_queries`` ejecuta consultas independientes, como el
+``COUNT(*)`` y la página de un listado, en hilos del pool con su propia conexión
+y las espera con ``asyncio.gather``. Cada hilo cierra su conexión al terminar
+según ``CONN_MAX_AGE`` (``close_old_connections``).
+
+Con ``ASYNC_PARALLEL_QUERIES`` desactivado las consultas se ejecutan una tras
+otra en el hilo del ORM; es lo que necesitan las pruebas dentro de una
+transacción, que no es visible desde otras conexiones.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+def _run_in_worker(func):
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def gather_queries(*funcs):
+    """Ejecuta las funciones síncronas ``funcs`` (consultas) y devuelve sus resultados en orden."""
+    if not settings.ASYNC_PARALLEL_QUERIES or len(funcs) < 2:
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(*(sync_to_async(_run_in_worker, thread_sensitive=False)(func) for func in funcs))
@@ -0,0 +1,159 @@
+"""
+Endpoints de lectura asíncronos para servir con ASGI (core.asgi, p. ej. uvicorn).
+
+Responden lo mismo que las acciones de BookViewSet y AuthorViewSet (mismos
+filtros, paginación y serializadores de solo lectura) pero sin ocupar un hilo
+por request: las filas se leen con el ORM asíncrono (``aget``, ``acount``,
+iteración asíncrona) y en los listados por número de página el ``COUNT(*)`` y
+la página se consultan a la vez (KeysetPagination.apaginate_queryset).
+
+Los filtros se reutilizan instanciando el viewset correspondiente, que solo
+construye el queryset. Estos endpoints no usan la caché de respuestas de
+books_authors.cache.
+
+Rutas (bajo /api/async/):
+    books/, books/<pk>/, books/advance_search/
+    authors/, authors/<pk>/, authors/books_statistics/
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+
+from core.authentication import CachedJWTAuthentication
+
+from .renderers import FastJSONRenderer
+from .search import has_trigram, is_postgresql
+from .views import AuthorViewSet, BookViewSet
+
+_jwt_authentication = CachedJWTAuthentication()
+_renderer = FastJSONRenderer()
+
+
+async def authenticate(request):
+    """
+    Autentica con el JWT de ``Authorization: Bearer`` o, si no viene, con la sesión
+    (igual que DEFAULT_AUTHENTICATION_CLASSES). Devuelve None si no hay usuario.
+
+    Si el usuario del token está en la caché de core.authentication no se cambia de hilo.
+    """
+    header = _jwt_authentication.get_header(request)
+    if header is not None:
+        raw_token = _jwt_authentication.get_raw_token(header)
+        if raw_token is not None:
+            validated_token = _jwt_authentication.get_validated_token(raw_token)
+            user = _jwt_authentication.get_cached_user(validated_token)
+            if user is None:
+                user = await sync_to_async(_jwt_authentication.get_user)(validated_token)
+            return user
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(_renderer.render(data), status=status_code, headers=headers,
+                        content_type=_renderer.media_type)
+
+
+def async_read_view(view):
+    """
+    Decorador para las vistas de este módulo: solo GET/HEAD, exige un usuario
+    autenticado y convierte las excepciones de DRF en respuestas JSON.
+
+    La vista recibe un ``rest_framework.request.Request`` con el usuario ya asignado.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method not in ('GET', 'HEAD'):
+                raise exceptions.MethodNotAllowed(request.method)
+            user = await authenticate(request)
+            if user is None:
+                raise exceptions.NotAuthenticated()
+            drf_request = Request(request)
+            drf_request.user = user
+            return json_response(await view(drf_request, *args, **kwargs))
+        except exceptions.APIException as exc:
+            headers = {}
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                headers['WWW-Authenticate'] = _jwt_authentication.authenticate_header(request)
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return json_response(detail, exc.status_code, headers)
+
+    return wrapper
+
+
+async def get_view(viewset_class, request, action, **kwargs):
+    """Instancia el viewset como lo haría ``as_view()`` para reutilizar sus filtros y paginación."""
+    view = viewset_class(request=request, args=(), kwargs=kwargs, action=action, format_kwarg=None)
+    view.headers = {}
+    if request.query_params.get('search') and is_postgresql(view.queryset.db):
+        # BookSearchFilter consulta una vez si pg_trgm está instalado.
+        await sync_to_async(has_trigram)(view.queryset.db)
+    return view
+
+
+async def paginated_data(view, queryset):
+    """Equivalente asíncrono de FastReadMixin.paginated_response (devuelve los datos)."""
+    serializer = view.get_read_serializer()
+    rows = serializer.values(queryset, *view.keyset_fields())
+    page = await view.paginator.apaginate_queryset(rows, view.request, view=view)
+    if page is None:
+        return await serializer.ato_representation([row async for row in rows])
+    return view.paginator.get_paginated_response(await serializer.ato_representation(page)).data
+
+
+async def detail_data(view, pk):
+    """Equivalente asíncrono de FastReadMixin.retrieve."""
+    serializer = view.get_read_serializer()
+    queryset = serializer.values(view.filter_queryset(view.get_queryset()))
+    try:
+        row = await queryset.aget(pk=pk)
+    except (queryset.model.DoesNotExist, DjangoValidationError, TypeError, ValueError):
+        raise exceptions.NotFound()
+    return (await serializer.ato_representation([row]))[0]
+
+
+@async_read_view
+async def book_list(request):
+    view = await get_view(BookViewSet, request, 'list')
+    return await paginated_data(view, view.filter_queryset(view.get_queryset()))
+
+
+@async_read_view
+async def book_detail(request, pk):
+    view = await get_view(BookViewSet, request, 'retrieve', pk=pk)
+    return await detail_data(view, pk)
+
+
+@async_read_view
+async def book_advance_search(request):
+    view = await get_view(BookViewSet, request, 'advance_search')
+    return await paginated_data(view, view.advance_search_queryset(request))
+
+
+@async_read_view
+async def author_list(request):
+    view = await get_view(AuthorViewSet, request, 'list')
+    return await paginated_data(view, view.filter_queryset(view.get_queryset()))
+
+
+@async_read_view
+async def author_detail(request, pk):
+    view = await get_view(AuthorViewSet, request, 'retrieve', pk=pk)
+    return await detail_data(view, pk)
+
+
+@async_read_view
+async def author_books_statistics(request):
+    view = await get_view(AuthorViewSet, request, 'books_statistics')
+    authors = view.books_statistics_queryset()
+    page = await view.paginator.apaginate_queryset(authors, request, view=view)
+    rows = page if page is not None else [author async for author in authors]
+    result = [view.books_statistics_row(author) for author in rows]
+    if page is not None:
+        return view.paginator.get_paginated_response(result).data
+    return result
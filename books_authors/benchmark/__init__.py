@@ -0,0 +1,17 @@
+"""
+Benchmarks reproducibles de la API de libros y autores.
+
+- ``catalog``: catálogo sintético determinista (``generate_catalog``).
+- ``endpoints``: latencia, consultas SQL y memoria de cada endpoint de lectura
+  con el cliente de pruebas de Django o contra un gunicorn local (``run_benchmark``).
+- ``load``: endpoints síncronos bajo gunicorn (WSGI) frente a los asíncronos bajo
+  uvicorn (ASGI) a distintos niveles de concurrencia (``load_test``).
+- ``connections``: configuraciones de conexiones a PostgreSQL (``connection_benchmark``).
+- ``serialization``: serializadores y renderers rápidos frente a los de DRF.
+- ``results``: percentiles, resúmenes y comparación con una línea base.
+- ``servers``: servidor local, cliente HTTP autenticado y memoria de sus procesos.
+
+Los comandos de ``manage.py`` (generate_catalog, run_benchmark, load_test,
+benchmark_connections, benchmark_serializers, benchmark_renderers) solo
+interpretan argumentos e imprimen los resultados de estos módulos.
+"""
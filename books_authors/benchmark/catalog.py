@@ -0,0 +1,143 @@
+"""
+Catálogo sintético determinista (mismos datos para la misma semilla) con una
+distribución realista de autores por libro: la mayoría de los libros tiene un
+autor, algunos varios, y unos pocos autores concentran muchos libros.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from .. import cache
+from ..facets import rebuild_facet_counts
+from ..models import Author, Book, Genre, Language, lookup_key
+from ..search import update_search_vectors
+from ..stats import rebuild_author_stats
+
+# Tamaños predefinidos: (autores, libros).
+PRESETS = {
+    '10k': (2_000, 10_000),
+    '100k': (20_000, 100_000),
+    '1m': (200_000, 1_000_000),
+}
+
+# Cantidad de autores por libro y su peso relativo.
+AUTHORS_PER_BOOK = ((1, 70), (2, 20), (3, 7), (4, 2), (5, 1))
+GENRES = ('Novela', 'Cuento', 'Poesía', 'Ensayo', 'Ciencia ficción', 'Fantasía', 'Policial', 'Historia',
+          'Biografía', 'Teatro', 'Infantil', 'Romance')
+LANGUAGES = (('Español', 60), ('Inglés', 25), ('Portugués', 8), ('Francés', 5), ('Italiano', 2))
+FIRST_NAMES = ('Ana', 'Carlos', 'Lucía', 'Jorge', 'María', 'Pedro', 'Julia', 'Andrés', 'Elena', 'Diego', 'Sofía',
+               'Martín', 'Laura', 'Pablo', 'Carmen', 'Tomás', 'Isabel', 'Miguel', 'Rosa', 'Gabriel')
+LAST_NAMES = ('García', 'Rodríguez', 'Martínez', 'López', 'González', 'Pérez', 'Sánchez', 'Romero', 'Torres',
+              'Flores', 'Rivera', 'Gómez', 'Díaz', 'Reyes', 'Morales', 'Ortiz', 'Castillo', 'Vargas', 'Herrera',
+              'Medina')
+WORDS = ('sombra', 'río', 'ciudad', 'memoria', 'noche', 'viento', 'casa', 'silencio', 'mar', 'tiempo', 'fuego',
+         'jardín', 'camino', 'espejo', 'invierno', 'luz', 'tierra', 'sueño', 'puerta', 'isla', 'voz', 'bosque',
+         'ceniza', 'laberinto', 'verano', 'piedra', 'lluvia', 'desierto', 'frontera', 'olvido')
+
+# Prefijo de los ISBN sintéticos; los ids se derivan del ISBN y del índice del autor.
+SYNTHETIC_ISBN_PREFIX = '979'
+SYNTHETIC_NAMESPACE = uuid.UUID('6f1d3c1e-3a57-4b8e-9a53-1f0c2b7d9e41')
+
+
+def synthetic_author_id(index):
+    return uuid.uuid5(SYNTHETIC_NAMESPACE, f'author-{index}')
+
+
+def synthetic_isbn(index):
+    return f'{SYNTHETIC_ISBN_PREFIX}{index:010d}'
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _author_indexes(rng, total_authors):
+    """Elige los autores de un libro; los índices bajos son más probables (autores prolíficos)."""
+    count = min(_weighted(rng, AUTHORS_PER_BOOK), total_authors)
+    indexes = set()
+    while len(indexes) < count:
+        indexes.add(int(total_authors * rng.random() ** 3))
+    return sorted(indexes)
+
+
+def _build_author(rng, index):
+    birth = date(1900, 1, 1) + timedelta(days=rng.randrange(365 * 100)) if rng.random() < 0.9 else None
+    return Author(
+        id=synthetic_author_id(index),
+        first_name=rng.choice(FIRST_NAMES),
+        last_name=f'{rng.choice(LAST_NAMES)} {index}',
+        birth_date=birth,
+        bio=' '.join(rng.choices(WORDS, k=rng.randint(5, 30))),
+    )
+
+
+def _build_book(rng, index, genres, languages):
+    isbn = synthetic_isbn(index)
+    published = date(1900, 1, 1) + timedelta(days=rng.randrange(365 * 125)) if rng.random() < 0.9 else None
+    return Book(
+        id=uuid.uuid5(SYNTHETIC_NAMESPACE, isbn),
+        title=' '.join(rng.choices(WORDS, k=rng.randint(1, 5))).capitalize(),
+        isbn=isbn,
+        published_date=published,
+        pages=rng.randint(60, 1200),
+        price=Decimal(rng.randint(500, 8000)) / 100,
+        language=languages[lookup_key(_weighted(rng, LANGUAGES))],
+        literary_genre=genres[lookup_key(rng.choice(GENRES))],
+        summary=' '.join(rng.choices(WORDS, k=rng.randint(10, 60))),
+    )
+
+
+def generate_catalog(authors, books, seed=42, batch_size=5000, progress=None):
+    """
+    Crea ``authors`` autores y ``books`` libros sintéticos.
+
+    Es idempotente: los ids se derivan de los índices, así que volver a
+    ejecutarlo con los mismos parámetros no duplica filas. Las filas se
+    escriben por lotes con ``bulk_create`` y al final se reconstruyen
+    AuthorStats, los conteos de facetas y los vectores de búsqueda.
+
+    Args:
+        authors: cantidad de autores.
+        books: cantidad de libros.
+        seed: semilla del generador pseudoaleatorio.
+        batch_size: filas por lote.
+        progress: función opcional que recibe (etiqueta, procesados, total).
+
+    Returns:
+        dict: ``{'authors', 'books', 'links'}`` con las filas generadas.
+    """
+    rng = random.Random(seed)
+    through = Book.authors.through
+    links_total = 0
+    genres = Genre.objects.resolve_names(GENRES)
+    languages = Language.objects.resolve_names(name for name, _ in LANGUAGES)
+
+    for start in range(0, authors, batch_size):
+        batch = [_build_author(rng, index) for index in range(start, min(start + batch_size, authors))]
+        Author.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+        if progress:
+            progress('autores', start + len(batch), authors)
+
+    for start in range(0, books, batch_size):
+        batch, links = [], []
+        for index in range(start, min(start + batch_size, books)):
+            book = _build_book(rng, index, genres, languages)
+            batch.append(book)
+            links.extend(through(book_id=book.id, author_id=synthetic_author_id(author_index))
+                         for author_index in _author_indexes(rng, authors))
+        with transaction.atomic():
+            Book.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+            through.objects.bulk_create(links, batch_size=batch_size, ignore_conflicts=True)
+        links_total += len(links)
+        if progress:
+            progress('libros', start + len(batch), books)
+
+    rebuild_author_stats()
+    rebuild_facet_counts()
+    update_search_vectors()
+    cache.invalidate(cache.BOOKS, cache.AUTHORS, cache.AUTHOR_STATS)
+    return {'authors': authors, 'books': books, 'links': links_total}
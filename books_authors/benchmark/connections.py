@@ -0,0 +1,69 @@
+"""
+Comparación de las configuraciones de conexiones a PostgreSQL (por request,
+persistentes y pool) contra un servidor local.
+"""
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.db import connection
+from django.utils import timezone
+
+from ..models import Book
+from .endpoints import benchmark_endpoints
+from .servers import http_fetcher, local_server, measure, wait_until_ready
+
+# Configuraciones de conexión a PostgreSQL comparadas por connection_benchmark (variables de core.settings).
+CONNECTION_MODES = {
+    'per-request': {'POSTGRES_CONN_MAX_AGE': '0', 'POSTGRES_CONN_HEALTH_CHECKS': 'False', 'POSTGRES_POOL': 'False'},
+    'persistent': {'POSTGRES_CONN_MAX_AGE': '600', 'POSTGRES_CONN_HEALTH_CHECKS': 'True', 'POSTGRES_POOL': 'False'},
+    'pool': {'POSTGRES_CONN_MAX_AGE': '0', 'POSTGRES_CONN_HEALTH_CHECKS': 'True', 'POSTGRES_POOL': 'True'},
+}
+
+
+def connection_benchmark(modes=tuple(CONNECTION_MODES), requests=200, warmup=2, server='gunicorn', workers=2,
+                         threads=1, concurrency=4, only=None, timeout=60):
+    """
+    Mide los endpoints de lectura contra un servidor local con cada configuración
+    de conexiones de ``CONNECTION_MODES``: una conexión nueva por request,
+    conexiones persistentes con verificación de salud, y pool de psycopg.
+
+    Solo tiene sentido con PostgreSQL, que es donde abrir una conexión cuesta.
+
+    Returns:
+        dict: ``meta`` y, por modo y endpoint, el resumen de latencias y throughput.
+    """
+    if connection.vendor != 'postgresql':
+        raise ValueError('La comparación de conexiones requiere PostgreSQL.')
+    unknown = set(modes) - set(CONNECTION_MODES)
+    if unknown:
+        raise ValueError(f'Modos desconocidos: {", ".join(sorted(unknown))}')
+    endpoints = benchmark_endpoints()
+    if only:
+        endpoints = [(name, url) for name, url in endpoints if name in only]
+    if not endpoints:
+        raise ValueError('No hay endpoints para medir.')
+
+    results = {}
+    for mode in modes:
+        with local_server(server, workers, False, threads, CONNECTION_MODES[mode]) as (base_url, process):
+            fetch = http_fetcher(base_url, timeout)
+            wait_until_ready(fetch, endpoints[0][1], process)
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results[mode] = {name: measure(pool, fetch, url, requests, warmup, concurrency)
+                                 for name, url in endpoints}
+    return {
+        'meta': {
+            'server': server,
+            'workers': workers,
+            'threads': threads,
+            'concurrency': concurrency,
+            'requests': requests,
+            'books': Book.objects.count(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'created_at': timezone.now().isoformat(),
+        },
+        'modes': results,
+    }
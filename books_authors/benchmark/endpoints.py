@@ -0,0 +1,176 @@
+"""
+Benchmark de los endpoints de lectura de BookViewSet y AuthorViewSet.
+
+``run_benchmark`` los recorre con el cliente de pruebas de Django o contra un
+gunicorn local y mide latencia (p50/p95/p99), consultas SQL por request y
+memoria por endpoint. Los resultados se guardan en JSON y se comparan con una
+línea base con ``results.compare_results``.
+"""
+import platform
+import resource
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Author, AuthorStats, Book
+from .results import summarize
+from .servers import (access_token, consume, http_fetcher, local_server, measure, peak_rss_kb, reset_peak_rss,
+                      wait_until_ready)
+
+
+def benchmark_endpoints():
+    """
+    Devuelve ``[(nombre, url), ...]`` con una URL por endpoint de lectura,
+    usando parámetros tomados de los datos existentes.
+    """
+    book = Book.objects.defer('search_vector').order_by('isbn').first()
+    # El autor con más libros, que es el detalle más costoso.
+    author = AuthorStats.objects.order_by('-total_books').values_list('author_id', flat=True).first()
+    if book is None or author is None:
+        raise ValueError('Se necesitan libros y autores cargados para el benchmark (ver generate_catalog).')
+    genre = (Book.objects.values('literary_genre__name').annotate(n=Count('id')).order_by('-n')
+             .values_list('literary_genre__name', flat=True).first())
+    language = (Book.objects.values('language__name').annotate(n=Count('id')).order_by('-n')
+                .values_list('language__name', flat=True).first())
+    word = max(book.title.split(), key=len)
+    deep_page = max(min(20, Book.objects.count() // settings.REST_FRAMEWORK['PAGE_SIZE']), 1)
+    # Las exportaciones se limitan a los ~1000 registros modificados más recientemente.
+    book_watermark = Book.objects.order_by('-updated_at').values_list('updated_at', flat=True)[1000:1001].first()
+    author_watermark = (Author.objects.order_by('-updated_at').values_list('updated_at', flat=True)[1000:1001]
+                        .first())
+
+    def url(name, params=None, **kwargs):
+        path = reverse(name, kwargs=kwargs or None)
+        return f'{path}?{urlencode(params)}' if params else path
+
+    return [
+        ('books list', url('book-list')),
+        ('books list deep page', url('book-list', {'page': deep_page})),
+        ('books list cursor', url('book-list', {'pagination': 'cursor', 'page_size': 50})),
+        ('books search', url('book-list', {'search': word})),
+        ('books filter literary_genre', url('book-list', {'literary_genre': genre})),
+        ('books retrieve', url('book-detail', pk=book.pk)),
+        ('books more_than_one_author', url('book-more-than-one-author')),
+        ('books price_range', url('book-price-range', {'min_price': '10', 'max_price': '20'})),
+        ('books advance_search', url('book-advance-search', {'genre': genre, 'min_pages': 300, 'language': language})),
+        ('books export', url('book-export', {'updated_since': book_watermark.isoformat()} if book_watermark else None)),
+        ('authors list', url('author-list')),
+        ('authors list cursor', url('author-list', {'pagination': 'cursor', 'page_size': 50})),
+        ('authors retrieve', url('author-detail', pk=author)),
+        ('authors more_books_order', url('author-more-books-order')),
+        ('authors books_statistics', url('author-books-statistics')),
+        ('authors export', url('author-export',
+                               {'updated_since': author_watermark.isoformat()} if author_watermark else None)),
+    ]
+
+
+def run_client(endpoints, requests, warmup=2, use_cache=False):
+    """
+    Ejecuta cada endpoint ``requests`` veces en proceso con el cliente de pruebas
+    de Django. ``peak_alloc_kb`` es el pico de memoria asignada por Python
+    (tracemalloc) durante un request del endpoint.
+    """
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {access_token()}')
+    overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+    if not use_cache:
+        overrides['API_CACHE_TIMEOUT'] = 0
+    results = {}
+    with override_settings(**overrides):
+        for name, url in endpoints:
+            for _ in range(warmup):
+                consume(client.get(url))
+            latencies, queries, statuses = [], [], []
+            started = time.perf_counter()
+            for _ in range(requests):
+                with CaptureQueriesContext(connection) as ctx:
+                    request_started = time.perf_counter()
+                    response = client.get(url)
+                    consume(response)
+                    latencies.append(time.perf_counter() - request_started)
+                queries.append(len(ctx.captured_queries))
+                statuses.append(response.status_code)
+            results[name] = summarize(latencies, queries, statuses, time.perf_counter() - started)
+            # Un request más, fuera de la medición de latencia: tracemalloc la haría más lenta.
+            tracemalloc.start()
+            consume(client.get(url))
+            results[name]['peak_alloc_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+    return results
+
+
+def run_gunicorn(endpoints, requests, warmup=2, use_cache=False, workers=2, concurrency=1, timeout=60):
+    """
+    Levanta ``gunicorn core.wsgi`` en un puerto local y ejecuta cada endpoint
+    ``requests`` veces por HTTP con ``concurrency`` clientes simultáneos.
+
+    Las consultas SQL ocurren en otro proceso, así que no se reportan.
+    ``peak_rss_kb`` es el pico de memoria residente de gunicorn y sus workers
+    mientras se mide el endpoint (solo Linux).
+    """
+    with local_server('gunicorn', workers, use_cache) as (base_url, process):
+        fetch = http_fetcher(base_url, timeout)
+        wait_until_ready(fetch, endpoints[0][1], process)
+        results = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for name, url in endpoints:
+                reset_peak_rss(process.pid)
+                results[name] = measure(pool, fetch, url, requests, warmup, concurrency)
+                results[name]['peak_rss_kb'] = peak_rss_kb(process.pid)
+    return results
+
+
+def run_benchmark(target='client', requests=50, warmup=2, use_cache=False, only=None, **options):
+    """
+    Ejecuta el benchmark y devuelve el resultado listo para serializar a JSON.
+
+    Args:
+        target: ``'client'`` (cliente de pruebas en proceso) o ``'gunicorn'``.
+        requests: requests medidos por endpoint.
+        warmup: requests de calentamiento por endpoint (no se miden).
+        use_cache: si es False se desactiva la caché de respuestas.
+        only: nombres de endpoints a ejecutar (todos si es None).
+        options: ``workers``, ``concurrency`` y ``timeout`` para gunicorn.
+    """
+    endpoints = benchmark_endpoints()
+    if only:
+        endpoints = [(name, url) for name, url in endpoints if name in only]
+    if target == 'client':
+        results = run_client(endpoints, requests, warmup, use_cache)
+    elif target == 'gunicorn':
+        results = run_gunicorn(endpoints, requests, warmup, use_cache, **options)
+    else:
+        raise ValueError(f'Destino desconocido: {target}')
+
+    if target == 'client':
+        # En proceso: pico de todo el proceso (ru_maxrss está en KB en Linux).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    else:
+        peaks = [result['peak_rss_kb'] for result in results.values() if result['peak_rss_kb'] is not None]
+        peak = max(peaks) if peaks else None
+    return {
+        'meta': {
+            'target': target,
+            'requests': requests,
+            'warmup': warmup,
+            'cache': use_cache,
+            **options,
+            'authors': Author.objects.count(),
+            'books': Book.objects.count(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'created_at': timezone.now().isoformat(),
+        },
+        'peak_rss_kb': peak,
+        'endpoints': results,
+    }
@@ -0,0 +1,90 @@
+"""
+Prueba de carga: endpoints síncronos bajo gunicorn (WSGI) frente a sus
+versiones asíncronas (books_authors.async_views) bajo uvicorn (ASGI).
+"""
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from ..models import Author, Book
+from .endpoints import benchmark_endpoints
+from .servers import http_fetcher, local_server, measure, peak_rss_kb, wait_until_ready
+
+# Rutas síncronas (router de DRF) con su versión asíncrona en books_authors.async_views.
+ASYNC_ROUTES = {
+    'book-list': 'async-book-list',
+    'book-detail': 'async-book-detail',
+    'book-advance-search': 'async-book-advance-search',
+    'author-list': 'async-author-list',
+    'author-detail': 'async-author-detail',
+    'author-books-statistics': 'async-author-books-statistics',
+}
+
+
+def load_test_endpoints():
+    """``[(nombre, url síncrona, url asíncrona), ...]`` de los endpoints del benchmark con versión asíncrona."""
+    endpoints = []
+    for name, url in benchmark_endpoints():
+        path, _, query = url.partition('?')
+        match = resolve(path)
+        if match.url_name not in ASYNC_ROUTES:
+            continue
+        async_path = reverse(ASYNC_ROUTES[match.url_name], kwargs=match.kwargs or None)
+        endpoints.append((name, url, f'{async_path}?{query}' if query else async_path))
+    return endpoints
+
+
+def load_test(levels=(1, 8, 32, 64), requests=200, warmup=2, workers=2, threads=1, use_cache=False, only=None,
+              timeout=60):
+    """
+    Compara los endpoints síncronos bajo gunicorn (WSGI) con sus versiones
+    asíncronas bajo uvicorn (ASGI) con la misma cantidad de workers, para cada
+    nivel de concurrencia de ``levels`` (clientes simultáneos).
+
+    Returns:
+        dict: ``meta`` y, por endpoint y nivel, el resumen de ``wsgi`` y ``asgi``
+        (latencias, throughput y status).
+    """
+    endpoints = load_test_endpoints()
+    if only:
+        endpoints = [endpoint for endpoint in endpoints if endpoint[0] in only]
+    if not endpoints:
+        raise ValueError('No hay endpoints para la prueba de carga.')
+
+    results = {name: {str(level): {} for level in levels} for name, _, _ in endpoints}
+    peaks = {}
+    for mode, server, index in (('wsgi', 'gunicorn', 1), ('asgi', 'uvicorn', 2)):
+        with local_server(server, workers, use_cache, threads) as (base_url, process):
+            fetch = http_fetcher(base_url, timeout)
+            wait_until_ready(fetch, endpoints[0][index], process)
+            for level in levels:
+                with ThreadPoolExecutor(max_workers=level) as pool:
+                    for endpoint in endpoints:
+                        results[endpoint[0]][str(level)][mode] = measure(
+                            pool, fetch, endpoint[index], max(requests, level), warmup, level)
+            peaks[mode] = peak_rss_kb(process.pid)
+
+    return {
+        'meta': {
+            'levels': list(levels),
+            'requests': requests,
+            'warmup': warmup,
+            'workers': workers,
+            'threads': threads,
+            'cache': use_cache,
+            'authors': Author.objects.count(),
+            'books': Book.objects.count(),
+            'database': connection.vendor,
+            'async_parallel_queries': settings.ASYNC_PARALLEL_QUERIES,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'created_at': timezone.now().isoformat(),
+        },
+        'peak_rss_kb': peaks,
+        'endpoints': results,
+    }
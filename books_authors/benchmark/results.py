@@ -0,0 +1,56 @@
+"""Resumen de latencias y comparación de resultados de run_benchmark con una línea base."""
+import json
+import math
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano de una lista de valores."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies, queries=None, statuses=None, elapsed=None):
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        'requests': len(latencies_ms),
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 3),
+        'max_ms': round(max(latencies_ms), 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        'throughput_rps': round(len(latencies_ms) / elapsed, 1) if elapsed else None,
+        'statuses': sorted(set(statuses or [])),
+    }
+
+
+def compare_results(current, baseline, tolerance=0.2, metric='p95_ms'):
+    """
+    Compara dos resultados de run_benchmark.
+
+    Un endpoint empeora si ``metric`` supera a la línea base en más de
+    ``tolerance`` (proporción) o si hace más consultas SQL por request.
+
+    Returns:
+        list: ``[{'endpoint', 'metric', 'baseline', 'current', 'change'}, ...]`` con las regresiones.
+    """
+    regressions = []
+    for name, result in current['endpoints'].items():
+        reference = baseline['endpoints'].get(name)
+        if not reference:
+            continue
+        if reference.get(metric) and result[metric] > reference[metric] * (1 + tolerance):
+            regressions.append({'endpoint': name, 'metric': metric, 'baseline': reference[metric],
+                                'current': result[metric], 'change': result[metric] / reference[metric] - 1})
+        queries, reference_queries = result.get('queries_per_request'), reference.get('queries_per_request')
+        if queries is not None and reference_queries is not None and queries > reference_queries:
+            regressions.append({'endpoint': name, 'metric': 'queries_per_request', 'baseline': reference_queries,
+                                'current': queries, 'change': queries - reference_queries})
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as results:
+        return json.load(results)
@@ -0,0 +1,109 @@
+"""
+Costo de serializar y codificar respuestas: serializadores de DRF frente a los
+de solo lectura (books_authors.fast_serializers) y JSONRenderer frente a
+FastJSONRenderer.
+"""
+import time
+
+from ..models import Author, Book
+
+
+def serializer_benchmark(rows=1000, repeat=5):
+    """
+    Compara BookSerializer/AuthorSerializer con los serializadores de solo
+    lectura sobre las primeras ``rows`` filas (consulta + serialización).
+
+    Returns:
+        dict: por modelo, microsegundos por fila de cada camino (mejor de
+        ``repeat`` ejecuciones), la aceleración y si el JSON es idéntico.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from ..fast_serializers import FastAuthorSerializer, FastBookSerializer, get_fast_serializer
+    from ..serializers import AuthorSerializer, BookSerializer
+
+    cases = {
+        'books': (Book.objects.defer('search_vector').prefetch_related('authors').order_by('title', 'id'),
+                  BookSerializer, FastBookSerializer),
+        'authors': (Author.objects.order_by('last_name', 'first_name', 'id'), AuthorSerializer,
+                    FastAuthorSerializer),
+    }
+    results = {}
+    for name, (queryset, serializer_class, fast_class) in cases.items():
+        fast = get_fast_serializer(fast_class)
+
+        def drf_path():
+            return serializer_class(list(queryset[:rows]), many=True).data
+
+        def fast_path():
+            return fast.to_representation(fast.values(queryset)[:rows])
+
+        timings = {}
+        for label, run in (('drf', drf_path), ('fast', fast_path)):
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                data = run()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = (best, data)
+        count = max(len(timings['drf'][1]), 1)
+        drf_time, fast_time = timings['drf'][0], timings['fast'][0]
+        results[name] = {
+            'rows': len(timings['drf'][1]),
+            'drf_us_per_row': round(drf_time / count * 1e6, 2),
+            'fast_us_per_row': round(fast_time / count * 1e6, 2),
+            'speedup': round(drf_time / fast_time, 2) if fast_time else None,
+            'identical': JSONRenderer().render(timings['drf'][1]) == JSONRenderer().render(timings['fast'][1]),
+        }
+    return results
+
+
+def renderer_benchmark(rows=1000, repeat=5):
+    """
+    Compara el JSONRenderer de DRF con FastJSONRenderer sobre ``rows`` filas:
+    una página serializada de libros y filas crudas de ``.values()`` (UUID,
+    Decimal, fechas).
+
+    Returns:
+        dict: por carga, milisegundos de codificación (mejor de ``repeat``),
+        pico de memoria asignada (tracemalloc), tamaño y si la salida es idéntica.
+    """
+    import tracemalloc
+
+    from rest_framework.renderers import JSONRenderer
+
+    from ..fast_serializers import FastBookSerializer, get_fast_serializer
+    from ..renderers import FastJSONRenderer, orjson
+
+    fast = get_fast_serializer(FastBookSerializer)
+    queryset = Book.objects.order_by('title', 'id')
+    page = fast.to_representation(fast.values(queryset)[:rows])
+    payloads = {
+        'books page': {'count': len(page), 'next': None, 'previous': None, 'results': page},
+        'books values': list(queryset.values('id', 'title', 'isbn', 'published_date', 'pages', 'price',
+                                             'created_at', 'updated_at')[:rows]),
+    }
+    renderers = {'drf': JSONRenderer(), 'fast': FastJSONRenderer()}
+    results = {}
+    for name, payload in payloads.items():
+        result = {'rows': rows if name == 'books values' else len(page), 'orjson': orjson is not None}
+        outputs = {}
+        for label, renderer in renderers.items():
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs[label] = renderer.render(payload, 'application/json')
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            tracemalloc.start()
+            renderer.render(payload, 'application/json')
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            result[f'{label}_ms'] = round(best * 1000, 3)
+            result[f'{label}_peak_kb'] = round(peak / 1024, 1)
+        result['bytes'] = len(outputs['fast'])
+        result['speedup'] = round(result['drf_ms'] / result['fast_ms'], 2) if result['fast_ms'] else None
+        result['identical'] = outputs['drf'] == outputs['fast']
+        results[name] = result
+    return results
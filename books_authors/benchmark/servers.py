@@ -0,0 +1,142 @@
+"""
+Servidor local (gunicorn o uvicorn) para los benchmarks por HTTP, cliente
+autenticado con el token del benchmark y memoria residente de sus procesos.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .results import summarize
+
+
+def access_token():
+    """Token JWT de un usuario dedicado al benchmark, para medir también la autenticación."""
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user, _ = get_user_model().objects.get_or_create(username='benchmark', defaults={'is_active': True})
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def consume(response):
+    if getattr(response, 'streaming', False):
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _process_tree(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as children:
+        return [pid, *map(int, children.read().split())]
+
+
+def reset_peak_rss(pid):
+    """
+    Reinicia VmHWM del proceso y sus hijos (``clear_refs``), para que
+    peak_rss_kb mida solo lo que ocurra desde ahora. Sin efecto fuera de Linux.
+    """
+    try:
+        for process in _process_tree(pid):
+            with open(f'/proc/{process}/clear_refs', 'w') as clear_refs:
+                clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_kb(pid):
+    """
+    VmHWM (pico de memoria residente) del proceso y sus hijos desde el último
+    reset_peak_rss; None fuera de Linux.
+    """
+    try:
+        peaks = []
+        for process in _process_tree(pid):
+            with open(f'/proc/{process}/status') as status:
+                peaks.extend(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+        return max(peaks)
+    except OSError:
+        return None
+
+
+@contextmanager
+def local_server(server='gunicorn', workers=2, use_cache=False, threads=1, env=None):
+    """
+    Levanta el proyecto en un puerto local y devuelve ``(url base, proceso)``.
+
+    Args:
+        server: ``'gunicorn'`` (core.wsgi) o ``'uvicorn'`` (core.asgi).
+        workers: procesos worker.
+        use_cache: si es False se desactiva la caché de respuestas.
+        threads: hilos por worker de gunicorn (``--threads``; más de 1 usa gthread).
+        env: variables de entorno adicionales para el servidor (p. ej. ``POSTGRES_POOL``).
+    """
+    port = _free_port()
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE, **(env or {})}
+    if not use_cache:
+        env['API_CACHE_TIMEOUT'] = '0'
+    if server == 'gunicorn':
+        command = ['-m', 'gunicorn', 'core.wsgi:application', '--bind', f'127.0.0.1:{port}',
+                   '--workers', str(workers), '--threads', str(threads), '--log-level', 'warning']
+    elif server == 'uvicorn':
+        command = ['-m', 'uvicorn', 'core.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning', '--no-access-log']
+    else:
+        raise ValueError(f'Servidor desconocido: {server}')
+    process = subprocess.Popen([sys.executable, *command], env=env)
+    try:
+        yield f'http://127.0.0.1:{port}', process
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def http_fetcher(base_url, timeout=60):
+    """Función ``fetch(url) -> (segundos, status)`` autenticada con el token del benchmark."""
+    headers = {'Authorization': f'Bearer {access_token()}'}
+
+    def fetch(url):
+        request = urllib.request.Request(base_url + url, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        return time.perf_counter() - started, status
+
+    return fetch
+
+
+def wait_until_ready(fetch, url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fetch(url)
+            return
+        except (urllib.error.URLError, ConnectionError):
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('El servidor local no respondió; revise la configuración de la base de datos.')
+            time.sleep(0.2)
+
+
+def measure(pool, fetch, url, requests, warmup=0, concurrency=1):
+    """Ejecuta ``url`` ``requests`` veces en ``pool`` y resume latencias, status y throughput."""
+    list(pool.map(fetch, [url] * warmup * concurrency))
+    started = time.perf_counter()
+    measured = list(pool.map(fetch, [url] * requests))
+    elapsed = time.perf_counter() - started
+    return summarize([latency for latency, _ in measured], None, [status for _, status in measured], elapsed)
@@ -0,0 +1,224 @@
+"""
+Escritura masiva de libros y autores.
+
+Valida un lote en una sola pasada, resuelve todos los autores con una única
+consulta y hace upsert con ``bulk_create(update_conflicts=True)`` (libros por
+ISBN, autores por id), escribiendo las filas de la tabla intermedia
+Book.authors también en bloque. Los errores se reportan por elemento sin
+abortar el resto del lote.
+"""
+import uuid
+
+from django.db import transaction
+from rest_framework import serializers
+
+from . import cache
+from .facets import SOURCE_FIELDS as FACET_FIELDS, apply_changes, book_facet_values, facet_values
+from .models import Author, Book, Genre, Language, lookup_key
+from .search import update_search_vectors
+from .serializers import AuthorBulkItemSerializer, BookBulkItemSerializer
+from .signals import touch_books
+from .stats import refresh_author_stats
+
+BOOK_UPSERT_FIELDS = ['title', 'published_date', 'literary_genre', 'pages', 'price', 'language', 'summary',
+                      'updated_at']
+AUTHOR_UPSERT_FIELDS = ['first_name', 'last_name', 'birth_date', 'bio', 'updated_at']
+# Campo de un elemento de libro -> columna de values() con su valor guardado. Un
+# elemento que no envía un campo conserva el valor del libro existente.
+BOOK_STORED_FIELDS = {
+    'title': 'title',
+    'published_date': 'published_date',
+    'literary_genre': 'literary_genre__name',
+    'pages': 'pages',
+    'price': 'price',
+    'language': 'language__name',
+    'summary': 'summary',
+}
+
+
+def _run_validation(serializer, items, start=0):
+    valid, errors = [], []
+    for index, item in enumerate(items, start=start):
+        try:
+            valid.append((index, serializer.run_validation(item)))
+        except serializers.ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+    return valid, errors
+
+
+def validate_books(items, start=0):
+    """
+    Valida una lista de libros.
+
+    Args:
+        items: diccionarios con los campos de BookBulkItemSerializer.
+        start: índice del primer elemento, para reportar posiciones dentro de un archivo.
+
+    Returns:
+        tuple: (válidos, errores) donde válidos es una lista de (índice, datos validados)
+        y errores una lista de {'index', 'errors'}.
+    """
+    valid, errors = _run_validation(BookBulkItemSerializer(), items, start)
+
+    unique = []
+    seen_isbns = {}
+    for index, data in valid:
+        if data['isbn'] in seen_isbns:
+            errors.append({'index': index, 'errors': {
+                'isbn': [f"ISBN repetido en el lote (elemento {seen_isbns[data['isbn']]})."]}})
+            continue
+        seen_isbns[data['isbn']] = index
+        unique.append((index, data))
+    valid = unique
+
+    author_ids = {author_id for _, data in valid for author_id in data.get('authors_ids', [])}
+    if author_ids:
+        known = set(Author.objects.filter(id__in=author_ids).values_list('id', flat=True))
+        checked = []
+        for index, data in valid:
+            missing = [str(author_id) for author_id in data.get('authors_ids', []) if author_id not in known]
+            if missing:
+                errors.append({'index': index, 'errors': {
+                    'authors_ids': [f'Autor inexistente: {author_id}' for author_id in missing]}})
+            else:
+                checked.append((index, data))
+        valid = checked
+
+    errors.sort(key=lambda error: error['index'])
+    return valid, errors
+
+
+def validate_authors(items, start=0):
+    """Valida una lista de autores. Devuelve (válidos, errores) como validate_books."""
+    return _run_validation(AuthorBulkItemSerializer(), items, start)
+
+
+def upsert_books(rows, batch_size=1000, refresh_stats=True):
+    """
+    Inserta o actualiza libros por ISBN y reemplaza sus autores.
+
+    Args:
+        rows: lista de diccionarios ya validados; ``authors_ids`` es opcional y,
+              si está presente, reemplaza los autores del libro. ``id`` es
+              opcional y solo se usa para libros nuevos. ``literary_genre`` y
+              ``language`` son nombres; los que no existen se crean. Los
+              campos que una fila no trae conservan su valor en un libro
+              existente y toman el valor por omisión en uno nuevo.
+        batch_size: filas por sentencia INSERT.
+        refresh_stats: si es False no se actualiza AuthorStats (por ejemplo,
+                       porque se reconstruirá completa al final de una importación).
+
+    Returns:
+        dict: ``{isbn: (id, creado)}`` de cada libro escrito.
+    """
+    if not rows:
+        return {}
+    isbns = [row['isbn'] for row in rows]
+    through = Book.authors.through
+
+    with transaction.atomic():
+        # Las filas existentes se bloquean: los campos omitidos se escriben con el valor leído aquí.
+        stored = {
+            values['isbn']: values for values in
+            Book.objects.select_for_update(of=('self',)).filter(isbn__in=isbns)
+            .values('isbn', 'id', *BOOK_STORED_FIELDS.values())
+        }
+        existing = {isbn: values['id'] for isbn, values in stored.items()}
+        previous_facets = [facet_values(values) for values in stored.values()]
+        rows = [
+            {**{field: stored[row['isbn']][column] for field, column in BOOK_STORED_FIELDS.items()}, **row}
+            if row['isbn'] in stored else {'language': Language.DEFAULT, **row}
+            for row in rows
+        ]
+        # Un id enviado que ya pertenece a otro ISBN no puede reutilizarse.
+        requested_ids = [row['id'] for row in rows if row.get('id') and row['isbn'] not in existing]
+        taken_ids = set(Book.objects.filter(id__in=requested_ids).values_list('id', flat=True))
+
+        genres = Genre.objects.resolve_names(row['literary_genre'] for row in rows)
+        languages = Language.objects.resolve_names(row['language'] for row in rows)
+
+        books = []
+        for row in rows:
+            fields = {key: value for key, value in row.items() if key not in ('id', 'authors_ids')}
+            fields['literary_genre'] = genres[lookup_key(row['literary_genre'])]
+            fields['language'] = languages[lookup_key(row['language'])]
+            book = Book(**fields)
+            if row['isbn'] in existing:
+                book.id = existing[row['isbn']]
+            elif row.get('id') and row['id'] not in taken_ids:
+                book.id = row['id']
+            books.append(book)
+        Book.objects.bulk_create(
+            books,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['isbn'],
+            update_fields=BOOK_UPSERT_FIELDS,
+        )
+        # Un libro insertado en paralelo entre la consulta y el upsert conserva su id original.
+        ids = dict(Book.objects.filter(isbn__in=isbns).values_list('isbn', 'id'))
+
+        with_authors = [row for row in rows if 'authors_ids' in row]
+        book_ids = [ids[row['isbn']] for row in with_authors]
+        affected_authors = set()
+        if refresh_stats:
+            affected_authors.update(
+                through.objects.filter(book_id__in=book_ids).values_list('author_id', flat=True)
+            )
+        through.objects.filter(book_id__in=book_ids).delete()
+        links = [
+            through(book_id=ids[row['isbn']], author_id=author_id)
+            for row in with_authors
+            for author_id in dict.fromkeys(row['authors_ids'])
+        ]
+        through.objects.bulk_create(links, batch_size=batch_size, ignore_conflicts=True)
+
+        # bulk_create no emite señales: se actualizan los conteos de facetas y las
+        # estadísticas de los autores cuyos libros pudieron cambiar, y se invalida
+        # la caché de respuestas.
+        apply_changes(removed=previous_facets, added=[book_facet_values(book) for book in books])
+        if refresh_stats:
+            affected_authors.update(link.author_id for link in links)
+            if existing:
+                affected_authors.update(
+                    through.objects.filter(book_id__in=existing.values()).values_list('author_id', flat=True)
+                )
+            refresh_author_stats(affected_authors)
+        update_search_vectors(ids.values())
+        cache.invalidate(cache.BOOKS, cache.AUTHOR_STATS)
+
+    return {isbn: (ids[isbn], isbn not in existing) for isbn in isbns}
+
+
+def upsert_authors(rows, batch_size=1000):
+    """
+    Inserta o actualiza autores por id (los que no traen id se crean).
+
+    Returns:
+        dict: ``{'created': n, 'updated': n}``.
+    """
+    if not rows:
+        return {'created': 0, 'updated': 0}
+    # Si un id se repite en el lote gana la última aparición.
+    authors = {}
+    for row in rows:
+        author = Author(**{'id': uuid.uuid4(), **row})
+        authors[author.id] = author
+    authors = list(authors.values())
+    with transaction.atomic():
+        existing = set(Author.objects.filter(id__in=[author.id for author in authors]).values_list('id', flat=True))
+        Author.objects.bulk_create(
+            authors,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=AUTHOR_UPSERT_FIELDS,
+        )
+        if existing:
+            book_ids = list(
+                Book.authors.through.objects.filter(author_id__in=existing).values_list('book_id', flat=True))
+            update_search_vectors(book_ids)
+            # bulk_create no emite señales: los libros embeben a sus autores (ETag, ?updated_since=).
+            touch_books(book_ids)
+        cache.invalidate(cache.AUTHORS, cache.BOOKS, cache.AUTHOR_STATS)
+    return {'created': len(authors) - len(existing), 'updated': len(existing)}
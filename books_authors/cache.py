@@ -0,0 +1,128 @@
+"""
+Caché de respuestas para los endpoints de lectura de la API.
+
+Cada respuesta se guarda bajo una clave derivada del esquema, el host y la ruta
+(los cuerpos traen enlaces absolutos, como ``next`` y ``previous``), los query
+params normalizados, el media type aceptado y la "generación" actual de los grupos de
+datos de los que depende (libros, autores, estadísticas de autores). Las señales
+de los modelos renuevan la generación del grupo afectado, por lo que las claves
+viejas dejan de usarse sin tener que buscarlas ni borrarlas una a una.
+
+Junto con el cuerpo se guardan ``Vary`` y los validadores (ETag, Last-Modified) que calculó
+la vista (books_authors.conditional), así que mientras la entrada esté vigente un
+``If-None-Match`` que coincide se responde con 304 sin tocar la base de datos.
+"""
+import hashlib
+import json
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+BOOKS = 'books'
+AUTHORS = 'authors'
+AUTHOR_STATS = 'author_stats'
+
+KEY_PREFIX = 'api-cache'
+
+# Cabeceras de la respuesta que se guardan con el cuerpo.
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(namespace):
+    return f'{KEY_PREFIX}:gen:{namespace}'
+
+
+def get_generations(namespaces):
+    """
+    Devuelve el token de generación vigente de cada grupo, creándolo si no existe.
+
+    Los tokens son aleatorios (no contadores) para que un caché vaciado nunca
+    reutilice un ETag emitido antes con otros datos.
+    """
+    cache = get_cache()
+    keys = [_generation_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        found.update(cache.get_many(missing))
+    return [found.get(key, '') for key in keys]
+
+
+def invalidate(*namespaces):
+    """
+    Renueva la generación de los grupos indicados.
+
+    Se renueva de inmediato y otra vez al confirmar la transacción, para que
+    una lectura concurrente hecha antes del commit no quede guardada como vigente.
+    """
+    def bump():
+        get_cache().set_many({_generation_key(namespace): uuid.uuid4().hex for namespace in namespaces}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def request_digest(request, generations):
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    raw = json.dumps([request.scheme, request.get_host(), request.path, params, request.accepted_media_type,
+                      generations])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def cached_response(*namespaces):
+    """
+    Decorador para acciones GET de un ViewSet que cachea la respuesta JSON renderizada.
+
+    Se ejecuta después de la autenticación, permisos y negociación de contenido
+    de DRF, así que nunca sirve datos a un cliente no autorizado. El browsable
+    API (HTML) no se cachea porque incluye datos del usuario.
+
+    Args:
+        namespaces: grupos de datos de los que depende la respuesta.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            timeout = settings.API_CACHE_TIMEOUT
+            renderer_format = getattr(getattr(request, 'accepted_renderer', None), 'format', None)
+            if not timeout or request.method != 'GET' or renderer_format != 'json':
+                return view_method(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            key = f'{KEY_PREFIX}:response:{request_digest(request, get_generations(namespaces))}'
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type, headers = cached
+                response = HttpResponse(content, content_type=content_type, headers=headers)
+                return get_conditional_response(
+                    request, etag=headers.get('ETag'), last_modified=_timestamp(headers.get('Last-Modified')),
+                    response=response)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+                def store(rendered):
+                    headers = {name: rendered[name] for name in CACHED_HEADERS if rendered.has_header(name)}
+                    cache.set(key, (rendered.content, rendered['Content-Type'], headers), timeout)
+
+                response.add_post_render_callback(store)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _timestamp(value):
+    return parse_http_date_safe(value) if value else None
@@ -0,0 +1,150 @@
+"""
+Feed de cambios para mantener espejos del catálogo sin volver a descargarlo.
+
+``GET /api/books/changes/`` y ``GET /api/authors/changes/`` devuelven en NDJSON,
+en orden de (fecha del cambio, id), las altas y modificaciones (``updated_at``)
+y las bajas (tabla Tombstone, que llenan las señales post_delete). Cada línea
+lleva el ``cursor`` que la sigue: el espejo guarda el de la última línea que
+aplicó y lo envía como ``?since=`` en la siguiente sincronización, así que cada
+pasada lee solo lo que cambió desde entonces.
+
+Cambiar los autores de un libro actualiza su ``updated_at`` (books_authors.signals),
+así que el libro vuelve a aparecer con su ``authors_ids`` completo.
+
+Las filas se leen por bloques con búsqueda keyset sobre los índices
+``(updated_at, id)`` y ``(kind, deleted_at, object_id)``; ninguna consulta queda
+abierta mientras se envía la respuesta.
+
+Solo se informan los cambios con más de ``CHANGES_FEED_LAG_SECONDS`` de
+antigüedad: ``updated_at`` se asigna antes del COMMIT y una transacción que
+confirma tarde podría dejar un cambio detrás de un cursor ya entregado.
+"""
+import base64
+import binascii
+import heapq
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .export import ndjson_lines
+from .models import Tombstone
+
+SINCE_PARAM = 'since'
+UPSERT = 'upsert'
+DELETE = 'delete'
+# Con la misma fecha e id, la baja va después del alta.
+_OP_ORDER = {UPSERT: 0, DELETE: 1}
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'El cursor es anterior a las bajas conservadas; volver a sincronizar con export.'
+    default_code = 'cursor_expired'
+
+
+def encode_cursor(changed_at, object_id, op):
+    data = json.dumps({'t': changed_at.isoformat(), 'i': str(object_id), 'o': op}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(value):
+    """Devuelve ``(fecha, id, op)`` del cursor, o None si no se envió."""
+    if not value:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(value.encode('ascii')).decode('utf-8'))
+        changed_at = parse_datetime(payload['t'])
+        object_id = uuid.UUID(payload['i'])
+        op = payload['o']
+    except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+        raise ValidationError({SINCE_PARAM: 'Cursor inválido.'})
+    if changed_at is None or timezone.is_naive(changed_at) or op not in _OP_ORDER:
+        raise ValidationError({SINCE_PARAM: 'Cursor inválido.'})
+    return changed_at, object_id, op
+
+
+def _after(position, op, time_field, id_field):
+    """Condición "(fecha, id, op) > position" para las filas de una fuente con operación ``op``."""
+    if position is None:
+        return Q()
+    changed_at, object_id, position_op = position
+    id_lookup = 'gte' if _OP_ORDER[op] > _OP_ORDER[position_op] else 'gt'
+    return Q(**{f'{time_field}__gt': changed_at}) | Q(**{time_field: changed_at, f'{id_field}__{id_lookup}': object_id})
+
+
+def _source(queryset, time_field, id_field, op, fetch, position, until, batch_size):
+    """
+    Recorre ``queryset`` en orden (time_field, id_field) desde ``position`` hasta
+    ``until`` por bloques de ``batch_size`` filas. ``fetch(queryset)`` lee un
+    bloque y devuelve la lista de ``(fecha, id, op, datos)``.
+    """
+    queryset = queryset.filter(**{f'{time_field}__lte': until}).order_by(time_field, id_field)
+    while True:
+        changes = fetch(queryset.filter(_after(position, op, time_field, id_field))[:batch_size])
+        yield from changes
+        if len(changes) < batch_size:
+            return
+        position = changes[-1][:3]
+
+
+def _change_key(change):
+    changed_at, object_id, op, _ = change
+    return changed_at, object_id, _OP_ORDER[op]
+
+
+def change_stream(queryset, rows, kind, position, until, batch_size):
+    """
+    Altas/modificaciones de ``queryset`` (convertidas con ``rows(queryset, chunk_size)``,
+    como en books_authors.export) y bajas de ``kind`` mezcladas en orden.
+
+    Devuelve un iterador de ``(fecha, id, op, datos)``; ``datos`` es None en las bajas.
+    """
+    def fetch_rows(batch):
+        return [(row['updated_at'], row['id'], UPSERT, row) for row in rows(batch, batch_size)]
+
+    def fetch_tombstones(batch):
+        return [(row['deleted_at'], row['object_id'], DELETE, None)
+                for row in batch.values('deleted_at', 'object_id')]
+
+    upserts = _source(queryset, 'updated_at', 'id', UPSERT, fetch_rows, position, until, batch_size)
+    deletes = _source(Tombstone.objects.filter(kind=kind), 'deleted_at', 'object_id', DELETE, fetch_tombstones,
+                      position, until, batch_size)
+    return heapq.merge(upserts, deletes, key=_change_key)
+
+
+def change_lines(changes):
+    for changed_at, object_id, op, data in changes:
+        line = {'op': op, 'id': object_id, 'changed_at': changed_at,
+                'cursor': encode_cursor(changed_at, object_id, op)}
+        if data is not None:
+            line['data'] = data
+        yield line
+
+
+def changes_response(request, queryset, rows, kind, batch_size):
+    """
+    Respuesta NDJSON en streaming con los cambios posteriores a ``?since=``.
+
+    Args:
+        queryset: filas del modelo (sin ordenar).
+        rows: función de books_authors.export que convierte un queryset en diccionarios.
+        kind: tipo de Tombstone del modelo.
+        batch_size: filas por consulta.
+    """
+    position = decode_cursor(request.query_params.get(SINCE_PARAM))
+    now = timezone.now()
+    retention = settings.CHANGES_TOMBSTONE_RETENTION_DAYS
+    if position is not None and retention and position[0] < now - timedelta(days=retention):
+        raise CursorExpired()
+    until = now - timedelta(seconds=settings.CHANGES_FEED_LAG_SECONDS)
+    changes = change_stream(queryset, rows, kind, position, until, batch_size)
+    return StreamingHttpResponse(ndjson_lines(change_lines(changes)),
+                                 content_type='application/x-ndjson; charset=utf-8')
@@ -0,0 +1,128 @@
+"""
+Peticiones condicionales (``If-None-Match`` / ``If-Modified-Since``) para las
+lecturas de libros y autores.
+
+Los validadores salen de una consulta agregada sobre el queryset ya filtrado:
+``MAX(updated_at)`` de las tablas que forman la representación (en el detalle de
+un libro también la de sus autores) y la cantidad de filas, que cambia al borrar. El
+ETag es un hash de esos valores junto con la ruta, los query params y el media
+type, así que es el mismo en todos los workers y no depende de la caché.
+
+Si el cliente ya tiene la versión actual se responde 304 sin leer las filas ni
+serializarlas. Los detalles llevan además ``Last-Modified``; los listados no,
+porque borrar una fila no mueve ``MAX(updated_at)``. La paginación por número
+de página reutiliza la cantidad de filas del sondeo en lugar de otro ``COUNT``.
+
+En modo keyset (``?pagination=cursor``) no hay sondeo: recorrería todo el
+queryset filtrado en cada página. El ETag sale de la página ya armada
+(``content_etag``), así que un 304 ahorra la respuesta pero no la lectura.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .cache import request_digest
+
+
+def probe(queryset, fields):
+    """
+    Devuelve ``(filas, [MAX(campo) para cada campo])`` con una sola consulta.
+
+    Los campos con ``__`` recorren relaciones y multiplican las filas, así que
+    entonces se cuentan las claves distintas.
+    """
+    distinct = any('__' in field for field in fields)
+    aggregates = {f'max_{index}': Max(field) for index, field in enumerate(fields)}
+    values = queryset.order_by().aggregate(rows=Count('pk', distinct=distinct), **aggregates)
+    return values['rows'], [values[f'max_{index}'] for index in range(len(fields))]
+
+
+def validators(request, queryset, fields, last_modified=False):
+    """
+    Calcula ``(etag, last_modified, filas)`` de la respuesta a ``request``.
+
+    ``last_modified`` es un timestamp en segundos, o None si no se pide o no hay fechas.
+    """
+    rows, timestamps = probe(queryset, fields)
+    etag = f'"{request_digest(request, [rows, *(str(value) for value in timestamps)])}"'
+    modified = None
+    if last_modified:
+        timestamps = [value for value in timestamps if value is not None]
+        modified = int(max(timestamps).timestamp()) if timestamps else None
+    return etag, modified, rows
+
+
+def content_etag(request, data):
+    """ETag de una representación ya armada (p. ej. una página keyset), sin consultas."""
+    content = json.dumps(data, default=str, sort_keys=True)
+    return f'"{request_digest(request, [hashlib.sha1(content.encode("utf-8")).hexdigest()])}"'
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Autenticadas: solo las guarda el cliente, y debe revalidarlas antes de reutilizarlas.
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+def not_modified(request, etag, last_modified=None):
+    """Respuesta 304 (o 412) si las cabeceras condicionales de ``request`` lo permiten; si no, None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalReadMixin:
+    """
+    Validadores y 304 para las lecturas de un ViewSet.
+
+    ``conditional_fields`` son las columnas de fecha (relativas al modelo del
+    queryset) que cambian cuando cambia la representación; las vistas pueden
+    definir ``get_conditional_fields()`` para usar otras en una acción.
+    """
+    conditional_fields = ('updated_at',)
+
+    def get_conditional_fields(self):
+        return self.conditional_fields
+
+    def check_not_modified(self, queryset, detail=False):
+        """
+        Calcula los validadores de ``queryset`` y devuelve la respuesta 304 si el
+        cliente ya tiene esta versión, o None para seguir con la respuesta normal.
+
+        Con ``detail=True`` se agrega Last-Modified y, si no hay filas, no se hace
+        nada (la vista responderá 404). La cantidad de filas queda en
+        ``conditional_rows`` para que la paginación no vuelva a contarlas.
+        """
+        self.conditional_validators = None
+        self.conditional_rows = None
+        if not settings.API_CONDITIONAL_REQUESTS or self.request.method not in ('GET', 'HEAD'):
+            return None
+        etag, modified, rows = validators(self.request, queryset, self.get_conditional_fields(), detail)
+        if detail and not rows:
+            return None
+        self.conditional_validators = (etag, modified)
+        self.conditional_rows = rows
+        return not_modified(self.request, etag, modified)
+
+    def check_content_not_modified(self, data):
+        """Como check_not_modified, con el ETag calculado sobre la representación ``data``."""
+        self.conditional_validators = None
+        if not settings.API_CONDITIONAL_REQUESTS or self.request.method not in ('GET', 'HEAD'):
+            return None
+        etag = content_etag(self.request, data)
+        self.conditional_validators = (etag, None)
+        return not_modified(self.request, etag)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        conditional_validators = getattr(self, 'conditional_validators', None)
+        if conditional_validators is not None and response.status_code == 200:
+            set_validators(response, *conditional_validators)
+        return response
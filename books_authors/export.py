@@ -0,0 +1,105 @@
+"""
+Exportación en streaming del catálogo en NDJSON o CSV.
+
+Las filas se leen con ``.iterator(chunk_size=...)`` (cursor del lado del
+servidor en PostgreSQL, autores precargados por bloque) y se escriben una a
+una, así que la memoria usada no depende del tamaño del catálogo. El formato
+de libros usa ``authors_ids`` para que el archivo pueda volver a cargarse con
+POST /api/books/bulk/.
+"""
+import csv
+import json
+from operator import attrgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+
+from .models import Author
+from .renderers import orjson
+
+BOOK_EXPORT_FIELDS = ['id', 'title', 'isbn', 'published_date', 'literary_genre', 'pages', 'price', 'language',
+                      'summary', 'authors_ids', 'created_at', 'updated_at']
+# Género e idioma se exportan por nombre (claves foráneas a Genre y Language).
+_BOOK_GETTERS = {
+    **{field: attrgetter(field) for field in BOOK_EXPORT_FIELDS},
+    'literary_genre': attrgetter('literary_genre.name'),
+    'language': attrgetter('language.name'),
+    'authors_ids': lambda book: [author.id for author in book.authors.all()],
+}
+AUTHOR_EXPORT_FIELDS = ['id', 'first_name', 'last_name', 'birth_date', 'bio', 'created_at', 'updated_at']
+
+
+def book_rows(queryset, chunk_size):
+    queryset = queryset.select_related('literary_genre', 'language').prefetch_related(None).prefetch_related(
+        Prefetch('authors', queryset=Author.objects.only('id').order_by('id')))
+    for book in queryset.iterator(chunk_size=chunk_size):
+        yield {field: get(book) for field, get in _BOOK_GETTERS.items()}
+
+
+def author_rows(queryset, chunk_size):
+    for author in queryset.values(*AUTHOR_EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        yield author
+
+
+def ndjson_lines(rows):
+    # Fechas, Decimal y UUID con el formato de DjangoJSONEncoder en ambos caminos.
+    if orjson is None:
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')) + '\n'
+        return
+    default = DjangoJSONEncoder().default
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+    for row in rows:
+        yield orjson.dumps(row, default=default, option=option)
+
+
+class _Echo:
+    """Buffer de una línea para que csv.writer devuelva cada fila en lugar de escribirla."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in fields])
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '|'.join(str(item) for item in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_lines(rows, fields, export_format):
+    """Líneas del archivo (str o bytes) en ``ndjson`` o ``csv``."""
+    if export_format == 'csv':
+        return _csv_lines(rows, fields)
+    return ndjson_lines(rows)
+
+
+def streaming_export(rows, fields, export_format, filename):
+    """
+    Construye la respuesta en streaming para las filas dadas.
+
+    Args:
+        rows: iterador de diccionarios.
+        fields: columnas en orden (usadas para CSV).
+        export_format: ``ndjson`` o ``csv``.
+        filename: nombre sugerido del archivo, sin extensión.
+    """
+    if export_format == 'csv':
+        response = StreamingHttpResponse(export_lines(rows, fields, 'csv'), content_type='text/csv; charset=utf-8')
+    else:
+        export_format = 'ndjson'
+        response = StreamingHttpResponse(export_lines(rows, fields, 'ndjson'),
+                                         content_type='application/x-ndjson; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
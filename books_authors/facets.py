@@ -0,0 +1,237 @@
+"""
+Conteo de libros por faceta: género literario, idioma, rango de precio y década
+de publicación.
+
+Para un listado filtrado todas las facetas salen de una sola consulta agrupada:
+``GROUP BY GROUPING SETS`` en PostgreSQL y, en otros motores, un ``UNION ALL``
+de un ``GROUP BY`` por faceta.
+
+Los conteos del catálogo completo se leen de la tabla FacetCount, que las
+señales de Book y ``bulk.upsert_books`` mantienen sumando y restando en cada
+cambio (ver ``apply_changes``); ``manage.py rebuild_facet_counts`` la
+reconstruye, por ejemplo después de cambiar ``BOOK_FACET_PRICE_BANDS``.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, CharField, Count, F, IntegerField, Value, When
+from django.db.models.functions import Cast, ExtractYear
+
+from .models import Book, FacetCount
+
+GENRE = FacetCount.GENRE
+LANGUAGE = FacetCount.LANGUAGE
+PRICE = FacetCount.PRICE
+DECADE = FacetCount.DECADE
+FACETS = (GENRE, LANGUAGE, PRICE, DECADE)
+# Columnas de las consultas de conteo (no pueden llamarse como los campos de Book).
+COLUMNS = tuple(f'{facet}_facet' for facet in FACETS)
+
+# Campos de Book de los que dependen las facetas (para values()).
+SOURCE_FIELDS = ('literary_genre__name', 'language__name', 'price', 'published_date')
+
+
+# --- Valor de cada faceta para un libro ---
+
+def price_bands():
+    """Etiquetas de los rangos de precio en orden: '0-10', '10-20', ..., '100+'."""
+    bounds = settings.BOOK_FACET_PRICE_BANDS
+    lower = [0, *bounds]
+    return [f'{low}-{high}' for low, high in zip(lower, bounds)] + [f'{lower[-1]}+']
+
+
+def price_band(price):
+    labels = price_bands()
+    for label, bound in zip(labels, settings.BOOK_FACET_PRICE_BANDS):
+        if price < bound:
+            return label
+    return labels[-1]
+
+
+def facet_values(row):
+    """
+    Valor de cada faceta para un libro, como se guarda en FacetCount.
+
+    ``row`` es un diccionario con SOURCE_FIELDS; la década de un libro sin fecha es ''.
+    """
+    published_date = row['published_date']
+    return {
+        GENRE: row['literary_genre__name'],
+        LANGUAGE: row['language__name'],
+        PRICE: price_band(row['price']),
+        DECADE: str(published_date.year // 10 * 10) if published_date else '',
+    }
+
+
+def book_facet_values(book):
+    # to_python: los atributos pueden venir como texto (p. ej. Book.objects.create(published_date='2001-01-01')).
+    return facet_values({
+        'literary_genre__name': book.literary_genre.name,
+        'language__name': book.language.name,
+        'price': Book._meta.get_field('price').to_python(book.price),
+        'published_date': Book._meta.get_field('published_date').to_python(book.published_date),
+    })
+
+
+def facet_deltas(removed=(), added=()):
+    """
+    Diferencias de conteo ``{(faceta, valor): n}`` al reemplazar los libros
+    ``removed`` por ``added`` (listas de diccionarios de facet_values).
+    """
+    deltas = Counter()
+    for values in removed:
+        deltas.subtract(values.items())
+    for values in added:
+        deltas.update(values.items())
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+# --- Tabla FacetCount ---
+
+def apply_changes(removed=(), added=()):
+    """
+    Actualiza FacetCount al reemplazar los libros ``removed`` por ``added``.
+
+    Todas las diferencias se escriben con un solo ``INSERT ... ON CONFLICT DO
+    UPDATE SET count = count + n``: las escrituras concurrentes no se pisan y las
+    filas se bloquean siempre en el mismo orden.
+    """
+    deltas = sorted(facet_deltas(removed, added).items())
+    if not deltas:
+        return
+    connection = connections[FacetCount.objects.db]
+    if not connection.features.supports_update_conflicts_with_target:
+        for (facet, value), delta in deltas:
+            rows = FacetCount.objects.filter(facet=facet, value=value)
+            if not rows.update(count=F('count') + delta):
+                FacetCount.objects.create(facet=facet, value=value, count=delta)
+        return
+    quote = connection.ops.quote_name
+    table, count = quote(FacetCount._meta.db_table), quote('count')
+    sql = (f'INSERT INTO {table} ({quote("facet")}, {quote("value")}, {count}) '
+           f'VALUES {", ".join(["(%s, %s, %s)"] * len(deltas))} '
+           f'ON CONFLICT ({quote("facet")}, {quote("value")}) DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [param for (facet, value), delta in deltas for param in (facet, value, delta)])
+
+
+def rename_value(facet, old, new):
+    """Renombra un valor de la tabla FacetCount (al renombrar un género o idioma)."""
+    FacetCount.objects.filter(facet=facet, value=old).update(value=new)
+
+
+def rebuild_facet_counts():
+    """
+    Reconstruye la tabla FacetCount desde los libros.
+
+    Returns:
+        int: cantidad de valores de faceta guardados.
+    """
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        counts = facet_counts(Book.objects.all(), summary=False)
+        FacetCount.objects.bulk_create([
+            FacetCount(facet=facet, value=value, count=count)
+            for facet, values in counts.items()
+            for value, count in values.items()
+        ])
+    return sum(len(values) for values in counts.values())
+
+
+def summary_counts():
+    """Conteos del catálogo completo desde FacetCount: ``{faceta: {valor: n}}``."""
+    counts = {facet: {} for facet in FACETS}
+    for facet, value, count in FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        counts[facet][value] = count
+    return counts
+
+
+# --- Conteo sobre un queryset ---
+
+def price_band_expression():
+    labels = price_bands()
+    return Case(
+        *(When(price__lt=bound, then=Value(label)) for label, bound in zip(labels, settings.BOOK_FACET_PRICE_BANDS)),
+        default=Value(labels[-1]),
+        output_field=CharField(),
+    )
+
+
+def decade_expression():
+    year = Cast(ExtractYear('published_date'), IntegerField())
+    return Cast(year / Value(10) * Value(10), CharField())
+
+
+def _facet_rows(queryset):
+    """Una fila por libro con el valor de cada faceta (en el orden de FACETS, columnas COLUMNS)."""
+    expressions = (F('literary_genre__name'), F('language__name'), price_band_expression(), decade_expression())
+    return queryset.order_by().prefetch_related(None).annotate(**dict(zip(COLUMNS, expressions))).values(*COLUMNS)
+
+
+def _grouping_sets(queryset):
+    rows = _facet_rows(queryset)
+    connection = connections[rows.db]
+    inner, params = rows.query.get_compiler(connection=connection).as_sql()
+    columns = ', '.join(connection.ops.quote_name(column) for column in COLUMNS)
+    sets = ', '.join(f'({connection.ops.quote_name(column)})' for column in COLUMNS)
+    # GROUPING(a, b, c, d) tiene en 0 el bit de la columna agrupada: 0b0111 es la primera.
+    facet_by_grouping = {(1 << len(FACETS)) - 1 - (1 << (len(FACETS) - 1 - index)): facet
+                         for index, facet in enumerate(FACETS)}
+    sql = (f'SELECT GROUPING({columns}), {columns}, COUNT(*) FROM ({inner}) AS facet_rows '
+           f'GROUP BY GROUPING SETS ({sets})')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for grouping, *values, count in cursor.fetchall():
+            facet = facet_by_grouping[grouping]
+            yield facet, values[FACETS.index(facet)], count
+
+
+def _union(queryset):
+    rows = _facet_rows(queryset)
+    grouped = [
+        rows.annotate(facet=Value(facet, output_field=CharField()), value=F(column))
+        .values('facet', 'value').annotate(count=Count('*')).values_list('facet', 'value', 'count')
+        for facet, column in zip(FACETS, COLUMNS)
+    ]
+    return grouped[0].union(*grouped[1:], all=True)
+
+
+def facet_counts(queryset, summary=True):
+    """
+    Conteos de cada faceta sobre los libros de ``queryset``: ``{faceta: {valor: n}}``.
+
+    Con ``summary=True`` y un queryset sin filtros se leen de FacetCount.
+    """
+    if summary and not queryset.query.where:
+        return summary_counts()
+    if connections[queryset.db].vendor == 'postgresql':
+        rows = _grouping_sets(queryset)
+    else:
+        rows = _union(queryset)
+    counts = {facet: {} for facet in FACETS}
+    for facet, value, count in rows:
+        counts[facet][value if value is not None else ''] = count
+    return counts
+
+
+def facets_response_data(counts):
+    """
+    Representación de la API: la cantidad de libros y, por faceta, una lista de
+    ``{'value', 'count'}``. Los rangos de precio y las décadas van en orden; el
+    género y el idioma, de más a menos libros. La década de los libros sin fecha es null.
+    """
+    price_order = {label: index for index, label in enumerate(price_bands())}
+    orders = {
+        GENRE: lambda item: (-item[1], item[0]),
+        LANGUAGE: lambda item: (-item[1], item[0]),
+        PRICE: lambda item: price_order.get(item[0], len(price_order)),
+        DECADE: lambda item: (item[0] == '', int(item[0] or 0)),
+    }
+    data = {'count': sum(counts[GENRE].values())}
+    for facet in FACETS:
+        data[facet] = [{'value': value, 'count': count}
+                       for value, count in sorted(counts[facet].items(), key=orders[facet])]
+    data[DECADE] = [{'value': int(item['value']) if item['value'] else None, 'count': item['count']}
+                    for item in data[DECADE]]
+    return data
@@ -0,0 +1,281 @@
+"""
+Serialización de solo lectura para los endpoints de consulta.
+
+``BookSerializer`` y ``AuthorSerializer`` construyen objetos de campo y llaman a
+``to_representation`` de cada campo en cada fila. Para listados, detalle y las
+acciones personalizadas se leen las filas con ``.values()`` (sin instanciar
+modelos), los autores de todos los libros de la página se traen con una sola
+consulta agrupada y cada fila se convierte con funciones precalculadas a partir
+de los campos del serializador original. La salida es idéntica a la de los
+serializadores de DRF, que se siguen usando para las escrituras. El género y
+el idioma (SlugRelatedField) se leen por nombre en la misma consulta.
+
+Los clientes pueden pedir solo algunos campos (``select``, ver ``requested_fieldset``):
+las columnas que no se muestran no se leen y, si no se piden los autores, no se
+consultan.
+"""
+import copy
+import decimal
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, fields as drf_fields, relations
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import BaseSerializer
+
+from core import metrics
+from .models import Author
+from .serializers import AuthorSerializer, BookSerializer
+
+
+def _is_iso(field, default):
+    output_format = getattr(field, 'format', default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _datetime_converter():
+    if settings.USE_TZ:
+        current = timezone.get_current_timezone()
+
+        def convert(value):
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value, current)
+            text = value.astimezone(current).isoformat()
+            return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    else:
+        def convert(value):
+            if timezone.is_aware(value):
+                value = timezone.make_naive(value, dt_timezone.utc)
+            return value.isoformat()
+    return convert
+
+
+def _decimal_converter(field):
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f'{value.quantize(quantum, rounding=field.rounding, context=context):f}'
+    return convert
+
+
+def converter(field):
+    """
+    Función equivalente a ``field.to_representation`` para los tipos de campo
+    del catálogo, o el propio método si el campo tiene una configuración que no
+    se replica. ``None`` indica que el valor se devuelve tal cual.
+    """
+    if isinstance(field, (drf_fields.CharField, drf_fields.IntegerField, relations.SlugRelatedField)):
+        return None
+    if isinstance(field, drf_fields.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, drf_fields.DateTimeField):
+        if _is_iso(field, drf_fields.api_settings.DATETIME_FORMAT) and not hasattr(field, 'timezone'):
+            return _datetime_converter()
+        return field.to_representation
+    if isinstance(field, drf_fields.DateField) and _is_iso(field, drf_fields.api_settings.DATE_FORMAT):
+        return lambda value: value.isoformat()
+    if isinstance(field, drf_fields.DecimalField):
+        coerce_to_string = getattr(field, 'coerce_to_string', drf_fields.api_settings.COERCE_DECIMAL_TO_STRING)
+        if coerce_to_string and not field.localize and not field.normalize_output and field.decimal_places is not None:
+            return _decimal_converter(field)
+    return field.to_representation
+
+
+def column(field):
+    """
+    Columna de ``.values()`` de la que sale el campo: su nombre o, en un
+    SlugRelatedField (género, idioma), el campo de la fila relacionada.
+    """
+    if isinstance(field, relations.SlugRelatedField):
+        return f'{field.source}__{field.slug_field}'
+    return field.field_name
+
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+
+
+def _param_names(query_params, param):
+    return [name.strip() for value in query_params.getlist(param) for name in value.split(',') if name.strip()]
+
+
+def requested_fieldset(query_params):
+    """
+    Campos pedidos por el cliente, como argumentos de ``FastModelSerializer.select``.
+
+    Query params (listas separadas por comas):
+        - fields: solo estos campos; ``authors.first_name`` elige campos del objeto anidado
+        - omit: todos los campos salvo estos (también admite ``authors.bio``)
+        - expand: objetos anidados que se agregan a ``fields`` (sin ``fields`` ya se incluyen)
+    """
+    return (_param_names(query_params, FIELDS_PARAM) or None, _param_names(query_params, OMIT_PARAM),
+            _param_names(query_params, EXPAND_PARAM))
+
+
+def _split(names):
+    """Separa ``['a', 'b.c']`` en ``({'a'}, {'b': ['c']})``."""
+    own, nested = set(), {}
+    for name in names:
+        head, _, rest = name.partition('.')
+        if rest:
+            nested.setdefault(head, []).append(rest)
+        else:
+            own.add(head)
+    return own, nested
+
+
+class FastModelSerializer:
+    """
+    Serializador de solo lectura que replica la salida de ``serializer_class``
+    a partir de diccionarios de ``.values()``.
+
+    Los campos anidados (serializadores) se resuelven en ``nested_representation``
+    con los serializadores de ``nested``.
+    """
+    serializer_class = None
+
+    def __init__(self):
+        self.fields = list(self.serializer_class()._readable_fields)
+        self.columns = self.fields_columns(self.fields)
+        self.nested = {}
+
+    @staticmethod
+    def fields_columns(fields):
+        return [column(field) for field in fields if not isinstance(field, BaseSerializer)]
+
+    def values(self, queryset, *extra):
+        """Convierte un queryset en uno de diccionarios con las columnas necesarias."""
+        # id siempre: agrupa los objetos anidados y evita values() sin columnas (todas).
+        return queryset.prefetch_related(None).values(*dict.fromkeys(['id', *self.columns, *extra]))
+
+    def select(self, fields=None, omit=(), expand=()):
+        """
+        Copia del serializador que solo produce ``fields`` (todos si es None) menos ``omit``.
+
+        Los nombres con punto (``authors.first_name``) se aplican al serializador
+        anidado; ``expand`` agrega objetos anidados completos a ``fields``. Los
+        nombres desconocidos responden 400.
+        """
+        if fields is None and not omit and not expand:
+            return self
+        available = {field.field_name for field in self.fields}
+        fields_own, fields_nested = _split(fields or ())
+        omit_own, omit_nested = _split(omit)
+        unknown = sorted(
+            (fields_own | omit_own) - available
+            | (set(fields_nested) | set(omit_nested) | set(expand)) - set(self.nested)
+        )
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: f'Campos desconocidos: {", ".join(unknown)}.'})
+
+        if fields is None:
+            selected = set(available)
+        else:
+            fields_own |= set(expand)
+            selected = fields_own | set(fields_nested)
+        selected -= omit_own
+
+        clone = copy.copy(self)
+        clone.fields = [field for field in self.fields if field.field_name in selected]
+        clone.columns = self.fields_columns(clone.fields)
+        clone.nested = {}
+        for name, serializer in self.nested.items():
+            if name in selected:
+                nested_fields = None if fields is None or name in fields_own else fields_nested[name]
+                clone.nested[name] = serializer.select(nested_fields, omit_nested.get(name, ()))
+        return clone
+
+    def converters(self):
+        # Se calculan en cada llamada porque dependen de la zona horaria activa.
+        return [(field.field_name, column(field), converter(field)) for field in self.fields]
+
+    def nested_representation(self, rows):
+        """Devuelve ``{campo: función(fila)}`` para los campos anidados."""
+        return {}
+
+    async def anested_representation(self, rows):
+        """Versión asíncrona de ``nested_representation`` (ORM asíncrono)."""
+        return {}
+
+    def to_representation(self, rows):
+        """Serializa una lista de filas de ``values()`` (las consultas anidadas no cuentan como serialización)."""
+        rows = list(rows)
+        nested = self.nested_representation(rows)
+        with metrics.timed('serializer'):
+            return self.convert_rows(rows, nested)
+
+    async def ato_representation(self, rows):
+        """Igual que ``to_representation``, para las vistas asíncronas."""
+        rows = list(rows)
+        nested = await self.anested_representation(rows)
+        with metrics.timed('serializer'):
+            return self.convert_rows(rows, nested)
+
+    def convert_rows(self, rows, nested=None):
+        nested = nested or {}
+        converters = self.converters()
+        result = []
+        for row in rows:
+            item = {}
+            for name, source, convert in converters:
+                if name in nested:
+                    item[name] = nested[name](row)
+                    continue
+                value = row[source]
+                item[name] = value if value is None or convert is None else convert(value)
+            result.append(item)
+        return result
+
+
+class FastAuthorSerializer(FastModelSerializer):
+    serializer_class = AuthorSerializer
+
+
+class FastBookSerializer(FastModelSerializer):
+    """Libros con sus autores anidados, leídos con una única consulta para todas las filas."""
+    serializer_class = BookSerializer
+
+    def __init__(self):
+        super().__init__()
+        self.nested = {'authors': FastAuthorSerializer()}
+
+    def authors_values(self, book_ids):
+        # Mismo JOIN y orden (Meta.ordering de Author) que prefetch_related('authors').
+        return Author.objects.filter(books__in=book_ids).values('books__id', *self.nested['authors'].columns)
+
+    def group_authors(self, book_ids, authors):
+        authors_by_book = {book_id: [] for book_id in book_ids}
+        for author, item in zip(authors, self.nested['authors'].convert_rows(authors)):
+            authors_by_book[author['books__id']].append(item)
+        return {'authors': lambda row: authors_by_book[row['id']]}
+
+    def nested_representation(self, rows):
+        if 'authors' not in self.nested:
+            return {}
+        book_ids = [row['id'] for row in rows]
+        authors = list(self.authors_values(book_ids)) if book_ids else []
+        return self.group_authors(book_ids, authors)
+
+    async def anested_representation(self, rows):
+        if 'authors' not in self.nested:
+            return {}
+        book_ids = [row['id'] for row in rows]
+        authors = [author async for author in self.authors_values(book_ids)] if book_ids else []
+        return self.group_authors(book_ids, authors)
+
+
+_instances = {}
+
+
+def get_fast_serializer(serializer_class):
+    """Instancia compartida (los campos se construyen una sola vez por proceso)."""
+    if serializer_class not in _instances:
+        _instances[serializer_class] = serializer_class()
+    return _instances[serializer_class]
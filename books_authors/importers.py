@@ -0,0 +1,130 @@
+"""
+Lectura en streaming de archivos de catálogo (JSON, NDJSON o CSV).
+
+Los lectores devuelven un diccionario por registro sin cargar el archivo
+completo en memoria, incluido el caso de un arreglo JSON grande.
+"""
+import csv
+import json
+import os
+
+JSON_CHUNK_SIZE = 1 << 16
+FORMATS = ('json', 'ndjson', 'csv')
+LIST_FIELDS = ('authors_ids',)
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if extension in FORMATS:
+        return extension
+    raise ValueError(f'No se puede deducir el formato de {path}; use --format.')
+
+
+def normalize_record(record):
+    """
+    Adapta un registro al formato de la carga masiva.
+
+    Acepta ``authors`` (como en los fixtures) como alias de ``authors_ids``.
+    """
+    if 'authors' in record and 'authors_ids' not in record:
+        record['authors_ids'] = record.pop('authors')
+    return record
+
+
+def iter_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_json_array(stream, chunk_size=JSON_CHUNK_SIZE):
+    """Itera los elementos de un arreglo JSON de nivel superior leyendo por bloques."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Se descartan espacios, la apertura del arreglo y los separadores.
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer):
+                char = buffer[position]
+                if not started:
+                    if char != '[':
+                        raise ValueError('Se esperaba un arreglo JSON.')
+                    started = True
+                    position += 1
+                    continue
+                if char == ',':
+                    position += 1
+                    continue
+                if char == ']':
+                    return
+                break
+            if eof:
+                if started:
+                    raise ValueError('Arreglo JSON sin cerrar.')
+                return
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        # El valor solo es definitivo si le sigue un separador: un número al final
+        # del bloque (por ejemplo "3." de "3.25") podría estar cortado.
+        following = end
+        while following < len(buffer) and buffer[following] in ' \t\r\n':
+            following += 1
+        if not eof and (following == len(buffer) or buffer[following] not in ',]'):
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+def iter_csv(stream):
+    for row in csv.DictReader(stream):
+        record = {key: value for key, value in row.items() if value != ''}
+        for field in LIST_FIELDS:
+            if field in record:
+                record[field] = [item for item in record[field].split('|') if item]
+        yield record
+
+
+def iter_records(path, file_format=None):
+    """
+    Itera los registros de un archivo de catálogo.
+
+    Args:
+        path: ruta del archivo.
+        file_format: ``json``, ``ndjson`` o ``csv``; si es None se deduce de la extensión.
+    """
+    file_format = file_format or detect_format(path)
+    with open(path, 'r', encoding='utf-8', newline='' if file_format == 'csv' else None) as stream:
+        if file_format == 'ndjson':
+            records = iter_ndjson(stream)
+        elif file_format == 'csv':
+            records = iter_csv(stream)
+        else:
+            records = iter_json_array(stream)
+        for record in records:
+            yield normalize_record(record)
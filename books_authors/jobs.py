@@ -0,0 +1,337 @@
+"""
+Trabajos en segundo plano sin broker externo: la cola es la tabla Job.
+
+``POST /api/jobs/`` crea un trabajo ``pending`` y ``manage.py run_worker`` lo
+ejecuta fuera de los workers de gunicorn. Cada worker toma el trabajo pendiente
+más antiguo con ``SELECT ... FOR UPDATE SKIP LOCKED`` (los demás saltean esa
+fila en lugar de esperarla) y lo marca ``running`` con un UPDATE condicional,
+que en SQLite, sin bloqueos por fila, evita que dos workers tomen el mismo.
+
+Mientras ejecuta un trabajo, un hilo del worker renueva ``heartbeat_at`` cada
+``JOB_HEARTBEAT_SECONDS``. Si el worker muere, el trabajo queda ``running`` sin
+señal y otro worker lo retoma pasados ``JOB_STALE_SECONDS``, hasta
+``JOB_MAX_ATTEMPTS`` intentos. Un trabajo que lanza una excepción queda
+``failed`` sin reintentos.
+
+Los tipos de trabajo se registran en ``JOB_TYPES`` con ``register``; cada uno
+recibe el Job y devuelve el resultado (JSON) que se guarda en ``Job.result``.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import cache
+from .bulk import upsert_authors, upsert_books, validate_authors, validate_books
+from .export import AUTHOR_EXPORT_FIELDS, BOOK_EXPORT_FIELDS, author_rows, book_rows, export_lines
+from .facets import rebuild_facet_counts
+from .models import Author, Book, Job
+from .search import is_postgresql, update_search_vectors
+from .stats import rebuild_author_stats
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+# Errores de validación guardados en el resultado de una importación.
+MAX_REPORTED_ERRORS = 100
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+class JobLost(Exception):
+    """El trabajo pasó a otro worker (se lo dio por caído) y este debe abandonarlo."""
+
+
+class JobType:
+    def __init__(self, handler, params_serializer=None):
+        self.handler = handler
+        self.params_serializer = params_serializer
+
+    def validate_params(self, params):
+        """Parámetros validados del trabajo; lanza ValidationError con los errores en ``params``."""
+        if self.params_serializer is None:
+            return {}
+        serializer = self.params_serializer(data=params)
+        if not serializer.is_valid():
+            raise serializers.ValidationError({'params': serializer.errors})
+        return dict(serializer.validated_data)
+
+
+JOB_TYPES = {}
+
+
+def register(kind, params_serializer=None):
+    """Registra la función decorada como ejecutora de los trabajos ``kind``."""
+    def decorator(handler):
+        JOB_TYPES[kind] = JobType(handler, params_serializer)
+        return handler
+    return decorator
+
+
+def report_progress(job, done, total):
+    """
+    Guarda el porcentaje de avance (hasta 99; 100 al terminar) si cambió, así que
+    se escribe como mucho cien veces por trabajo.
+    """
+    progress = min(99, done * 100 // total) if total else 0
+    if progress <= job.progress:
+        return
+    if not Job.objects.filter(pk=job.pk, attempts=job.attempts).update(progress=progress):
+        raise JobLost(job.pk)
+    job.progress = progress
+
+
+def result_path(job, export_format):
+    return settings.JOB_RESULTS_DIR / f'{job.pk}.{export_format}'
+
+
+# --- Tipos de trabajo ---
+
+class ImportParamsSerializer(serializers.Serializer):
+    records = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_records(self, records):
+        if len(records) > settings.JOB_IMPORT_MAX_ITEMS:
+            raise serializers.ValidationError(f'Se admiten como máximo {settings.JOB_IMPORT_MAX_ITEMS} registros.')
+        return records
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=EXPORT_FORMATS, default='ndjson')
+
+
+def _import_records(job, validate, write):
+    """
+    Valida y escribe ``params['records']`` por lotes, como POST /api/books/bulk/.
+
+    ``write(filas)`` devuelve ``(creados, actualizados)``.
+    """
+    records = job.params['records']
+    result = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    for start in range(0, len(records), IMPORT_BATCH_SIZE):
+        batch = records[start:start + IMPORT_BATCH_SIZE]
+        valid, errors = validate(batch, start)
+        created, updated = write([data for _, data in valid])
+        result['created'] += created
+        result['updated'] += updated
+        result['failed'] += len(errors)
+        result['errors'].extend(errors[:MAX_REPORTED_ERRORS - len(result['errors'])])
+        report_progress(job, start + len(batch), len(records))
+    return result
+
+
+def _write_books(rows):
+    written = upsert_books(rows)
+    created = sum(1 for _, was_created in written.values() if was_created)
+    return created, len(written) - created
+
+
+def _write_authors(rows):
+    result = upsert_authors(rows)
+    return result['created'], result['updated']
+
+
+@register('import_books', ImportParamsSerializer)
+def import_books(job):
+    return _import_records(job, validate_books, _write_books)
+
+
+@register('import_authors', ImportParamsSerializer)
+def import_authors(job):
+    return _import_records(job, validate_authors, _write_authors)
+
+
+def _export(job, queryset, rows, fields):
+    """
+    Escribe el archivo del trabajo en JOB_RESULTS_DIR (se descarga con
+    GET /api/jobs/{id}/download/). Se escribe con otro nombre y se renombra al
+    terminar, así que nunca se sirve un archivo a medias.
+    """
+    export_format = job.params.get('format', 'ndjson')
+    queryset = queryset.order_by('updated_at', 'id')
+    total = queryset.count()
+    path = result_path(job, export_format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f'{path.name}.part')
+
+    def counted(rows):
+        for written, row in enumerate(rows, start=1):
+            yield row
+            if written % EXPORT_CHUNK_SIZE == 0:
+                report_progress(job, written, total)
+
+    written = 0
+    with open(partial, 'wb') as output:
+        for line in export_lines(counted(rows(queryset, EXPORT_CHUNK_SIZE)), fields, export_format):
+            output.write(line if isinstance(line, bytes) else line.encode('utf-8'))
+            written += 1
+    os.replace(partial, path)
+    # CSV tiene una línea de encabezado.
+    return {'format': export_format, 'rows': written - (export_format == 'csv'), 'size': path.stat().st_size}
+
+
+@register('export_books', ExportParamsSerializer)
+def export_books(job):
+    return _export(job, Book.objects.defer('search_vector'), book_rows, BOOK_EXPORT_FIELDS)
+
+
+@register('export_authors', ExportParamsSerializer)
+def export_authors(job):
+    return _export(job, Author.objects.all(), author_rows, AUTHOR_EXPORT_FIELDS)
+
+
+@register('rebuild_author_stats')
+def rebuild_author_stats_job(job):
+    total = rebuild_author_stats()
+    cache.invalidate(cache.AUTHOR_STATS)
+    return {'authors': total}
+
+
+@register('rebuild_facet_counts')
+def rebuild_facet_counts_job(job):
+    total = rebuild_facet_counts()
+    cache.invalidate(cache.BOOKS)
+    return {'values': total}
+
+
+@register('rebuild_search_vectors')
+def rebuild_search_vectors_job(job):
+    if not is_postgresql(Book.objects.db):
+        return {'books': 0}
+    update_search_vectors()
+    return {'books': Book.objects.count()}
+
+
+class JobSerializer(serializers.ModelSerializer):
+    kind = serializers.ChoiceField(choices=sorted(JOB_TYPES))
+    # Solo de escritura: una importación puede traer miles de registros.
+    params = serializers.JSONField(write_only=True, required=False, default=dict)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'params', 'status', 'progress', 'result', 'error', 'attempts', 'created_at',
+                  'started_at', 'finished_at']
+        read_only_fields = ['status', 'progress', 'result', 'error', 'attempts', 'created_at', 'started_at',
+                            'finished_at']
+
+    def validate(self, attrs):
+        if not isinstance(attrs.get('params'), dict):
+            raise serializers.ValidationError({'params': 'Se esperaba un objeto.'})
+        attrs['params'] = JOB_TYPES[attrs['kind']].validate_params(attrs['params'])
+        return attrs
+
+
+# --- Cola y worker ---
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _claim(queryset, worker):
+    now = timezone.now()
+    with transaction.atomic():
+        job = queryset.select_for_update(skip_locked=True).only('id', 'status', 'attempts').first()
+        if job is None:
+            return None
+        if job.status == Job.RUNNING and job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            Job.objects.filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts).update(
+                status=Job.FAILED, finished_at=now,
+                error=f'El worker se detuvo sin terminar el trabajo en {job.attempts} intentos.')
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=job.status, attempts=job.attempts).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1, worker=worker, progress=0, error='',
+            started_at=now, heartbeat_at=now)
+    return Job.objects.get(pk=job.pk) if claimed else None
+
+
+def claim_job(worker):
+    """
+    Toma el trabajo pendiente más antiguo o, si no hay, uno ``running`` cuyo
+    worker dejó de dar señales. Devuelve el Job ya marcado como ``running``, o None.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    for queryset in (Job.objects.filter(status=Job.PENDING).order_by('created_at'),
+                     Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=stale).order_by('heartbeat_at')):
+        job = _claim(queryset, worker)
+        if job is not None:
+            return job
+    return None
+
+
+class Heartbeat(threading.Thread):
+    """Renueva ``heartbeat_at`` del trabajo en curso desde otro hilo (con su propia conexión)."""
+
+    def __init__(self, job):
+        super().__init__(name=f'job-heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.JOB_HEARTBEAT_SECONDS):
+                Job.objects.filter(pk=self.job.pk, attempts=self.job.attempts).update(heartbeat_at=timezone.now())
+        except DatabaseError:
+            logger.exception('No se pudo renovar la señal del trabajo %s', self.job.pk)
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def _finish(job, **fields):
+    Job.objects.filter(pk=job.pk, attempts=job.attempts).update(finished_at=timezone.now(), **fields)
+
+
+def run_job(job):
+    """Ejecuta un trabajo ya tomado por este worker y guarda el resultado o el error."""
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        job_type = JOB_TYPES.get(job.kind)
+        if job_type is None:
+            raise ValueError(f'Tipo de trabajo desconocido: {job.kind}')
+        result = job_type.handler(job)
+    except JobLost:
+        logger.warning('El trabajo %s pasó a otro worker; se abandona.', job.pk)
+    except Exception as exc:
+        logger.exception('Falló el trabajo %s (%s)', job.pk, job.kind)
+        _finish(job, status=Job.FAILED, error=f'{type(exc).__name__}: {exc}')
+    else:
+        _finish(job, status=Job.SUCCEEDED, progress=100, result=result)
+    finally:
+        heartbeat.stop()
+
+
+def work(worker, stop, poll_interval=None, burst=False):
+    """
+    Bucle de un proceso worker: toma y ejecuta trabajos hasta que ``stop``
+    (threading.Event o multiprocessing.Event) se activa o, con ``burst``, hasta
+    que la cola queda vacía.
+
+    Returns:
+        int: cantidad de trabajos ejecutados.
+    """
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while not stop.is_set():
+        # Como entre requests: descarta conexiones viejas o rotas (CONN_MAX_AGE).
+        close_old_connections()
+        job = claim_job(worker)
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    close_old_connections()
+    return processed
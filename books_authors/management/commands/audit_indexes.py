@@ -0,0 +1,171 @@
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from books_authors.models import Author, Book
+from books_authors.views import AuthorViewSet, BookViewSet
+
+
+def sample_endpoints():
+    """
+    Devuelve (nombre, viewset, acción, kwargs, query params) para cada acción de lectura,
+    con valores de filtro tomados de los datos existentes.
+    """
+    book = Book.objects.order_by("updated_at").defer("search_vector").first()
+    author = Author.objects.order_by("updated_at").first()
+    if book is None or author is None:
+        raise CommandError("Se necesitan libros y autores cargados para auditar las consultas.")
+    genre = (Book.objects.values("literary_genre__name").annotate(n=Count("id")).order_by("-n")
+             .values_list("literary_genre__name", flat=True).first())
+    language = (Book.objects.values("language__name").annotate(n=Count("id")).order_by("-n")
+                .values_list("language__name", flat=True).first())
+    dated = Book.objects.filter(published_date__isnull=False).values_list("published_date", flat=True).first()
+    word = max(book.title.split(), key=len)
+
+    endpoints = [
+        ("books list", BookViewSet, "list", {}, {}),
+        ("books list (cursor)", BookViewSet, "list", {}, {"pagination": "cursor"}),
+        ("books list ?search", BookViewSet, "list", {}, {"search": word}),
+        ("books list ?literary_genre", BookViewSet, "list", {}, {"literary_genre": genre}),
+        ("books retrieve", BookViewSet, "retrieve", {"pk": book.pk}, {}),
+        ("books more_than_one_author", BookViewSet, "more_than_one_author", {}, {}),
+        ("books price_range", BookViewSet, "price_range", {}, {"min_price": book.price, "max_price": book.price}),
+        ("books advance_search", BookViewSet, "advance_search", {},
+         {"genre": genre, "min_pages": book.pages, "language": language}),
+        ("books export ?updated_since", BookViewSet, "export", {}, {"updated_since": book.updated_at.isoformat()}),
+        ("authors list", AuthorViewSet, "list", {}, {}),
+        ("authors retrieve", AuthorViewSet, "retrieve", {"pk": author.pk}, {}),
+        ("authors more_books_order", AuthorViewSet, "more_books_order", {}, {}),
+        ("authors books_statistics", AuthorViewSet, "books_statistics", {}, {}),
+        ("authors export ?updated_since", AuthorViewSet, "export", {},
+         {"updated_since": author.updated_at.isoformat()}),
+    ]
+    if dated:
+        endpoints.append(("books list ?published_date", BookViewSet, "list", {}, {"published_date": dated}))
+    return endpoints
+
+
+def capture_queries(viewset, action, kwargs, params, alias):
+    """Ejecuta la acción sin caché de respuestas y devuelve el SQL de los SELECT ejecutados."""
+    request = APIRequestFactory().get("/", params)
+    force_authenticate(request, user=get_user_model()(username="audit_indexes"))
+    view = viewset.as_view({"get": action})
+    with override_settings(API_CACHE_TIMEOUT=0), CaptureQueriesContext(connections[alias]) as ctx:
+        response = view(request, **kwargs)
+        if getattr(response, "streaming", False):
+            for _ in response.streaming_content:
+                pass
+        else:
+            response.render()
+    if response.status_code >= 400:
+        raise CommandError(f"{viewset.__name__}.{action} respondió {response.status_code}: {response.content[:200]}")
+    return [query["sql"] for query in ctx.captured_queries if query["sql"].lstrip().upper().startswith("SELECT")]
+
+
+def walk_plan(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def explain_postgresql(cursor, sql):
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    result = cursor.fetchone()[0]
+    result = json.loads(result) if isinstance(result, str) else result
+    plan = result[0]["Plan"]
+    seq_scans = [
+        {"relation": node["Relation Name"], "rows": node.get("Actual Rows", 0) * node.get("Actual Loops", 1),
+         "estimated_rows": node.get("Plan Rows", 0)}
+        for node in walk_plan(plan) if node["Node Type"] == "Seq Scan"
+    ]
+    return {
+        "total_cost": plan["Total Cost"],
+        "time_ms": result[0].get("Execution Time"),
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "seq_scans": seq_scans,
+    }
+
+
+def explain_sqlite(cursor, sql):
+    # SQLite no tiene EXPLAIN ANALYZE ni costos: se reportan los recorridos completos (SCAN <tabla>)
+    # usando la cantidad de filas de la tabla como estimación.
+    tables = set(cursor.db.introspection.table_names(cursor))
+    aliases = dict((alias, table) for table, alias in re.findall(r'"(\w+)" (U\d+|T\d+)\b', sql))
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+    seq_scans = []
+    for row in cursor.fetchall():
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "USING" not in detail:
+            relation = aliases.get(detail.split()[1], detail.split()[1])
+            if relation not in tables:
+                # Subconsultas materializadas (SCAN subquery) o CTE.
+                continue
+            cursor.execute(f'SELECT COUNT(*) FROM "{relation}"')
+            seq_scans.append({"relation": relation, "rows": None, "estimated_rows": cursor.fetchone()[0]})
+    return {"total_cost": None, "time_ms": None, "shared_hit": None, "shared_read": None, "seq_scans": seq_scans}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta las consultas de cada acción de lectura de BookViewSet y AuthorViewSet con "
+        "EXPLAIN (ANALYZE, BUFFERS) y reporta los recorridos secuenciales y el costo estimado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Alias de la base de datos (default: default).")
+        parser.add_argument("--min-rows", type=int, default=1000,
+                            help="Ignorar recorridos secuenciales sobre tablas con menos filas estimadas.")
+        parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON.")
+        parser.add_argument("--fail-on-seq-scan", action="store_true",
+                            help="Terminar con error si se detecta algún recorrido secuencial relevante.")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        connection = connections[alias]
+        if connection.vendor == "postgresql":
+            explain = explain_postgresql
+        elif connection.vendor == "sqlite":
+            explain = explain_sqlite
+        else:
+            raise CommandError(f"Motor no soportado: {connection.vendor}.")
+
+        report = []
+        for name, viewset, action, kwargs, params in sample_endpoints():
+            for sql in capture_queries(viewset, action, kwargs, params, alias):
+                with connection.cursor() as cursor:
+                    plan = explain(cursor, sql)
+                plan["seq_scans"] = [
+                    scan for scan in plan["seq_scans"]
+                    if max(scan["estimated_rows"], scan["rows"] or 0) >= options["min_rows"]
+                ]
+                report.append({"endpoint": name, "sql": sql, **plan})
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            self.print_report(report)
+
+        flagged = [entry for entry in report if entry["seq_scans"]]
+        if flagged and options["fail_on_seq_scan"]:
+            raise CommandError(f"{len(flagged)} consultas con recorridos secuenciales.")
+
+    def print_report(self, report):
+        for entry in report:
+            cost = f"costo {entry['total_cost']:.1f}" if entry["total_cost"] is not None else "costo n/d"
+            timing = f", {entry['time_ms']:.2f} ms" if entry["time_ms"] is not None else ""
+            buffers = (f", buffers hit={entry['shared_hit']} read={entry['shared_read']}"
+                       if entry["shared_hit"] is not None else "")
+            line = f"{entry['endpoint']}: {cost}{timing}{buffers}"
+            if entry["seq_scans"]:
+                tables = ", ".join(scan["relation"] for scan in entry["seq_scans"])
+                self.stdout.write(self.style.WARNING(f"{line} - SEQ SCAN en {tables}"))
+                self.stdout.write(f"    {entry['sql'][:300]}")
+            else:
+                self.stdout.write(line)
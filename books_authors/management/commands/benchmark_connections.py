@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors.benchmark.connections import CONNECTION_MODES, connection_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la latencia de los endpoints de lectura contra un servidor local con una conexión "
+        "a PostgreSQL por request, conexiones persistentes y el pool de psycopg."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", action="append", dest="modes", choices=tuple(CONNECTION_MODES),
+                            help="Configuración a medir (puede repetirse; default: todas).")
+        parser.add_argument("--server", choices=("gunicorn", "uvicorn"), default="gunicorn",
+                            help="Servidor local (default: gunicorn).")
+        parser.add_argument("--requests", type=int, default=200, help="Requests medidos por endpoint (default: 200).")
+        parser.add_argument("--warmup", type=int, default=2, help="Requests de calentamiento por cliente.")
+        parser.add_argument("--workers", type=int, default=2, help="Workers del servidor (default: 2).")
+        parser.add_argument("--threads", type=int, default=1, help="Hilos por worker de gunicorn (default: 1).")
+        parser.add_argument("--concurrency", type=int, default=4, help="Clientes simultáneos (default: 4).")
+        parser.add_argument("--endpoint", action="append", dest="only",
+                            help="Medir solo este endpoint (puede repetirse).")
+        parser.add_argument("--output", help="Archivo JSON donde guardar el resultado.")
+
+    def handle(self, *args, **options):
+        if options["requests"] <= 0 or options["concurrency"] <= 0:
+            raise CommandError("--requests y --concurrency deben ser positivos.")
+        modes = options["modes"] or list(CONNECTION_MODES)
+        try:
+            result = connection_benchmark(modes, options["requests"], options["warmup"], options["server"],
+                                          options["workers"], options["threads"], options["concurrency"],
+                                          options["only"])
+        except (ValueError, RuntimeError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"{'':32}" + "".join(f"{mode:>30}" for mode in modes))
+        for name in result["modes"][modes[0]]:
+            cells = []
+            for mode in modes:
+                metrics = result["modes"][mode][name]
+                cells.append(f"p50 {metrics['p50_ms']:7.2f}  p95 {metrics['p95_ms']:7.2f} ms")
+            self.stdout.write(f"{name:32}" + "".join(f"{cell:>30}" for cell in cells))
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(result, output, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['output']}.")
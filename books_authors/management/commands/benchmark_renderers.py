@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors.benchmark.serialization import renderer_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de codificación y la memoria asignada del JSONRenderer de DRF y de "
+        "FastJSONRenderer sobre respuestas de N filas, y verifica que la salida sea idéntica."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Filas por respuesta (default: 1000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones; se toma la mejor (default: 5).")
+        parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON.")
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0 or options["repeat"] <= 0:
+            raise CommandError("--rows y --repeat deben ser positivos.")
+        results = renderer_benchmark(options["rows"], options["repeat"])
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for name, result in results.items():
+                if not result["orjson"]:
+                    self.stdout.write(self.style.WARNING("orjson no está instalado: ambos caminos usan json."))
+                self.stdout.write(
+                    f"{name}: {result['rows']} filas, {result['bytes']} bytes - "
+                    f"DRF {result['drf_ms']} ms / {result['drf_peak_kb']} KiB, "
+                    f"rápido {result['fast_ms']} ms / {result['fast_peak_kb']} KiB ({result['speedup']}x), "
+                    f"salida idéntica: {'sí' if result['identical'] else 'NO'}"
+                )
+        if not all(result["identical"] for result in results.values()):
+            raise CommandError("La salida de FastJSONRenderer difiere de la de JSONRenderer.")
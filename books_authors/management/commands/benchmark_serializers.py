@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors.benchmark.serialization import serializer_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el costo por fila de BookSerializer/AuthorSerializer con el de los serializadores "
+        "de solo lectura (consulta + serialización) y verifica que el JSON sea idéntico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Filas por ejecución (default: 1000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones; se toma la mejor (default: 5).")
+        parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON.")
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0 or options["repeat"] <= 0:
+            raise CommandError("--rows y --repeat deben ser positivos.")
+        results = serializer_benchmark(options["rows"], options["repeat"])
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for name, result in results.items():
+                self.stdout.write(
+                    f"{name}: {result['rows']} filas - DRF {result['drf_us_per_row']} µs/fila, "
+                    f"rápido {result['fast_us_per_row']} µs/fila ({result['speedup']}x), "
+                    f"JSON idéntico: {'sí' if result['identical'] else 'NO'}"
+                )
+        if not all(result["identical"] for result in results.values()):
+            raise CommandError("La salida de los serializadores rápidos difiere de la de DRF.")
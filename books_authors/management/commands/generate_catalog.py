@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors.benchmark.catalog import PRESETS, generate_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un catálogo sintético y determinista de autores y libros para benchmarks "
+        "(presets 10k, 100k y 1m, o cantidades explícitas)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", choices=PRESETS, default="10k", help="Tamaño predefinido (default: 10k).")
+        parser.add_argument("--authors", type=int, help="Cantidad de autores (reemplaza al preset).")
+        parser.add_argument("--books", type=int, help="Cantidad de libros (reemplaza al preset).")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla del generador (default: 42).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Filas por lote (default: 5000).")
+
+    def handle(self, *args, **options):
+        authors, books = PRESETS[options["size"]]
+        authors = options["authors"] if options["authors"] is not None else authors
+        books = options["books"] if options["books"] is not None else books
+        if authors <= 0 or books < 0:
+            raise CommandError("Se necesita al menos un autor y una cantidad de libros no negativa.")
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size debe ser positivo.")
+
+        started = time.monotonic()
+
+        def progress(label, done, total):
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f"{label}: {done}/{total} - {elapsed:.1f}s")
+
+        result = generate_catalog(authors, books, seed=options["seed"], batch_size=options["batch_size"],
+                                  progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Catálogo generado en {time.monotonic() - started:.1f}s: {result['authors']} autores, "
+            f"{result['books']} libros y {result['links']} relaciones libro-autor."
+        ))
@@ -0,0 +1,96 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors import cache
+from books_authors.bulk import upsert_authors, upsert_books, validate_authors, validate_books
+from books_authors.importers import FORMATS, iter_records
+from books_authors.stats import rebuild_author_stats
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa autores y libros desde archivos JSON, NDJSON o CSV leyéndolos en streaming "
+        "y haciendo upsert por lotes (autores por id, libros por ISBN)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", help="Archivo de autores.")
+        parser.add_argument("--books", help="Archivo de libros (authors_ids o authors con los ids de autores).")
+        parser.add_argument("--format", choices=FORMATS,
+                            help="Formato de los archivos; por defecto se deduce de la extensión.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Registros por lote (default: 5000).")
+        parser.add_argument("--max-errors", type=int, default=20,
+                            help="Cantidad máxima de errores a mostrar (default: 20).")
+        parser.add_argument("--skip-stats", action="store_true",
+                            help="No reconstruir AuthorStats al final (ejecutar rebuild_author_stats después).")
+
+    def handle(self, *args, **options):
+        if not options["authors"] and not options["books"]:
+            raise CommandError("Indique al menos --authors o --books.")
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size debe ser positivo.")
+        self.max_errors = options["max_errors"]
+        self.shown_errors = 0
+
+        if options["authors"]:
+            self.import_file("autores", options["authors"], options, self.write_authors)
+        if options["books"]:
+            self.import_file("libros", options["books"], options, self.write_books)
+            if not options["skip_stats"]:
+                started = time.monotonic()
+                total = rebuild_author_stats()
+                cache.invalidate(cache.AUTHOR_STATS)
+                self.stdout.write(f"Estadísticas de {total} autores reconstruidas en {time.monotonic() - started:.1f}s.")
+
+    def import_file(self, label, path, options, write):
+        totals = {"created": 0, "updated": 0, "failed": 0}
+        processed = 0
+        started = time.monotonic()
+        try:
+            for batch in batched(iter_records(path, options["format"]), options["batch_size"]):
+                result = write(batch, processed, options["batch_size"])
+                for key in totals:
+                    totals[key] += result[key]
+                processed += len(batch)
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f"{label}: {processed} procesados ({totals['created']} creados, {totals['updated']} "
+                    f"actualizados, {totals['failed']} con error) - {processed / elapsed:.0f} registros/s"
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Error leyendo {path} (registro {processed + 1} aprox.): {exc}")
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {processed} registros en {elapsed:.1f}s ({processed / elapsed:.0f} registros/s); "
+            f"{totals['created']} creados, {totals['updated']} actualizados, {totals['failed']} con error."
+        ))
+        return totals
+
+    def write_authors(self, batch, start, batch_size):
+        valid, errors = validate_authors(batch, start)
+        self.report_errors("autores", errors)
+        result = upsert_authors([data for _, data in valid], batch_size=batch_size)
+        return {**result, "failed": len(errors)}
+
+    def write_books(self, batch, start, batch_size):
+        valid, errors = validate_books(batch, start)
+        self.report_errors("libros", errors)
+        written = upsert_books([data for _, data in valid], batch_size=batch_size, refresh_stats=False)
+        created = sum(1 for _, was_created in written.values() if was_created)
+        return {"created": created, "updated": len(written) - created, "failed": len(errors)}
+
+    def report_errors(self, label, errors):
+        for error in errors:
+            if self.shown_errors >= self.max_errors:
+                return
+            self.shown_errors += 1
+            self.stderr.write(f"{label} #{error['index'] + 1}: {error['errors']}")
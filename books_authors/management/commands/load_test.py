@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors.benchmark.load import load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga: compara los endpoints de lectura síncronos bajo gunicorn (WSGI) con sus "
+        "versiones asíncronas (/api/async/) bajo uvicorn (ASGI) a varios niveles de concurrencia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, action="append", dest="levels",
+                            help="Clientes simultáneos (puede repetirse; default: 1, 8, 32 y 64).")
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests medidos por endpoint y nivel (default: 200).")
+        parser.add_argument("--warmup", type=int, default=2, help="Requests de calentamiento por cliente.")
+        parser.add_argument("--workers", type=int, default=2, help="Workers de gunicorn y de uvicorn (default: 2).")
+        parser.add_argument("--threads", type=int, default=1, help="Hilos por worker de gunicorn (default: 1).")
+        parser.add_argument("--endpoint", action="append", dest="only",
+                            help="Ejecutar solo este endpoint (puede repetirse).")
+        parser.add_argument("--with-cache", action="store_true",
+                            help="Mantener la caché de respuestas activa (por defecto se desactiva).")
+        parser.add_argument("--output", help="Archivo JSON donde guardar el resultado.")
+
+    def handle(self, *args, **options):
+        levels = options["levels"] or [1, 8, 32, 64]
+        if options["requests"] <= 0 or min(levels) <= 0:
+            raise CommandError("--requests y --concurrency deben ser positivos.")
+        try:
+            result = load_test(levels, options["requests"], options["warmup"], options["workers"],
+                               options["threads"], options["with_cache"], options["only"])
+        except (ValueError, RuntimeError) as exc:
+            raise CommandError(str(exc))
+
+        for name, by_level in result["endpoints"].items():
+            self.stdout.write(name)
+            for level, modes in by_level.items():
+                wsgi, asgi = modes["wsgi"], modes["asgi"]
+                self.stdout.write(
+                    f"  c={level:>3}  WSGI {wsgi['throughput_rps']:8.1f} rps  p95 {wsgi['p95_ms']:9.2f} ms  |  "
+                    f"ASGI {asgi['throughput_rps']:8.1f} rps  p95 {asgi['p95_ms']:9.2f} ms  "
+                    f"{sorted(set(wsgi['statuses'] + asgi['statuses']))}"
+                )
+        for mode, peak in result["peak_rss_kb"].items():
+            if peak is not None:
+                self.stdout.write(f"Memoria residente máxima ({mode.upper()}): {peak / 1024:.1f} MiB")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(result, output, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['output']}.")
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books_authors.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = ("Elimina las bajas del feed de cambios más antiguas que la retención; los espejos con un cursor "
+            "anterior reciben 410 y deben sincronizar de nuevo con export.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.CHANGES_TOMBSTONE_RETENTION_DAYS,
+                            help="Días de bajas a conservar (default: CHANGES_TOMBSTONE_RETENTION_DAYS).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} bajas eliminadas."))
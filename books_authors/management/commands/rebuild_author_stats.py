@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from books_authors import cache
+from books_authors.stats import rebuild_author_stats
+
+
+class Command(BaseCommand):
+    help = "Reconstruye por completo la tabla de estadísticas por autor (AuthorStats)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Autores por lote (default: 1000).")
+
+    def handle(self, *args, **options):
+        total = rebuild_author_stats(batch_size=options["batch_size"])
+        cache.invalidate(cache.AUTHOR_STATS)
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas reconstruidas para {total} autores."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from books_authors import cache
+from books_authors.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = "Reconstruye por completo la tabla de conteos de facetas del catálogo (FacetCount)."
+
+    def handle(self, *args, **options):
+        total = rebuild_facet_counts()
+        cache.invalidate(cache.BOOKS)
+        self.stdout.write(self.style.SUCCESS(f"Conteos reconstruidos para {total} valores de faceta."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from books_authors.models import Book
+from books_authors.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recalcula el vector de búsqueda de texto completo de todos los libros (solo PostgreSQL)."
+
+    def handle(self, *args, **options):
+        if connections[Book.objects.db].vendor != "postgresql":
+            self.stdout.write("La búsqueda de texto completo solo está disponible en PostgreSQL; nada que hacer.")
+            return
+        update_search_vectors()
+        self.stdout.write(self.style.SUCCESS(f"Vectores de búsqueda recalculados para {Book.objects.count()} libros."))
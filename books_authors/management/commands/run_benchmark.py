@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books_authors.benchmark.endpoints import run_benchmark
+from books_authors.benchmark.results import compare_results, load_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia (p50/p95/p99), consultas por request y memoria de cada endpoint de lectura "
+        "con el cliente de pruebas de Django o contra un gunicorn local, y compara con una línea base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", choices=("client", "gunicorn"), default="client",
+                            help="Cliente de pruebas en proceso o gunicorn local (default: client).")
+        parser.add_argument("--requests", type=int, default=50, help="Requests medidos por endpoint (default: 50).")
+        parser.add_argument("--warmup", type=int, default=2, help="Requests de calentamiento por endpoint.")
+        parser.add_argument("--workers", type=int, default=2, help="Workers de gunicorn (default: 2).")
+        parser.add_argument("--concurrency", type=int, default=1, help="Clientes simultáneos contra gunicorn.")
+        parser.add_argument("--endpoint", action="append", dest="only",
+                            help="Ejecutar solo este endpoint (puede repetirse).")
+        parser.add_argument("--with-cache", action="store_true",
+                            help="Mantener la caché de respuestas activa (por defecto se desactiva).")
+        parser.add_argument("--output", help="Archivo JSON donde guardar el resultado.")
+        parser.add_argument("--baseline", help="Resultado JSON anterior con el que comparar.")
+        parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Aumento de p95 tolerado respecto de la línea base (default: 0.2 = 20%%).")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Terminar con error si hay regresiones respecto de la línea base.")
+
+    def handle(self, *args, **options):
+        if options["requests"] <= 0:
+            raise CommandError("--requests debe ser positivo.")
+        gunicorn_options = {}
+        if options["target"] == "gunicorn":
+            gunicorn_options = {"workers": options["workers"], "concurrency": options["concurrency"]}
+        try:
+            result = run_benchmark(options["target"], options["requests"], options["warmup"],
+                                   options["with_cache"], options["only"], **gunicorn_options)
+        except (ValueError, RuntimeError) as exc:
+            raise CommandError(str(exc))
+
+        for name, metrics in result["endpoints"].items():
+            queries = metrics["queries_per_request"]
+            # Memoria asignada en un request (client) o residente de gunicorn durante el endpoint.
+            memory = metrics.get("peak_alloc_kb", metrics.get("peak_rss_kb"))
+            self.stdout.write(
+                f"{name:32} p50 {metrics['p50_ms']:9.2f} ms  p95 {metrics['p95_ms']:9.2f} ms  "
+                f"p99 {metrics['p99_ms']:9.2f} ms  "
+                f"{'-' if queries is None else queries:>6} consultas  "
+                f"{'-' if memory is None else f'{memory / 1024:.1f}':>7} MiB  {metrics['statuses']}"
+            )
+        if result["peak_rss_kb"] is not None:
+            self.stdout.write(f"Memoria residente máxima: {result['peak_rss_kb'] / 1024:.1f} MiB")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(result, output, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['output']}.")
+
+        if options["baseline"]:
+            baseline = load_results(options["baseline"])
+            for key in ("target", "database", "books", "authors", "cache"):
+                if baseline["meta"].get(key) != result["meta"].get(key):
+                    self.stdout.write(self.style.WARNING(
+                        f"La línea base difiere en {key}: {baseline['meta'].get(key)} != {result['meta'].get(key)}"
+                    ))
+            regressions = compare_results(result, baseline, options["tolerance"])
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(
+                    f"Regresión en {regression['endpoint']}: {regression['metric']} "
+                    f"{regression['baseline']} -> {regression['current']}"
+                ))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("Sin regresiones respecto de la línea base."))
+            elif options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regresiones respecto de la línea base.")
@@ -0,0 +1,73 @@
+import multiprocessing
+import signal
+from multiprocessing.connection import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from books_authors.jobs import work, worker_name
+
+
+def run_process(stop, poll_interval, burst):
+    work(worker_name(), stop, poll_interval, burst)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los trabajos en segundo plano de la tabla Job (importaciones, exportaciones y "
+        "reconstrucciones). Con --concurrency N inicia N procesos que toman trabajos con "
+        "SELECT ... FOR UPDATE SKIP LOCKED y reemplaza a los que terminan con error. "
+        "SIGTERM/SIGINT detiene los procesos al terminar el trabajo en curso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                            help="Procesos worker (default: JOB_WORKER_CONCURRENCY).")
+        parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL,
+                            help="Segundos de espera con la cola vacía (default: JOB_POLL_INTERVAL).")
+        parser.add_argument("--burst", action="store_true",
+                            help="Terminar cuando no queden trabajos pendientes (para cron o tests).")
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        if concurrency <= 0:
+            raise CommandError("--concurrency debe ser positivo.")
+        # fork: los procesos hijos heredan la configuración de Django ya cargada.
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        previous = {signum: signal.signal(signum, lambda *_: stop.set())
+                    for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            self.supervise(context, stop, options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def supervise(self, context, stop, options):
+        concurrency = options["concurrency"]
+        if concurrency == 1:
+            processed = work(worker_name(), stop, options["poll_interval"], options["burst"])
+            self.stdout.write(self.style.SUCCESS(f"{processed} trabajos ejecutados."))
+            return
+
+        # Cada proceso abre sus propias conexiones; no deben compartir las del padre.
+        connections.close_all()
+        processes = [self.start_process(context, stop, options) for _ in range(concurrency)]
+        self.stdout.write(f"{concurrency} procesos worker iniciados.")
+        while processes:
+            wait([process.sentinel for process in processes])
+            for process in [process for process in processes if not process.is_alive()]:
+                processes.remove(process)
+                process.join()
+                if process.exitcode and not stop.is_set() and not options["burst"]:
+                    self.stderr.write(f"El proceso {process.pid} terminó con código {process.exitcode}; "
+                                      f"se inicia otro.")
+                    processes.append(self.start_process(context, stop, options))
+        self.stdout.write(self.style.SUCCESS("Procesos worker detenidos."))
+
+    @staticmethod
+    def start_process(context, stop, options):
+        process = context.Process(target=run_process, args=(stop, options["poll_interval"], options["burst"]))
+        process.start()
+        return process
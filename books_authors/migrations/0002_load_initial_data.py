@@ -5,8 +5,13 @@ from django.db import migrations
 
 
 def load_data(apps, schema_editor):
+    """
+    Carga los fixtures con upserts en bloque (una sentencia por tabla) en lugar
+    de update_or_create y authors.set() por registro.
+    """
     Author = apps.get_model("books_authors", "Author")
     Book = apps.get_model("books_authors", "Book")
+    BookAuthors = Book.authors.through
 
     base_dir = os.path.dirname(os.path.dirname(__file__))  # books_authors/
     fixtures_dir = os.path.join(base_dir, "fixtures")
@@ -16,30 +21,46 @@ def load_data(apps, schema_editor):
     with open(authors_path, "r", encoding="utf-8") as f:
         authors_data = json.load(f)
 
-    for entry in authors_data:
-        Author.objects.update_or_create(
-            id=entry["id"],
-            defaults={
-                "first_name": entry["first_name"],
-                "last_name": entry["last_name"],
-                "birth_date": entry.get("birth_date"),
-                "bio": entry.get("bio", ""),
-            },
-        )
+    Author.objects.bulk_create(
+        [
+            Author(
+                id=entry["id"],
+                first_name=entry["first_name"],
+                last_name=entry["last_name"],
+                birth_date=entry.get("birth_date"),
+                bio=entry.get("bio", ""),
+            )
+            for entry in authors_data
+        ],
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=["first_name", "last_name", "birth_date", "bio", "updated_at"],
+    )
 
     # ---- LIBROS ----
     books_path = os.path.join(fixtures_dir, "books.json")
     with open(books_path, "r", encoding="utf-8") as f:
         books_data = json.load(f)
 
+    links = []
+    books = []
     for entry in books_data:
         authors_ids = entry.pop("authors", [])
-        book, _ = Book.objects.update_or_create(
-            id=entry["id"],
-            defaults=entry,
-        )
-        if authors_ids:
-            book.authors.set(Author.objects.filter(id__in=authors_ids))
+        books.append(Book(**entry))
+        links.extend(BookAuthors(book_id=entry["id"], author_id=author_id) for author_id in authors_ids)
+
+    Book.objects.bulk_create(
+        books,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[field for field in books_data[0] if field != "id"] + ["updated_at"],
+    )
+    BookAuthors.objects.filter(book_id__in=[book.id for book in books]).delete()
+    known_authors = set(str(pk) for pk in Author.objects.values_list("id", flat=True))
+    BookAuthors.objects.bulk_create(
+        [link for link in links if str(link.author_id) in known_authors],
+        ignore_conflicts=True,
+    )
 
 
 def unload_data(apps, schema_editor):
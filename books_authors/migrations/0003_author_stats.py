@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def build_author_stats(apps, schema_editor):
+    Author = apps.get_model("books_authors", "Author")
+    AuthorStats = apps.get_model("books_authors", "AuthorStats")
+
+    rows = Author.objects.order_by().annotate(
+        total_books=Count("books"),
+        price_sum=Sum("books__price"),
+        min_price=Min("books__price"),
+        max_price=Max("books__price"),
+        total_pages=Sum("books__pages"),
+    ).values("id", "total_books", "price_sum", "min_price", "max_price", "total_pages")
+
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(
+                author_id=row["id"],
+                total_books=row["total_books"],
+                price_sum=row["price_sum"] or 0,
+                min_price=row["min_price"],
+                max_price=row["max_price"],
+                total_pages=row["total_pages"] or 0,
+            )
+            for row in rows.iterator(chunk_size=1000)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_authors', '0002_load_initial_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='books_authors.author', verbose_name='Autor')),
+                ('total_books', models.PositiveIntegerField(default=0, verbose_name='Cantidad de libros')),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Suma de precios')),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Precio mínimo')),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Precio máximo')),
+                ('total_pages', models.PositiveBigIntegerField(default=0, verbose_name='Total de páginas')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'Estadística de autor',
+                'verbose_name_plural': 'Estadísticas de autores',
+                'indexes': [models.Index(fields=['-total_books'], name='books_autho_total_b_f1d873_idx')],
+            },
+        ),
+        migrations.RunPython(build_author_stats, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:25
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# Los índices GIN y pg_trgm solo existen en PostgreSQL; en otros motores
+# (SQLite en pruebas) la búsqueda usa icontains y estas operaciones no hacen nada.
+SEARCH_INDEXES = [
+    ("books_book_search_vector_gin", "books_authors_book USING gin (search_vector)"),
+]
+TRIGRAM_INDEXES = [
+    ("books_book_title_trgm", "books_authors_book USING gin (title gin_trgm_ops)"),
+    ("books_book_genre_trgm", "books_authors_book USING gin (literary_genre gin_trgm_ops)"),
+    ("books_author_last_name_trgm", "books_authors_author USING gin (last_name gin_trgm_ops)"),
+    ("books_author_first_name_trgm", "books_authors_author USING gin (first_name gin_trgm_ops)"),
+]
+
+POPULATE_SQL = """
+UPDATE books_authors_book b SET search_vector =
+    setweight(to_tsvector(%(config)s::regconfig, COALESCE(b.title, '')), 'A')
+    || setweight(to_tsvector('simple'::regconfig, COALESCE(b.isbn, '')), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, COALESCE((
+        SELECT string_agg(a.first_name || ' ' || a.last_name, ' ')
+        FROM books_authors_book_authors ba
+        JOIN books_authors_author a ON a.id = ba.author_id
+        WHERE ba.book_id = b.id
+    ), '')), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, COALESCE(b.literary_genre, '')), 'C')
+    || setweight(to_tsvector(%(config)s::regconfig, COALESCE(b.summary, '')), 'D')
+"""
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    indexes = list(SEARCH_INDEXES)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            indexes += TRIGRAM_INDEXES
+        for name, definition in indexes:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        cursor.execute(POPULATE_SQL, {"config": settings.BOOK_SEARCH_CONFIG})
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name, _ in SEARCH_INDEXES + TRIGRAM_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_authors', '0003_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Vector de búsqueda'),
+        ),
+        migrations.RunPython(create_search_indexes, reverse_code=drop_search_indexes),
+    ]
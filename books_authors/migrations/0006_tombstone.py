@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:54
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_authors', '0005_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('book', 'Libro'), ('author', 'Autor')], max_length=10, verbose_name='Tipo')),
+                ('object_id', models.UUIDField(verbose_name='ID del objeto eliminado')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de eliminación')),
+            ],
+            options={
+                'verbose_name': 'Eliminación',
+                'verbose_name_plural': 'Eliminaciones',
+                'indexes': [models.Index(fields=['kind', 'deleted_at', 'object_id'], name='tombstone_kind_deleted_idx')],
+            },
+        ),
+    ]
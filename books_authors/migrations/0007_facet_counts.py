@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:03
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_facet_counts(apps, schema_editor):
+    # Autocontenida: books_authors.facets describe el esquema actual, no el de esta migración.
+    Book = apps.get_model("books_authors", "Book")
+    FacetCount = apps.get_model("books_authors", "FacetCount")
+    bounds = settings.BOOK_FACET_PRICE_BANDS
+    lower = [0, *bounds]
+    labels = [f"{low}-{high}" for low, high in zip(lower, bounds)] + [f"{lower[-1]}+"]
+
+    def price_band(price):
+        return next((label for label, bound in zip(labels, bounds) if price < bound), labels[-1])
+
+    counts = Counter()
+    rows = Book.objects.values("literary_genre", "language", "price", "published_date")
+    for row in rows.iterator(chunk_size=2000):
+        published_date = row["published_date"]
+        counts.update([
+            ("literary_genre", row["literary_genre"]),
+            ("language", row["language"]),
+            ("price", price_band(row["price"])),
+            ("decade", str(published_date.year // 10 * 10) if published_date else ""),
+        ])
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet=facet, value=value, count=count) for (facet, value), count in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_authors', '0006_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('literary_genre', 'Género literario'), ('language', 'Idioma'), ('price', 'Rango de precio'), ('decade', 'Década de publicación')], max_length=20, verbose_name='Faceta')),
+                ('value', models.CharField(blank=True, max_length=50, verbose_name='Valor')),
+                ('count', models.IntegerField(default=0, verbose_name='Cantidad de libros')),
+            ],
+            options={
+                'verbose_name': 'Conteo de faceta',
+                'verbose_name_plural': 'Conteos de facetas',
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='facet_count_facet_value_uniq')],
+            },
+        ),
+        migrations.RunPython(build_facet_counts, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,176 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:11
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Lower, Trim
+
+# (modelo de la tabla de valores, campo de texto anterior, nueva clave foránea)
+LOOKUPS = [("Genre", "literary_genre_name", "literary_genre"), ("Language", "language_name", "language")]
+
+
+def check_constraints(schema_editor):
+    # PostgreSQL no permite ALTER TABLE con comprobaciones de claves foráneas diferidas pendientes.
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+# El índice de trigramas del género (0004_book_search) pasa de la columna de texto de Book al nombre en
+# Genre. Es de la expresión que usa icontains en PostgreSQL (UPPER(name::text) LIKE ...), que usa
+# Genre.objects.containing (filtro ?literary_genre= y ?genre=). Solo con pg_trgm instalada.
+OLD_GENRE_TRIGRAM_INDEX = ("books_book_genre_trgm", "books_authors_book USING gin (literary_genre gin_trgm_ops)")
+GENRE_TRIGRAM_INDEX = ("books_genre_name_trgm", "books_authors_genre USING gin ((UPPER(name::text)) gin_trgm_ops)")
+
+
+def has_trigram(schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_index(index):
+    def operation(apps, schema_editor):
+        if has_trigram(schema_editor):
+            schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {index[0]} ON {index[1]}")
+    return operation
+
+
+def drop_index(index):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX IF EXISTS {index[0]}")
+    return operation
+
+
+def fill_lookups(apps, schema_editor):
+    """
+    Crea una fila por nombre distinto sin distinguir mayúsculas ni espacios
+    alrededor (con la grafía más usada) y apunta cada libro a la suya.
+    """
+    Book = apps.get_model("books_authors", "Book")
+    for model_name, text_field, foreign_key in LOOKUPS:
+        Lookup = apps.get_model("books_authors", model_name)
+        spellings = {}
+        rows = (Book.objects.annotate(name=Trim(text_field)).values("name").annotate(n=Count("id"))
+                .order_by("name"))
+        for row in rows:
+            spellings.setdefault(row["name"].lower(), Counter())[row["name"]] += row["n"]
+        Lookup.objects.bulk_create([
+            Lookup(name=counts.most_common(1)[0][0]) for _, counts in sorted(spellings.items())
+        ])
+        # Una sola pasada sobre los libros; la subconsulta usa el índice único LOWER(name).
+        match = Lookup.objects.alias(key=Lower("name")).filter(key=Lower(Trim(OuterRef(text_field))))
+        Book.objects.update(**{foreign_key: Subquery(match.values("pk")[:1])})
+    check_constraints(schema_editor)
+
+
+def fill_names(apps, schema_editor):
+    Book = apps.get_model("books_authors", "Book")
+    for model_name, text_field, foreign_key in LOOKUPS:
+        Lookup = apps.get_model("books_authors", model_name)
+        name = Lookup.objects.filter(pk=OuterRef(foreign_key)).values("name")[:1]
+        Book.objects.update(**{text_field: Subquery(name)})
+    check_constraints(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_authors', '0007_facet_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_index(OLD_GENRE_TRIGRAM_INDEX), reverse_code=create_index(OLD_GENRE_TRIGRAM_INDEX)),
+        migrations.CreateModel(
+            name='Genre',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, verbose_name='Nombre')),
+            ],
+            options={
+                'verbose_name': 'Género literario',
+                'verbose_name_plural': 'Géneros literarios',
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='books_authors_genre_name_lower_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Language',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=30, verbose_name='Nombre')),
+            ],
+            options={
+                'verbose_name': 'Idioma',
+                'verbose_name_plural': 'Idiomas',
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='books_authors_language_name_lower_uniq')],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='book',
+            name='book_language_lower_pages_idx',
+        ),
+        # Los textos se conservan con otro nombre hasta copiar los valores.
+        migrations.RenameField(
+            model_name='book',
+            old_name='literary_genre',
+            new_name='literary_genre_name',
+        ),
+        migrations.RenameField(
+            model_name='book',
+            old_name='language',
+            new_name='language_name',
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='literary_genre_name',
+            field=models.CharField(default='', max_length=50, verbose_name='Género literario'),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='language_name',
+            field=models.CharField(default='', max_length=30, verbose_name='Idioma'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='literary_genre',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='books', to='books_authors.genre', verbose_name='Género literario'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='language',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='books', to='books_authors.language', verbose_name='Idioma'),
+        ),
+        migrations.RunPython(fill_lookups, reverse_code=fill_names),
+        migrations.RemoveField(
+            model_name='book',
+            name='literary_genre_name',
+        ),
+        migrations.RemoveField(
+            model_name='book',
+            name='language_name',
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='literary_genre',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='books', to='books_authors.genre', verbose_name='Género literario'),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='language',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='books', to='books_authors.language', verbose_name='Idioma'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['language', 'pages'], name='book_language_pages_idx'),
+        ),
+        migrations.RunPython(create_index(GENRE_TRIGRAM_INDEX), reverse_code=drop_index(GENRE_TRIGRAM_INDEX)),
+    ]
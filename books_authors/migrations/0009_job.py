@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:32
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_authors', '0008_genre_language'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID único')),
+                ('kind', models.CharField(max_length=50, verbose_name='Tipo')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('succeeded', 'Terminado'), ('failed', 'Fallido')], default='pending', max_length=10, verbose_name='Estado')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progreso (%)')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Resultado')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de creación')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de inicio')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Última señal del worker')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de finalización')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+            ],
+            options={
+                'verbose_name': 'Trabajo',
+                'verbose_name_plural': 'Trabajos',
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='job_pending_idx'), models.Index(condition=models.Q(('status', 'running')), fields=['heartbeat_at'], name='job_running_heartbeat_idx'), models.Index(fields=['created_by', '-created_at'], name='job_created_by_idx')],
+            },
+        ),
+    ]
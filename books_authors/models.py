@@ -1,5 +1,10 @@
 import uuid
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class TimeStampedModel(models.Model):
@@ -21,7 +26,11 @@ class Author(TimeStampedModel):
 
     class Meta:
         ordering = ["last_name", "first_name"]
-        indexes = [models.Index(fields=["last_name", "first_name"])]
+        indexes = [
+            models.Index(fields=["last_name", "first_name"]),
+            # Exportación y sincronización incremental (updated_at > watermark ORDER BY updated_at, id)
+            models.Index(fields=["updated_at", "id"], name="author_updated_at_id_idx"),
+        ]
         verbose_name = "Autor"
         verbose_name_plural = "Autores"
 
@@ -29,6 +38,97 @@ class Author(TimeStampedModel):
         return f"{self.last_name}, {self.first_name}"
 
 
+def lookup_key(name):
+    """Clave con la que se comparan los nombres de las tablas de valores."""
+    return name.strip().lower()
+
+
+class LookupQuerySet(models.QuerySet):
+
+    def named(self, name):
+        """Filas cuyo nombre coincide con ``name`` sin distinguir mayúsculas (usa el índice único LOWER(name))."""
+        return self.alias(name_lower=Lower('name')).filter(name_lower=Lower(Value(name.strip())))
+
+    def containing(self, text):
+        return self.filter(name__icontains=text.strip())
+
+
+class LookupManager(models.Manager.from_queryset(LookupQuerySet)):
+
+    def resolve(self, name):
+        """Devuelve la fila llamada ``name`` (sin distinguir mayúsculas), creándola si no existe."""
+        return self.resolve_names([name])[lookup_key(name)]
+
+    def resolve_names(self, names):
+        """
+        Resuelve varios nombres con una consulta (y un INSERT para los nuevos).
+
+        Returns:
+            dict: ``{lookup_key(nombre): fila}``; los nuevos se crean con el
+            primer nombre recibido.
+        """
+        wanted = {}
+        for name in names:
+            wanted.setdefault(lookup_key(name), name.strip())
+        if not wanted:
+            return {}
+        found = self._by_key(wanted)
+        missing = [self.model(name=name) for key, name in wanted.items() if key not in found]
+        if missing:
+            try:
+                with transaction.atomic(using=self.db):
+                    self.bulk_create(missing)
+            except IntegrityError:
+                # Otra transacción creó alguno de los nombres; se crean los que siguen faltando.
+                found = self._by_key(wanted)
+                self.bulk_create([self.model(name=name) for key, name in wanted.items() if key not in found],
+                                 ignore_conflicts=True)
+            found = self._by_key(wanted)
+        return found
+
+    def _by_key(self, wanted):
+        rows = self.alias(name_lower=Lower('name')).filter(name_lower__in=list(wanted))
+        return {lookup_key(row.name): row for row in rows}
+
+
+class LookupModel(models.Model):
+    """
+    Tabla de valores con clave entera pequeña (géneros, idiomas). Los nombres no
+    se repiten sin distinguir mayúsculas; ``objects.resolve(nombre)`` busca o crea.
+    """
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=50, verbose_name="Nombre")
+
+    objects = LookupManager()
+
+    class Meta:
+        abstract = True
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="%(app_label)s_%(class)s_name_lower_uniq"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Genre(LookupModel):
+
+    class Meta(LookupModel.Meta):
+        verbose_name = "Género literario"
+        verbose_name_plural = "Géneros literarios"
+
+
+class Language(LookupModel):
+    DEFAULT = 'Español'
+
+    name = models.CharField(max_length=30, verbose_name="Nombre")
+
+    class Meta(LookupModel.Meta):
+        verbose_name = "Idioma"
+        verbose_name_plural = "Idiomas"
+
+
 class Book(TimeStampedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, verbose_name="ID único")
     title = models.CharField(max_length=200, verbose_name="Título")
@@ -36,16 +136,165 @@ class Book(TimeStampedModel):
     published_date = models.DateField(null=True, blank=True, verbose_name="Fecha de publicación")
     pages = models.PositiveIntegerField(default=0, verbose_name="Páginas")
     price = models.DecimalField(max_digits=8, decimal_places=2, default=0, verbose_name="Precio")
-    language = models.CharField(max_length=30, default='Español', verbose_name="Idioma")
-    literary_genre = models.CharField(max_length=50, verbose_name="Género literario")
+    # Sin índice propio: lo cubre book_language_pages_idx. Sin valor por defecto: la API y la carga
+    # masiva usan Language.DEFAULT cuando no se envía.
+    language = models.ForeignKey(Language, on_delete=models.PROTECT, db_index=False, related_name='books',
+                                 verbose_name="Idioma")
+    literary_genre = models.ForeignKey(Genre, on_delete=models.PROTECT, related_name='books',
+                                       verbose_name="Género literario")
     summary = models.TextField(blank=True, verbose_name="Resumen")
     authors = models.ManyToManyField(Author, related_name='books', verbose_name="Autores")
+    # Mantenido por books_authors.search; los índices GIN se crean en la migración (solo PostgreSQL).
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name="Vector de búsqueda")
 
     class Meta:
         ordering = ["title"]
-        indexes = [models.Index(fields=["title"])]
+        indexes = [
+            models.Index(fields=["title"]),
+            # price_range: rango sobre price; title va en la clave (INCLUDE solo existe en PostgreSQL)
+            models.Index(fields=["price", "title"], name="book_price_title_idx"),
+            # advance_search / export: language_id = %s AND pages >= %s
+            models.Index(fields=["language", "pages"], name="book_language_pages_idx"),
+            # Filtro published_date; los libros sin fecha no ocupan espacio en el índice
+            models.Index(fields=["published_date"], condition=models.Q(published_date__isnull=False),
+                         name="book_published_date_idx"),
+            # Exportación y sincronización incremental (updated_at > watermark ORDER BY updated_at, id)
+            models.Index(fields=["updated_at", "id"], name="book_updated_at_id_idx"),
+        ]
         verbose_name = "Libro"
         verbose_name_plural = "Libros"
 
     def __str__(self):
         return self.title
+
+
+class AuthorStats(models.Model):
+    """
+    Estadísticas desnormalizadas de los libros de cada autor.
+
+    Se mantienen al día desde las señales de Book y de la relación Book.authors
+    (ver books_authors.stats) y se reconstruyen con ``manage.py rebuild_author_stats``.
+    """
+    author = models.OneToOneField(Author, primary_key=True, on_delete=models.CASCADE, related_name='stats',
+                                  verbose_name="Autor")
+    total_books = models.PositiveIntegerField(default=0, verbose_name="Cantidad de libros")
+    price_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Suma de precios")
+    min_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True,
+                                    verbose_name="Precio mínimo")
+    max_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True,
+                                    verbose_name="Precio máximo")
+    total_pages = models.PositiveBigIntegerField(default=0, verbose_name="Total de páginas")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
+
+    class Meta:
+        indexes = [models.Index(fields=["-total_books"])]
+        verbose_name = "Estadística de autor"
+        verbose_name_plural = "Estadísticas de autores"
+
+    def __str__(self):
+        return f"{self.author}: {self.total_books} libros"
+
+    @property
+    def avg_price(self):
+        return self.price_sum / self.total_books if self.total_books else 0
+
+
+class FacetCount(models.Model):
+    """
+    Cantidad de libros por valor de cada faceta en todo el catálogo.
+
+    Se mantiene desde las señales de Book y desde ``bulk.upsert_books`` (ver
+    books_authors.facets) y se reconstruye con ``manage.py rebuild_facet_counts``.
+    """
+    GENRE = 'literary_genre'
+    LANGUAGE = 'language'
+    PRICE = 'price'
+    DECADE = 'decade'
+    FACET_CHOICES = [(GENRE, 'Género literario'), (LANGUAGE, 'Idioma'), (PRICE, 'Rango de precio'),
+                     (DECADE, 'Década de publicación')]
+
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES, verbose_name="Faceta")
+    value = models.CharField(max_length=50, blank=True, verbose_name="Valor")
+    count = models.IntegerField(default=0, verbose_name="Cantidad de libros")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["facet", "value"], name="facet_count_facet_value_uniq")]
+        verbose_name = "Conteo de faceta"
+        verbose_name_plural = "Conteos de facetas"
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class Tombstone(models.Model):
+    """
+    Libro o autor eliminado, para que el feed de cambios (books_authors.changes)
+    informe las bajas.
+
+    Se crea desde las señales post_delete y se purga con ``manage.py prune_tombstones``.
+    """
+    BOOK = 'book'
+    AUTHOR = 'author'
+    KIND_CHOICES = [(BOOK, 'Libro'), (AUTHOR, 'Autor')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Tipo")
+    object_id = models.UUIDField(verbose_name="ID del objeto eliminado")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de eliminación")
+
+    class Meta:
+        indexes = [
+            # Feed de cambios: kind = %s AND (deleted_at, object_id) > cursor ORDER BY deleted_at, object_id
+            models.Index(fields=["kind", "deleted_at", "object_id"], name="tombstone_kind_deleted_idx"),
+        ]
+        verbose_name = "Eliminación"
+        verbose_name_plural = "Eliminaciones"
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} ({self.deleted_at:%Y-%m-%d %H:%M})"
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano (importación, exportación o reconstrucción) que
+    ejecuta ``manage.py run_worker`` (ver books_authors.jobs).
+
+    Un worker lo toma pasando de ``pending`` a ``running`` y mientras lo ejecuta
+    renueva ``heartbeat_at``; si el worker muere, otro lo retoma cuando
+    ``heartbeat_at`` queda atrás más de ``JOB_STALE_SECONDS``.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pendiente'), (RUNNING, 'En ejecución'), (SUCCEEDED, 'Terminado'),
+                      (FAILED, 'Fallido')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, verbose_name="ID único")
+    kind = models.CharField(max_length=50, verbose_name="Tipo")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parámetros")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="Estado")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Progreso (%)")
+    result = models.JSONField(null=True, blank=True, verbose_name="Resultado")
+    error = models.TextField(blank=True, verbose_name="Error")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Intentos")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+                                   related_name='jobs', verbose_name="Creado por")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de creación")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de inicio")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Última señal del worker")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de finalización")
+
+    class Meta:
+        indexes = [
+            # Cola: status = 'pending' ORDER BY created_at (solo las filas pendientes)
+            models.Index(fields=["created_at"], condition=Q(status="pending"), name="job_pending_idx"),
+            # Trabajos de workers caídos: status = 'running' AND heartbeat_at < %s
+            models.Index(fields=["heartbeat_at"], condition=Q(status="running"), name="job_running_heartbeat_idx"),
+            models.Index(fields=["created_by", "-created_at"], name="job_created_by_idx"),
+        ]
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.status})"
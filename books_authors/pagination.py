@@ -0,0 +1,252 @@
+import base64
+import binascii
+import json
+from functools import partial
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .async_db import gather_queries
+
+
+class CountedPaginator(DjangoPaginator):
+    """Paginator de Django que usa una cantidad de filas ya conocida en lugar de consultar ``COUNT(*)``."""
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Paginación por número de página con un modo keyset (cursor) opcional.
+
+    Por defecto se comporta como PageNumberPagination. Si el cliente envía
+    ``?pagination=cursor`` o un ``?cursor=``, la página se obtiene buscando
+    a partir de la última fila vista sobre ``keyset_ordering`` en lugar de
+    usar ``COUNT(*)`` + ``OFFSET``, de modo que el costo es O(page_size)
+    sin importar la profundidad. En este modo la respuesta no incluye ``count``.
+
+    Las vistas pueden definir ``get_keyset_ordering()`` para usar otro orden
+    en una acción concreta; debe terminar en una columna única.
+
+    Query params:
+        - page_size: tamaño de página elegido por el cliente (máximo ``max_page_size``)
+        - pagination: ``cursor`` para activar el modo keyset
+        - cursor: posición opaca devuelta en ``next``/``previous``
+
+    En modo por número de página, si la vista ya contó las filas
+    (``conditional_rows``, books_authors.conditional) no se vuelven a contar.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    keyset_ordering = ('id',)
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.is_keyset_mode(request)
+        if not self.keyset_mode:
+            count = getattr(view, 'conditional_rows', None)
+            self.django_paginator_class = partial(CountedPaginator, count=count)
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset, page_size, position, reverse = self._keyset_query(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._keyset_page(list(queryset[:page_size + 1]), page_size, position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Versión asíncrona de paginate_queryset para las vistas ASGI.
+
+        En modo por número de página el ``COUNT(*)`` y la página se consultan a
+        la vez (books_authors.async_db.gather_queries).
+        """
+        self.keyset_mode = self.is_keyset_mode(request)
+        if self.keyset_mode:
+            queryset, page_size, position, reverse = self._keyset_query(queryset, request, view)
+            if queryset is None:
+                return None
+            rows = [row async for row in queryset[:page_size + 1]]
+            return self._keyset_page(rows, page_size, position, reverse)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class([], page_size)
+        last_page = False
+        page_number = request.query_params.get(self.page_query_param) or 1
+        if page_number in self.last_page_strings:
+            # La última página depende del total: aquí las consultas no se pueden solapar.
+            paginator.count = await queryset.acount()
+            page_number = paginator.num_pages
+            last_page = True
+        try:
+            page_number = int(page_number)
+            if page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            # validate_number() no sirve todavía: calcularía num_pages con count=0.
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=paginator.error_messages['invalid_page']))
+
+        offset = (page_number - 1) * page_size
+        if last_page:
+            rows = [row async for row in queryset[offset:offset + page_size]]
+        else:
+            paginator.count, rows = await gather_queries(
+                queryset.count, lambda: list(queryset[offset:offset + page_size]))
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = rows
+        self.request = request
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+    def is_keyset_mode(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def _keyset_query(self, queryset, request, view):
+        """Devuelve (queryset ordenado y filtrado desde el cursor, page_size, posición, reverse)."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None, None, None, False
+
+        get_ordering = getattr(view, 'get_keyset_ordering', None)
+        self.ordering = tuple((get_ordering() if get_ordering else None) or self.keyset_ordering)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering if not reverse else tuple(_invert(field) for field in self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                position = self._position_values(queryset, position)
+                queryset = queryset.filter(self._seek_filter(position, ordering))
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset, page_size, position, reverse
+
+    def _position_values(self, queryset, position):
+        """Convierte cada valor del cursor con el campo de su columna del orden (modelo o anotación)."""
+        values = []
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            annotation = queryset.query.annotations.get(name)
+            model_field = annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+            if value is None or isinstance(value, (dict, list)):
+                raise ValueError(value)
+            values.append(model_field.to_python(value))
+        return values
+
+    def _keyset_page(self, rows, page_size, position, reverse):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Si se llegó con un cursor, existe al menos una página en la dirección contraria.
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.first_position = self._position(rows[0]) if rows else None
+        self.last_position = self._position(rows[-1]) if rows else None
+        self.display_page_controls = False
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self._cursor_url(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._cursor_url(self.first_position, reverse=True)
+
+    def decode_cursor(self, request):
+        """Devuelve la tupla (posición, reverse) codificada en el cursor, o (None, False)."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def _cursor_url(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def _position(self, item):
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(item, dict):
+            return [item[name] for name in names]
+        return [getattr(item, name) for name in names]
+
+    @staticmethod
+    def _seek_filter(position, ordering):
+        """
+        Construye la condición "fila > posición" para un orden compuesto:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {ordering[i].lstrip('-'): position[i] for i in range(index)}
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[index]})
+        return condition
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class BookPagination(KeysetPagination):
+    """Paginación de libros; el modo keyset usa el índice de ``title`` con ``id`` como desempate."""
+    keyset_ordering = ('title', 'id')
+
+
+class AuthorPagination(KeysetPagination):
+    """Paginación de autores; el modo keyset usa el índice de ``last_name, first_name``."""
+    keyset_ordering = ('last_name', 'first_name', 'id')
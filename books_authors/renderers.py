@@ -0,0 +1,65 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el módulo json de la biblioteca estándar.
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson cuando está instalado.
+
+    orjson serializa de forma nativa UUID, datetime/date (con ``Z`` para UTC,
+    como DRF) y las subclases de dict/list que devuelve DRF; los Decimal y los
+    demás tipos pasan por el ``default`` del JSONEncoder de DRF, así que la
+    salida es la misma que la de JSONRenderer en formato compacto. Con sangría
+    (``; indent=`` o la API navegable), con ``COMPACT_JSON`` desactivado, sin
+    orjson o ante un valor que orjson no admite (enteros de más de 64 bits,
+    claves que no son texto) se usa el renderer de DRF.
+    """
+    _default = staticmethod(encoders.JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not self.compact or self.ensure_ascii or self.get_indent(
+                accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self._default, option=orjson.OPT_UTC_Z)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Igual que DRF: \u2028 y \u2029 se escapan para que el JSON sea un subconjunto de JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Renderer para acciones que devuelven su propio StreamingHttpResponse.
+
+    Solo habilita la negociación de contenido (``Accept`` o ``?format=``);
+    el cuerpo lo genera la vista. Las respuestas de error se renderizan como JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(self.charset)
+
+
+class NDJSONRenderer(PassthroughRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
@@ -0,0 +1,98 @@
+"""
+Búsqueda de libros con texto completo y trigramas de PostgreSQL.
+
+``Book.search_vector`` guarda un tsvector con el título, el ISBN, los nombres
+de los autores, el género y el resumen (indexado con GIN), y los índices
+``gin_trgm_ops`` de pg_trgm permiten coincidencias aproximadas en títulos y
+nombres de autores. En otros motores (SQLite en pruebas) la búsqueda vuelve al
+``SearchFilter`` de DRF con ``icontains``.
+"""
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Exists, F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+from rest_framework import filters
+
+from .models import Author, Book, Genre
+
+_trigram_available = {}
+
+
+def is_postgresql(alias):
+    return connections[alias].vendor == 'postgresql'
+
+
+def has_trigram(alias):
+    """Indica si la extensión pg_trgm está instalada en la base de datos (se consulta una vez)."""
+    if alias not in _trigram_available:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[alias] = cursor.fetchone() is not None
+    return _trigram_available[alias]
+
+
+def search_vector_expression():
+    config = settings.BOOK_SEARCH_CONFIG
+    author_names = Subquery(
+        Book.authors.through.objects.filter(book_id=OuterRef('pk'))
+        .values('book_id')
+        .annotate(names=StringAgg(
+            Concat('author__first_name', Value(' '), 'author__last_name', output_field=TextField()),
+            delimiter=' ', output_field=TextField()))
+        .values('names')[:1]
+    )
+    genre_name = Subquery(Genre.objects.filter(pk=OuterRef('literary_genre')).values('name')[:1])
+    return (
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('isbn', weight='A', config='simple')
+        + SearchVector(Coalesce(author_names, Value(''), output_field=TextField()), weight='B', config=config)
+        + SearchVector(Coalesce(genre_name, Value(''), output_field=TextField()), weight='C', config=config)
+        + SearchVector('summary', weight='D', config=config)
+    )
+
+
+def update_search_vectors(book_ids=None, batch_size=1000):
+    """
+    Recalcula ``search_vector`` de los libros indicados (o de todos si es None).
+
+    No hace nada fuera de PostgreSQL. Usa ``update()``, que no emite señales.
+    """
+    alias = Book.objects.db
+    if not is_postgresql(alias):
+        return
+    if book_ids is None:
+        Book.objects.update(search_vector=search_vector_expression())
+        return
+    book_ids = list(dict.fromkeys(book_id for book_id in book_ids if book_id is not None))
+    for start in range(0, len(book_ids), batch_size):
+        Book.objects.filter(id__in=book_ids[start:start + batch_size]).update(
+            search_vector=search_vector_expression())
+
+
+class BookSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter para libros que en PostgreSQL usa el índice de texto completo.
+
+    Un libro coincide si su ``search_vector`` satisface la consulta (sintaxis
+    websearch: frases entre comillas, ``-palabra``, ``or``), si el ISBN es
+    exacto o, con pg_trgm, si el título o el nombre de un autor se parecen al
+    texto buscado. Los resultados se ordenan por relevancia (``search_rank``).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not is_postgresql(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        text = ' '.join(terms)
+        query = SearchQuery(text, config=settings.BOOK_SEARCH_CONFIG, search_type='websearch')
+        condition = Q(search_vector=query) | Q(isbn=text)
+        rank = SearchRank(F('search_vector'), query)
+        if has_trigram(queryset.db):
+            similar_authors = Author.objects.filter(books=OuterRef('pk')).filter(
+                Q(last_name__trigram_word_similar=text) | Q(first_name__trigram_word_similar=text))
+            condition |= Q(title__trigram_word_similar=text) | Exists(similar_authors)
+            rank = rank + TrigramWordSimilarity(text, 'title')
+        return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', 'title', 'id')
@@ -1,8 +1,137 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from .models import Author, Book
 
+from core import metrics
+from core.ttl_cache import TTLCache
+from .models import Author, Book, Genre, Language
+
+# Ids de autores que existen, en memoria del proceso (ver AuthorIdsField).
+author_id_cache = TTLCache(settings.AUTHOR_ID_CACHE_SIZE, settings.AUTHOR_ID_CACHE_TTL)
+
+AUTHOR_ID_CACHE = metrics.Counter('author_id_cache_total', 'Ids de autores buscados en la caché al validar libros.',
+                                  ('result',))
+metrics.REGISTRY.append(AUTHOR_ID_CACHE)
+
+
+def isbn_check_digit_ok(isbn):
+    """
+    Indica si ``isbn`` es un ISBN-10 o ISBN-13 (sin guiones) con dígito de
+    control correcto. En ISBN-10 el último carácter puede ser 'X' (10).
+    """
+    if len(isbn) == 13 and isbn.isdigit():
+        return sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(isbn)) % 10 == 0
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] in 'Xx'):
+        digits = [int(digit) for digit in isbn[:9]] + [10 if isbn[9] in 'Xx' else int(isbn[9])]
+        return sum(digit * weight for digit, weight in zip(digits, range(10, 0, -1))) % 11 == 0
+    return False
+
+
+class TimedSerializerMixin:
+    """Suma el tiempo de ``.data`` a la métrica ``serializer`` del request (core.metrics)."""
+
+    @property
+    def data(self):
+        with metrics.timed('serializer'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
 
-class AuthorSerializer(serializers.ModelSerializer):
+
+class LookupNameField(serializers.SlugRelatedField):
+    """
+    Clave foránea a una tabla de valores (Genre, Language) que se lee y se
+    escribe por nombre. La validación devuelve el nombre sin espacios alrededor;
+    el serializador lo resuelve a su fila al guardar (``resolve_lookups``), así
+    que un request inválido no crea filas. Un nombre nuevo crea la fila; uno
+    existente con otras mayúsculas reutiliza la que ya hay.
+    """
+    default_error_messages = {
+        'invalid': 'Se esperaba un texto no vacío.',
+        'max_length': 'Asegúrese de que este campo no tenga más de {max_length} caracteres.',
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'name')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data.strip():
+            self.fail('invalid')
+        max_length = self.get_queryset().model._meta.get_field('name').max_length
+        if len(data.strip()) > max_length:
+            self.fail('max_length', max_length=max_length)
+        return data.strip()
+
+
+class AuthorIdsField(serializers.ManyRelatedField):
+    """
+    Lista de ids de autores que se valida con una sola consulta ``id__in``
+    (``PrimaryKeyRelatedField(many=True)`` hace una por id) y devuelve los ids,
+    que es lo que recibe ``book.authors.set()``.
+
+    Los ids que existen se guardan en ``author_id_cache``, acotada por
+    ``AUTHOR_ID_CACHE_SIZE`` entradas y ``AUTHOR_ID_CACHE_TTL`` segundos, así que
+    los autores ya vistos no se vuelven a consultar. La entrada se borra al
+    eliminar el autor (books_authors.signals); los demás procesos lo ven como
+    mucho ``AUTHOR_ID_CACHE_TTL`` segundos después y, mientras tanto, guardar un
+    libro con ese autor falla por la clave foránea (ver ``check_saved``).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('child_relation', serializers.PrimaryKeyRelatedField(queryset=Author.objects.all()))
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        pk_field = self.child_relation.get_queryset().model._meta.pk
+        submitted = {}
+        for item in data:
+            try:
+                submitted.setdefault(pk_field.to_python(item), item)
+            except (DjangoValidationError, TypeError, ValueError, AttributeError):
+                # El mismo error que PrimaryKeyRelatedField, sin consultar la base de datos.
+                self.child_relation.to_internal_value(item)
+
+        unknown = [pk for pk in submitted if author_id_cache.get(pk) is None]
+        AUTHOR_ID_CACHE.inc(('hit',), len(submitted) - len(unknown))
+        AUTHOR_ID_CACHE.inc(('miss',), len(unknown))
+        if unknown:
+            found = set(self.child_relation.get_queryset().filter(pk__in=unknown).values_list('pk', flat=True))
+            for pk in unknown:
+                if pk not in found:
+                    self.child_relation.fail('does_not_exist', pk_value=submitted[pk])
+                author_id_cache.set(pk, True)
+        return list(submitted)
+
+    @contextmanager
+    def check_saved(self, author_ids):
+        """
+        Convierte el error de clave foránea de un autor eliminado en otro proceso
+        mientras su id seguía en la caché en un error de validación de este campo.
+        """
+        try:
+            yield
+        except IntegrityError:
+            existing = set(Author.objects.filter(pk__in=author_ids).values_list('pk', flat=True))
+            missing = [pk for pk in author_ids if pk not in existing]
+            if not missing:
+                raise
+            for pk in missing:
+                author_id_cache.pop(pk)
+            message = self.child_relation.error_messages['does_not_exist'].format(pk_value=missing[0])
+            raise serializers.ValidationError({self.field_name: [message]})
+
+
+class AuthorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Author que maneja la conversión entre instancias de Author y datos JSON.
 
@@ -18,9 +147,10 @@ class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Author
         fields = ['id', 'first_name', 'last_name', 'birth_date', 'bio', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Book que maneja la conversión entre instancias de Book y datos JSON.
 
@@ -35,22 +165,82 @@ class BookSerializer(serializers.ModelSerializer):
         - language: Idioma del libro
         - summary: Resumen del libro
         - authors: Serializador anidado que muestra detalles del autor (solo lectura)
-        - authors_ids: Lista de IDs de autores para crear/actualizar relaciones libro-autor (solo escritura)
+        - authors_ids: Lista de IDs de autores para crear/actualizar relaciones libro-autor (solo escritura;
+          se validan con una sola consulta, ver AuthorIdsField)
 
     El serializador proporciona un método create personalizado para manejar la relación 
     muchos a muchos entre libros y autores.
     """
+    literary_genre = LookupNameField(queryset=Genre.objects.all())
+    language = LookupNameField(queryset=Language.objects.all(), required=False)
     authors = AuthorSerializer(many=True, read_only=True)
-    authors_ids = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Author.objects.all(), write_only=True, source="authors")
+    authors_ids = AuthorIdsField(write_only=True, source="authors")
 
     class Meta:
         model = Book
         fields = ['id', 'title', 'isbn', 'published_date', 'literary_genre', 'pages', 'price', 'language', 'summary', 'authors',
                   'authors_ids', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
 
     def create(self, validated_data):
         authors = validated_data.pop('authors', [])
-        book = Book.objects.create(**validated_data)
-        book.authors.set(authors)
-        return book
\ No newline at end of file
+        validated_data.setdefault('language', Language.DEFAULT)
+        with self.fields['authors_ids'].check_saved(authors), transaction.atomic():
+            book = Book.objects.create(**self.resolve_lookups(validated_data))
+            book.authors.set(authors)
+        return book
+
+    def update(self, instance, validated_data):
+        with self.fields['authors_ids'].check_saved(validated_data.get('authors', [])), transaction.atomic():
+            return super().update(instance, self.resolve_lookups(validated_data))
+
+    def resolve_lookups(self, validated_data):
+        """Reemplaza los nombres de género e idioma por sus filas, creándolas si no existen."""
+        for name in ('literary_genre', 'language'):
+            if name in validated_data:
+                model = self.fields[name].get_queryset().model
+                validated_data[name] = model.objects.resolve(validated_data[name])
+        return validated_data
+
+
+class BookBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Serializador de validación para cada elemento de la carga masiva de libros.
+
+    A diferencia de BookSerializer no consulta la base de datos: ``authors_ids``
+    se valida solo como lista de UUIDs (los autores se resuelven luego en una
+    única consulta para todo el lote) y el ISBN no exige unicidad porque el
+    libro existente se actualiza. El ``id`` es opcional y solo se usa al crear.
+    ``literary_genre`` y ``language`` se validan como texto y se resuelven a
+    sus filas (Genre, Language) en bloque al escribir. El ISBN debe ser un
+    ISBN-10 o ISBN-13 con dígito de control correcto.
+    """
+    id = serializers.UUIDField(required=False)
+    literary_genre = serializers.CharField(max_length=Genre._meta.get_field('name').max_length)
+    language = serializers.CharField(max_length=Language._meta.get_field('name').max_length, required=False)
+    authors_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+
+    class Meta:
+        model = Book
+        fields = ['id', 'title', 'isbn', 'published_date', 'literary_genre', 'pages', 'price', 'language', 'summary',
+                  'authors_ids']
+        extra_kwargs = {'isbn': {'validators': []}}
+
+    def validate_isbn(self, value):
+        if not isbn_check_digit_ok(value):
+            raise serializers.ValidationError('ISBN inválido: se esperaba un ISBN-10 o ISBN-13 con dígito de control '
+                                              'correcto.')
+        return value.upper()
+
+
+class AuthorBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Serializador de validación para la carga masiva de autores.
+
+    El ``id`` es opcional: si se envía, el autor con ese id se crea o se actualiza.
+    """
+    id = serializers.UUIDField(required=False)
+
+    class Meta:
+        model = Author
+        fields = ['id', 'first_name', 'last_name', 'birth_date', 'bio']
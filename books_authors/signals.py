@@ -0,0 +1,218 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache
+from .facets import SOURCE_FIELDS as FACET_FIELDS, apply_changes, book_facet_values, facet_values, rename_value
+from .models import Author, Book, FacetCount, Genre, Language, Tombstone
+from .search import update_search_vectors
+from .serializers import author_id_cache
+from .stats import refresh_author_stats
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_cache(sender, **kwargs):
+    cache.invalidate(cache.BOOKS, cache.AUTHOR_STATS)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_author_cache(sender, **kwargs):
+    # Los libros embeben a sus autores, así que también se invalidan.
+    cache.invalidate(cache.AUTHORS, cache.BOOKS, cache.AUTHOR_STATS)
+
+
+@receiver(post_delete, sender=Author)
+def forget_author_id(sender, instance, **kwargs):
+    author_id_cache.pop(instance.pk)
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def invalidate_book_authors_cache(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.invalidate(cache.BOOKS, cache.AUTHOR_STATS)
+
+
+# --- Bajas para el feed de cambios (books_authors.changes) ---
+
+@receiver(post_delete, sender=Book)
+def record_book_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=Tombstone.BOOK, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Author)
+def record_author_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=Tombstone.AUTHOR, object_id=instance.pk)
+
+
+# --- updated_at de los libros cuyos autores cambian ---
+# updated_at versiona la representación del libro (ETag, ?updated_since=), que incluye sus autores.
+
+def touch_books(book_ids):
+    book_ids = [book_id for book_id in book_ids if book_id is not None]
+    if book_ids:
+        Book.objects.filter(pk__in=book_ids).update(updated_at=timezone.now())
+
+
+# Los libros de un autor que se elimina, o cuyos libros se quitan con author.books.clear(), se leen una
+# sola vez antes del cambio; después los usan touch_books y update_search_vectors.
+
+@receiver(pre_delete, sender=Author)
+def track_author_books(sender, instance, **kwargs):
+    instance._author_book_ids = list(instance.books.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def track_cleared_author_books(sender, instance, action, reverse, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._author_book_ids = list(instance.books.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def touch_books_on_authors_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch_books([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        touch_books(pk_set)
+    elif action == 'post_clear':
+        touch_books(getattr(instance, '_author_book_ids', []))
+
+
+@receiver(post_save, sender=Author)
+def touch_books_on_author_save(sender, instance, created, **kwargs):
+    if not created:
+        Book.objects.filter(authors=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Author)
+def touch_books_on_author_delete(sender, instance, **kwargs):
+    touch_books(getattr(instance, '_author_book_ids', []))
+
+
+# --- Género e idioma renombrados ---
+# Los libros los muestran por nombre: cambian su representación, su vector de búsqueda y las facetas.
+
+LOOKUP_FIELDS = {Genre: FacetCount.GENRE, Language: FacetCount.LANGUAGE}
+
+
+@receiver(pre_save, sender=Genre)
+@receiver(pre_save, sender=Language)
+def track_lookup_name(sender, instance, **kwargs):
+    instance._previous_name = None
+    if not instance._state.adding:
+        instance._previous_name = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Language)
+def update_books_on_lookup_rename(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_name', None)
+    if created or previous is None or previous == instance.name:
+        return
+    field = LOOKUP_FIELDS[sender]
+    book_ids = list(Book.objects.filter(**{field: instance}).values_list('id', flat=True))
+    touch_books(book_ids)
+    if sender is Genre:
+        update_search_vectors(book_ids)
+    rename_value(field, previous, instance.name)
+    cache.invalidate(cache.BOOKS)
+
+
+# --- Estadísticas por autor (AuthorStats) y conteos de facetas (FacetCount) ---
+
+@receiver(pre_save, sender=Book)
+def track_book_stats_fields(sender, instance, update_fields=None, **kwargs):
+    """
+    Marca el libro si cambió un campo que afecta las estadísticas de sus autores
+    y guarda los valores de faceta anteriores, con una sola consulta.
+    """
+    instance._stats_changed = False
+    instance._previous_facets = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'price', 'pages', *FACET_FIELDS} & set(update_fields):
+        return
+    previous = Book.objects.filter(pk=instance.pk).values('pages', *FACET_FIELDS).first()
+    instance._stats_changed = previous is None or (
+        previous['price'] != instance.price or previous['pages'] != instance.pages
+    )
+    if previous is not None:
+        instance._previous_facets = facet_values(previous)
+
+
+@receiver(post_save, sender=Book)
+def update_facets_on_book_save(sender, instance, created, **kwargs):
+    if created:
+        apply_changes(added=[book_facet_values(instance)])
+    elif getattr(instance, '_previous_facets', None) is not None:
+        apply_changes(removed=[instance._previous_facets], added=[book_facet_values(instance)])
+
+
+@receiver(post_delete, sender=Book)
+def update_facets_on_book_delete(sender, instance, **kwargs):
+    apply_changes(removed=[book_facet_values(instance)])
+
+
+@receiver(post_save, sender=Book)
+def update_stats_on_book_save(sender, instance, created, **kwargs):
+    # Un libro recién creado todavía no tiene autores; se contabiliza al asignarlos.
+    if not created and getattr(instance, '_stats_changed', False):
+        refresh_author_stats(instance.authors.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Book)
+def track_book_authors_on_delete(sender, instance, **kwargs):
+    instance._stats_author_ids = list(instance.authors.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Book)
+def update_stats_on_book_delete(sender, instance, **kwargs):
+    refresh_author_stats(getattr(instance, '_stats_author_ids', []))
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def update_stats_on_authors_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._stats_author_ids = [instance.pk]
+        else:
+            instance._stats_author_ids = list(instance.authors.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        refresh_author_stats([instance.pk] if reverse else pk_set)
+    elif action == 'post_clear':
+        refresh_author_stats(getattr(instance, '_stats_author_ids', []))
+
+
+# --- Vector de búsqueda de texto completo ---
+
+SEARCH_FIELDS = {'title', 'isbn', 'literary_genre', 'summary'}
+
+
+@receiver(post_save, sender=Book)
+def update_search_on_book_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        update_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Author)
+def update_search_on_author_save(sender, instance, created, **kwargs):
+    if not created:
+        update_search_vectors(instance.books.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Author)
+def update_search_on_author_delete(sender, instance, **kwargs):
+    update_search_vectors(getattr(instance, '_author_book_ids', []))
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def update_search_on_authors_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            update_search_vectors([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        update_search_vectors(pk_set)
+    elif action == 'post_clear':
+        update_search_vectors(getattr(instance, '_author_book_ids', []))
@@ -0,0 +1,78 @@
+"""
+Mantenimiento de la tabla desnormalizada AuthorStats.
+
+``refresh_author_stats`` recalcula solo los autores afectados por un cambio
+(con una consulta agregada acotada a esos autores y un upsert), y
+``rebuild_author_stats`` recalcula la tabla completa por lotes.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+
+from .models import Author, AuthorStats
+
+STATS_FIELDS = ['total_books', 'price_sum', 'min_price', 'max_price', 'total_pages']
+
+
+def _aggregate(authors):
+    return authors.order_by().annotate(
+        total_books=Count('books'),
+        price_sum=Sum('books__price'),
+        min_price=Min('books__price'),
+        max_price=Max('books__price'),
+        total_pages=Sum('books__pages'),
+    ).values('id', *STATS_FIELDS)
+
+
+def _build(rows):
+    return [
+        AuthorStats(
+            author_id=row['id'],
+            total_books=row['total_books'],
+            price_sum=row['price_sum'] or 0,
+            min_price=row['min_price'],
+            max_price=row['max_price'],
+            total_pages=row['total_pages'] or 0,
+        )
+        for row in rows
+    ]
+
+
+def _upsert(stats):
+    AuthorStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=['author'],
+        update_fields=STATS_FIELDS + ['updated_at'],
+    )
+
+
+def refresh_author_stats(author_ids, batch_size=1000):
+    """
+    Recalcula las estadísticas de los autores indicados.
+
+    Args:
+        author_ids: IDs de los autores cuyos libros cambiaron.
+        batch_size: autores por consulta agregada.
+    """
+    author_ids = sorted({author_id for author_id in author_ids if author_id is not None}, key=str)
+    for start in range(0, len(author_ids), batch_size):
+        batch = author_ids[start:start + batch_size]
+        _upsert(_build(_aggregate(Author.objects.filter(id__in=batch))))
+
+
+def rebuild_author_stats(batch_size=1000):
+    """
+    Reconstruye la tabla AuthorStats completa.
+
+    Returns:
+        int: cantidad de autores procesados.
+    """
+    total = 0
+    with transaction.atomic():
+        AuthorStats.objects.all().delete()
+        ids = list(Author.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(ids), batch_size):
+            stats = _build(_aggregate(Author.objects.filter(id__in=ids[start:start + batch_size])))
+            AuthorStats.objects.bulk_create(stats, batch_size=batch_size)
+            total += len(stats)
+    return total
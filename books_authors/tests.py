@@ -1,20 +1,87 @@
+import csv
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
 import pytest
-from django.db.models import Count
-from rest_framework import status
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, F, Max, Min, Sum
+from django.test import AsyncClient, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from books_authors.models import Author, Book
-from books_authors.serializers import AuthorSerializer
+from django.contrib.auth.models import Group
+from books_authors.benchmark.catalog import generate_catalog
+from books_authors.benchmark.load import load_test_endpoints
+from books_authors.benchmark.results import compare_results
+from books_authors.cache import BOOKS, cached_response
+from books_authors.facets import facet_counts, summary_counts
+from books_authors.fast_serializers import FastAuthorSerializer, FastBookSerializer
+from books_authors.jobs import JOB_TYPES, JobType, claim_job
+from books_authors.changes import encode_cursor
+from books_authors.pagination import BookPagination, KeysetPagination
+from books_authors.models import Author, AuthorStats, Book, FacetCount, Genre, Job, Language, Tombstone
+from books_authors.renderers import FastJSONRenderer
+from books_authors.search import has_trigram
+from books_authors.serializers import (AUTHOR_ID_CACHE, AuthorSerializer, BookSerializer, author_id_cache,
+                                      isbn_check_digit_ok)
+from books_authors.views import BookViewSet, filter_genre, filter_language
+from core import db_router, metrics
+from core.authentication import AUTH_USER_CACHE, CachedJWTAuthentication, user_cache
+from core.ttl_cache import TTLCache
+from core.db_router_middleware import ReplicaRoutingMiddleware
 
 
 # --- Configuración y Fixtures ---
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    user_cache.clear()
+    author_id_cache.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+    author_id_cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
 
 
+def genre(name):
+    return Genre.objects.resolve(name)
+
+
+def language(name):
+    return Language.objects.resolve(name)
+
+
+def isbn13(digits):
+    """ISBN-13 con los 12 dígitos dados y su dígito de control."""
+    return digits + str(-sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(digits)) % 10)
+
+
 @pytest.fixture
 def create_authors_and_books(db):
     # Remove existing data
@@ -26,13 +93,13 @@ def create_authors_and_books(db):
     author3 = Author.objects.create(first_name='Mario', last_name='Vargas Llosa')
 
     book1 = Book.objects.create(title='Cien años de soledad', published_date='1967-05-30', isbn='9780307474728',
-                                literary_genre='Realismo mágico')
+                                literary_genre=genre('Realismo mágico'), language=language('Español'))
     book2 = Book.objects.create(title='El amor en los tiempos del cólera', published_date='1985-05-01',
-                                isbn='9780307474278', literary_genre='Ficción')
-    book3 = Book.objects.create(title='La casa de los espíritus', published_date='1982-01-01', isbn='9780307474978',
-                                literary_genre='Realismo mágico')
+                                isbn='9780307474278', literary_genre=genre('Ficción'), language=language('Español'))
+    book3 = Book.objects.create(title='La casa de los espíritus', published_date='1982-01-01', isbn='9780307474971',
+                                literary_genre=genre('Realismo mágico'), language=language('Español'))
     book4 = Book.objects.create(title='Crónica de una muerte anunciada', published_date='1981-01-01',
-                                isbn='9780307474738', literary_genre='Novela')
+                                isbn='9780307474735', literary_genre=genre('Novela'), language=language('Español'))
 
     book1.authors.add(author1)
     book2.authors.add(author1)
@@ -120,22 +187,24 @@ class TestAuthorViewSet:
 
         # El autor 'Gabriel García Márquez' tiene 3 libros, 'Isabel Allende' tiene 2.
         # El test asume que la vista ha sido corregida para devolver una lista ordenada de autores.
-        assert response.data[0]['first_name'] == 'Gabriel'
-        assert response.data[0]['last_name'] == 'García Márquez'
-        assert response.data[1]['first_name'] == 'Isabel'
-        assert response.data[1]['last_name'] == 'Allende'
+        results = response.data['results']
+        assert results[0]['first_name'] == 'Gabriel'
+        assert results[0]['last_name'] == 'García Márquez'
+        assert results[1]['first_name'] == 'Isabel'
+        assert results[1]['last_name'] == 'Allende'
 
     def test_books_statistics(self, auth_client, create_authors_and_books):
         url = reverse('author-books-statistics')
         response = auth_client.get(url)
         authors = Author.objects.annotate(total_books=Count('books')).values('total_books').order_by('last_name', 'first_name')
         assert response.status_code == status.HTTP_200_OK
-        assert 'total_books' in response.data[0]
-        assert 'avg_price' in response.data[0]
-        assert 'max_price' in response.data[0]
-        assert 'min_price' in response.data[0]
-        assert 'total_pages' in response.data[0]
-        assert response.data[0]['total_books'] == authors[0]['total_books']
+        results = response.data['results']
+        assert 'total_books' in results[0]
+        assert 'avg_price' in results[0]
+        assert 'max_price' in results[0]
+        assert 'min_price' in results[0]
+        assert 'total_pages' in results[0]
+        assert results[0]['total_books'] == authors[0]['total_books']
 
 
 # --- Tests para BookViewSet ---
@@ -166,8 +235,8 @@ class TestBookViewSet:
         url = reverse('book-more-than-one-author')
         response = auth_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]['title'] == 'Crónica de una muerte anunciada'
+        assert len(response.data['results']) == 1
+        assert response.data['results'][0]['title'] == 'Crónica de una muerte anunciada'
 
     def test_filter_by_published_date(self, auth_client, create_authors_and_books):
         url = reverse('book-list')
@@ -200,7 +269,7 @@ class TestBookViewSet:
         url = reverse('book-price-range')
         response = auth_client.get(f'{url}?min_price=10&max_price=50')
         assert response.status_code == status.HTTP_200_OK
-        for book in response.data:
+        for book in response.data['results']:
             assert float(book['price']) >= 10
             assert float(book['price']) <= 50
 
@@ -215,9 +284,1821 @@ class TestBookViewSet:
         }
         response = auth_client.get(url, params)
         assert response.status_code == status.HTTP_200_OK
-        for book in response.data:
+        for book in response.data['results']:
             assert 'soledad' in book['title'].lower()
             assert book['literary_genre'] == 'Realismo mágico'
             assert book['language'] == 'Español'
             assert int(book['pages']) >= 100
             assert int(book['pages']) <= 500
+
+
+# --- Tests para la paginación keyset ---
+
+class TestKeysetPagination:
+
+    def test_cursor_mode_walks_books_in_title_order(self, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        response = auth_client.get(url, {'pagination': 'cursor', 'page_size': 3})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert response.data['previous'] is None
+        titles = [book['title'] for book in response.data['results']]
+
+        response = auth_client.get(response.data['next'])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['next'] is None
+        titles += [book['title'] for book in response.data['results']]
+        assert titles == list(Book.objects.order_by('title', 'id').values_list('title', flat=True))
+
+        response = auth_client.get(response.data['previous'])
+        assert [book['title'] for book in response.data['results']] == titles[:3]
+
+    def test_cursor_mode_breaks_ties_by_id(self, auth_client, create_authors_and_books):
+        for isbn in ('9780000000001', '9780000000002', '9780000000003'):
+            Book.objects.create(title='Duplicado', isbn=isbn, literary_genre=genre('Novela'),
+                                language=language('Español'))
+        url = reverse('book-list')
+        seen = []
+        response = auth_client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        while True:
+            seen += [book['id'] for book in response.data['results']]
+            if not response.data['next']:
+                break
+            response = auth_client.get(response.data['next'])
+        assert len(seen) == len(set(seen)) == Book.objects.count()
+
+    def test_cursor_mode_authors(self, auth_client, create_authors_and_books):
+        url = reverse('author-list')
+        response = auth_client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [a['last_name'] for a in response.data['results']] == ['Allende', 'García Márquez']
+        response = auth_client.get(response.data['next'])
+        assert [a['last_name'] for a in response.data['results']] == ['Vargas Llosa']
+
+    def test_page_size_is_capped(self, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        response = auth_client.get(url, {'page_size': 2})
+        assert len(response.data['results']) == 2
+        response = auth_client.get(url, {'pagination': 'cursor', 'page_size': 100000})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_invalid_cursor(self, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        response = auth_client.get(url, {'cursor': 'no-es-un-cursor'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('name, position', [
+        ('book-list', ['x', 'no-es-uuid']),
+        ('book-list', [{'a': 1}, str(uuid.uuid4())]),
+        ('book-list', ['x', ['lista']]),
+        ('book-list', [None, str(uuid.uuid4())]),
+        ('author-more-books-order', ['muchos', 'a', 'b', str(uuid.uuid4())]),
+    ])
+    def test_cursor_with_invalid_values(self, auth_client, create_authors_and_books, name, position):
+        cursor = BookPagination().encode_cursor(position, reverse=False)
+        response = auth_client.get(reverse(name), {'cursor': cursor})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data['detail'] == KeysetPagination.invalid_cursor_message
+
+
+# --- Tests de cantidad de consultas SQL ---
+
+@pytest.fixture
+def large_catalog(create_authors_and_books):
+    authors = [create_authors_and_books['author1'], create_authors_and_books['author2']]
+    novela, spanish = genre('Novela'), language('Español')
+    books = Book.objects.bulk_create([
+        Book(title=f'Libro {i:03d}', isbn=f'978100000{i:04d}', literary_genre=novela, language=spanish,
+             pages=200, price=20)
+        for i in range(30)
+    ])
+    Book.authors.through.objects.bulk_create([
+        Book.authors.through(book_id=book.id, author_id=author.id) for book in books for author in authors
+    ])
+    return books
+
+
+def load_cached_user(client):
+    """Hace un request para que el usuario del cliente quede en la caché de core.authentication."""
+    client.get(reverse('book-detail', kwargs={'pk': 0}))
+
+
+def count_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    return len(ctx)
+
+
+class TestQueryCounts:
+    # Presupuesto máximo de consultas por endpoint (incluye la consulta de los validadores ETag;
+    # el usuario autenticado sale de la caché).
+    BOOK_ENDPOINTS = [
+        ('book-list', {}, 4),
+        ('book-more-than-one-author', {}, 4),
+        ('book-price-range', {'min_price': 10, 'max_price': 50}, 4),
+        ('book-advance-search', {'genre': 'Novela', 'min_pages': 100, 'language': 'español'}, 4),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def cached_user(self, auth_client):
+        load_cached_user(auth_client)
+
+    @pytest.mark.parametrize('name, params, budget', BOOK_ENDPOINTS)
+    def test_book_endpoints_do_not_grow_with_page_size(self, auth_client, large_catalog, name, params, budget):
+        url = reverse(name)
+        small = count_queries(auth_client, url, {**params, 'page_size': 1})
+        large = count_queries(auth_client, url, {**params, 'page_size': 25})
+        assert small == large
+        assert large <= budget
+
+    @pytest.mark.parametrize('name, params, budget', BOOK_ENDPOINTS)
+    def test_book_endpoints_cursor_mode(self, auth_client, large_catalog, name, params, budget):
+        url = reverse(name)
+        assert count_queries(auth_client, url, {**params, 'pagination': 'cursor', 'page_size': 25}) <= budget - 1
+
+    def test_book_detail(self, auth_client, large_catalog):
+        url = reverse('book-detail', kwargs={'pk': large_catalog[0].pk})
+        assert count_queries(auth_client, url) <= 3
+
+    def test_author_list(self, auth_client, large_catalog):
+        url = reverse('author-list')
+        assert count_queries(auth_client, url, {'page_size': 25}) <= 3
+
+    @pytest.mark.parametrize('name', ['author-books-statistics', 'author-more-books-order'])
+    def test_author_statistics(self, auth_client, large_catalog, name):
+        assert count_queries(auth_client, reverse(name), {'page_size': 25}) <= 3
+
+
+# --- Tests para los géneros e idiomas (Genre, Language) ---
+
+class TestGenreLanguage:
+
+    def test_names_are_reused_case_insensitively(self, auth_client, create_authors_and_books):
+        genres = Genre.objects.count()
+        payload = {'title': 'Rayuela', 'isbn': '9788437604572', 'literary_genre': ' NOVELA ', 'language': 'inglés',
+                   'authors_ids': [str(create_authors_and_books['author1'].id)]}
+        response = auth_client.post(reverse('book-list'), payload, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['literary_genre'] == 'Novela'
+        assert Genre.objects.count() == genres
+        book = Book.objects.get(isbn='9788437604572')
+        assert book.literary_genre == genre('Novela')
+        assert book.language.name == 'inglés'
+
+    def test_new_genre_and_default_language(self, auth_client, create_authors_and_books):
+        payload = {'title': 'Ficciones', 'isbn': '9789875666474', 'literary_genre': 'Cuento fantástico',
+                   'authors_ids': [str(create_authors_and_books['author3'].id)]}
+        response = auth_client.post(reverse('book-list'), payload, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['language'] == 'Español'
+        assert Genre.objects.filter(name='Cuento fantástico').exists()
+
+        response = auth_client.get(reverse('book-detail', kwargs={'pk': response.data['id']}))
+        assert response.data['literary_genre'] == 'Cuento fantástico'
+
+    def test_invalid_request_creates_no_names(self, auth_client, create_authors_and_books):
+        genres, languages = Genre.objects.count(), Language.objects.count()
+        payload = {'title': 'Inválido', 'isbn': create_authors_and_books['book1'].isbn, 'literary_genre': 'Poesía',
+                   'language': 'Portugués', 'authors_ids': [str(uuid.uuid4())]}
+        response = auth_client.post(reverse('book-list'), payload, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert {'isbn', 'authors_ids'} <= set(response.data)
+        assert (Genre.objects.count(), Language.objects.count()) == (genres, languages)
+
+    def test_unsaved_book_runs_no_queries(self, db):
+        with CaptureQueriesContext(connection) as ctx:
+            book = Book(title='Sin guardar', isbn='9780000000009')
+        assert len(ctx) == 0
+        assert book.language_id is None
+
+    @pytest.mark.parametrize('value', ['', '   ', 'x' * 51, 12])
+    def test_invalid_names(self, auth_client, create_authors_and_books, value):
+        payload = {'title': 'Inválido', 'isbn': '9789875666481', 'literary_genre': value,
+                   'authors_ids': [str(create_authors_and_books['author3'].id)]}
+        response = auth_client.post(reverse('book-list'), payload, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'literary_genre' in response.data
+
+    def test_bulk_resolves_names_once(self, auth_client, create_authors_and_books):
+        payload = [
+            {'title': f'Libro {i}', 'isbn': isbn13(f'9781000000{i:02d}'), 'literary_genre': name, 'language': 'Inglés'}
+            for i, name in enumerate(['Ensayo', 'ensayo', 'ENSAYO ', 'novela'])
+        ]
+        response = auth_client.post(reverse('book-bulk'), payload, format='json')
+        assert response.data['created'] == 4
+        ensayo = Genre.objects.get(name='Ensayo')
+        assert ensayo.books.count() == 3
+        assert genre('Novela').books.filter(isbn=isbn13('978100000003')).exists()
+        assert Language.objects.named('inglés').get().books.count() == 4
+
+    def test_filters_compare_integer_keys(self, create_authors_and_books):
+        sql = str(filter_genre(filter_language(Book.objects.all(), 'español'), 'realismo').query)
+        assert '"books_authors_book"."language_id" IN (SELECT' in sql
+        assert '"books_authors_book"."literary_genre_id" IN (SELECT' in sql
+
+    def test_advance_search_language_ignores_case(self, auth_client, create_authors_and_books):
+        Book.objects.filter(isbn='9780307474971').update(language=language('Inglés'), pages=300)
+        response = auth_client.get(reverse('book-advance-search'), {'language': 'inglés'})
+        assert [book['isbn'] for book in response.data['results']] == ['9780307474971']
+        assert response.data['results'][0]['language'] == 'Inglés'
+
+    def test_rename_updates_books(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book4']
+        before = Book.objects.get(pk=book.pk).updated_at
+        response = auth_client.get(reverse('book-detail', kwargs={'pk': book.pk}))
+        assert response.data['literary_genre'] == 'Novela'
+
+        novela = genre('Novela')
+        novela.name = 'Novela corta'
+        novela.save()
+        response = auth_client.get(reverse('book-detail', kwargs={'pk': book.pk}))
+        assert response.data['literary_genre'] == 'Novela corta'
+        assert Book.objects.get(pk=book.pk).updated_at > before
+        assert_facets_match()
+
+    def test_export_writes_names(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-export'), {'format': 'ndjson'})
+        rows = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert {row['literary_genre'] for row in rows} == {'Realismo mágico', 'Ficción', 'Novela'}
+        assert {row['language'] for row in rows} == {'Español'}
+
+    def test_migration_merges_case_variants(self, transactional_db):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('books_authors', '0007_facet_counts')])
+        old_apps = executor.loader.project_state([('books_authors', '0007_facet_counts')]).apps
+        OldBook = old_apps.get_model('books_authors', 'Book')
+        OldBook.objects.all().delete()
+        for index, (genre_name, language_name) in enumerate([
+            ('Novela', 'Español'), ('Novela', 'español'), ('novela ', 'Inglés'), ('NOVELA', 'Español'),
+            ('Cuento', 'Español'),
+        ]):
+            OldBook.objects.create(title=f'Libro {index}', isbn=f'97830000000{index:02d}',
+                                   literary_genre=genre_name, language=language_name)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes('books_authors'))
+        # Una fila por nombre sin distinguir mayúsculas, con la grafía más usada.
+        assert list(Genre.objects.values_list('name', flat=True)) == ['Cuento', 'Novela']
+        assert list(Language.objects.values_list('name', flat=True)) == ['Español', 'Inglés']
+        assert genre('Novela').books.count() == 4
+        assert language('Español').books.count() == 4
+
+
+# --- Tests para la caché de respuestas ---
+
+class TestResponseCache:
+
+    def test_second_request_is_served_from_cache(self, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        first = auth_client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = auth_client.get(url)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+        assert second['ETag'] == first['ETag']
+        # El usuario autenticado también sale de la caché (core.authentication).
+        assert len(ctx) == 0
+
+    def test_query_params_are_normalized(self, auth_client, create_authors_and_books):
+        url = reverse('book-price-range')
+        first = auth_client.get(f'{url}?min_price=0&max_price=50')
+        second = auth_client.get(f'{url}?max_price=50&min_price=0')
+        assert first['ETag'] == second['ETag']
+
+    def test_key_includes_scheme_and_host(self, auth_client, create_authors_and_books):
+        url = f"{reverse('book-list')}?page=1&page_size=1"
+        first = auth_client.get(url, HTTP_HOST='a.example')
+        assert first.data['next'].startswith('http://a.example/')
+        assert auth_client.get(url, HTTP_HOST='b.example').data['next'].startswith('http://b.example/')
+        assert auth_client.get(url, HTTP_HOST='a.example', secure=True).data['next'].startswith('https://a.example/')
+        assert auth_client.get(url, HTTP_HOST='a.example').json() == first.json()
+
+    def test_hit_keeps_vary(self, db):
+        class VaryView(APIView):
+            authentication_classes = []
+            permission_classes = []
+            calls = 0
+
+            @cached_response(BOOKS)
+            def get(self, request):
+                VaryView.calls += 1
+                response = Response({'calls': VaryView.calls})
+                patch_vary_headers(response, ['Accept-Language'])
+                return response
+
+        first = VaryView.as_view()(RequestFactory().get('/vary/')).render()
+        second = VaryView.as_view()(RequestFactory().get('/vary/'))
+        assert VaryView.calls == 1
+        assert second.content == first.content
+        assert second['Vary'] == first['Vary']
+        assert 'Accept-Language' in second['Vary']
+
+    def test_if_none_match_returns_304(self, auth_client, create_authors_and_books):
+        url = reverse('author-books-statistics')
+        etag = auth_client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert len(ctx) == 0
+
+    def test_book_update_invalidates_book_and_statistics(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book1']
+        books_etag = auth_client.get(reverse('book-list'))['ETag']
+        stats_etag = auth_client.get(reverse('author-books-statistics'))['ETag']
+        authors_etag = auth_client.get(reverse('author-list'))['ETag']
+
+        auth_client.patch(reverse('book-detail', kwargs={'pk': book.pk}), {'title': 'Cien años', 'price': '25.00'},
+                          format='json')
+
+        response = auth_client.get(reverse('book-list'))
+        assert response['ETag'] != books_etag
+        assert 'Cien años' in [b['title'] for b in response.data['results']]
+        assert auth_client.get(reverse('author-books-statistics'))['ETag'] != stats_etag
+        assert auth_client.get(reverse('author-list'))['ETag'] == authors_etag
+
+    def test_author_change_invalidates_nested_books(self, auth_client, create_authors_and_books):
+        author = create_authors_and_books['author2']
+        url = reverse('book-detail', kwargs={'pk': create_authors_and_books['book3'].pk})
+        auth_client.get(url)
+        author.first_name = 'Isabel Angélica'
+        author.save()
+        response = auth_client.get(url)
+        assert response.data['authors'][0]['first_name'] == 'Isabel Angélica'
+
+    def test_m2m_change_invalidates(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book1']
+        url = reverse('book-more-than-one-author')
+        assert len(auth_client.get(url).data['results']) == 1
+        book.authors.add(create_authors_and_books['author3'])
+        assert len(auth_client.get(url).data['results']) == 2
+
+    def test_unauthenticated_request_is_not_served(self, api_client, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        auth_client.get(url)
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+# --- Tests para las peticiones condicionales ---
+
+class TestConditionalRequests:
+
+    @pytest.fixture(autouse=True)
+    def without_response_cache(self, settings, auth_client):
+        # Sin la caché de respuestas los validadores salen siempre de la consulta de sondeo.
+        settings.API_CACHE_TIMEOUT = 0
+        load_cached_user(auth_client)
+
+    def test_detail_validators(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book1']
+        response = auth_client.get(reverse('book-detail', kwargs={'pk': book.pk}))
+        book.refresh_from_db()
+        assert response['ETag']
+        assert response['Last-Modified'] == http_date(book.updated_at.timestamp())
+        assert response['Cache-Control'] == 'private, no-cache'
+
+    def test_detail_not_modified_without_serializing(self, auth_client, create_authors_and_books):
+        url = reverse('book-detail', kwargs={'pk': create_authors_and_books['book4'].pk})
+        first = auth_client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == first['ETag']
+        assert response.content == b''
+        # Solo la consulta de sondeo.
+        assert len(ctx) == 1
+        response = auth_client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_author_change_changes_book_etag(self, auth_client, create_authors_and_books):
+        url = reverse('book-detail', kwargs={'pk': create_authors_and_books['book3'].pk})
+        etag = auth_client.get(url)['ETag']
+        author = create_authors_and_books['author2']
+        author.bio = 'Escritora chilena.'
+        author.save()
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_authors_change_changes_book_etag(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book2']
+        url = reverse('book-detail', kwargs={'pk': book.pk})
+        etag = auth_client.get(url)['ETag']
+        book.authors.add(create_authors_and_books['author3'])
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_list_not_modified(self, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        first = auth_client.get(url, {'page_size': 2})
+        assert not first.has_header('Last-Modified')
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(url, {'page_size': 2}, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(ctx) == 1
+        # Otra página u otros filtros tienen su propio ETag.
+        assert auth_client.get(url, {'page_size': 2, 'page': 2})['ETag'] != first['ETag']
+
+    def test_page_mode_counts_once(self, auth_client, large_catalog):
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(reverse('book-list'), {'page_size': 5, 'page': 2})
+        assert response.data['count'] == Book.objects.count()
+        assert sum('COUNT(' in query['sql'] for query in ctx.captured_queries) == 1
+
+    def test_cursor_mode_reads_only_the_page(self, auth_client, large_catalog):
+        url = reverse('book-list')
+        params = {'pagination': 'cursor', 'page_size': 5}
+        with CaptureQueriesContext(connection) as ctx:
+            first = auth_client.get(url, params)
+        assert first.status_code == status.HTTP_200_OK
+        # La página y los autores de sus libros; sin COUNT ni MAX(updated_at) sobre todo el listado.
+        assert len(ctx) == 2
+        assert not any('COUNT(' in query['sql'] or 'MAX(' in query['sql'] for query in ctx.captured_queries)
+        assert auth_client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag']).status_code == \
+            status.HTTP_304_NOT_MODIFIED
+
+        book = Book.objects.get(pk=first.data['results'][0]['id'])
+        book.title = 'Libro 000 (revisado)'
+        book.save()
+        assert auth_client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag']).status_code == status.HTTP_200_OK
+        next_page = auth_client.get(first.data['next'])
+        assert next_page['ETag'] != first['ETag']
+
+    def test_author_change_changes_book_list_etag(self, auth_client, create_authors_and_books):
+        url = reverse('book-list')
+        etag = auth_client.get(url)['ETag']
+        author = create_authors_and_books['author3']
+        author.first_name = 'Jorge Mario'
+        author.save()
+        # author3 no tiene libros: la lista no cambia.
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        author = create_authors_and_books['author1']
+        author.first_name = 'Gabo'
+        author.save()
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_list_etag_changes_on_delete(self, auth_client, create_authors_and_books):
+        url = reverse('author-list')
+        etag = auth_client.get(url)['ETag']
+        create_authors_and_books['author3'].delete()
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('change', ['delete', 'clear'])
+    def test_author_books_are_read_once(self, create_authors_and_books, change):
+        author = create_authors_and_books['author1']
+        books = list(author.books.order_by('pk'))
+        before = {book.pk: book.updated_at for book in books}
+        with CaptureQueriesContext(connection) as ctx:
+            if change == 'delete':
+                author.delete()
+            else:
+                author.books.clear()
+        reads = [query for query in ctx.captured_queries
+                 if query['sql'].startswith('SELECT "books_authors_book"."id" AS "id" FROM "books_authors_book" INNER JOIN')]
+        assert len(reads) == 1
+        assert all(book.updated_at > before[book.pk] for book in Book.objects.filter(pk__in=before))
+
+    def test_statistics_follow_author_stats(self, auth_client, create_authors_and_books):
+        url = reverse('author-books-statistics')
+        etag = auth_client.get(url)['ETag']
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        book = create_authors_and_books['book3']
+        book.price = Decimal('30.00')
+        book.save()
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_etag_does_not_depend_on_response_cache(self, auth_client, create_authors_and_books, settings):
+        url = reverse('author-detail', kwargs={'pk': create_authors_and_books['author1'].pk})
+        etag = auth_client.get(url)['ETag']
+        settings.API_CACHE_TIMEOUT = 300
+        cached = auth_client.get(url)
+        assert cached['ETag'] == etag
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['Last-Modified'] == cached['Last-Modified']
+
+    def test_missing_detail_is_404(self, auth_client):
+        assert auth_client.get(reverse('book-detail', kwargs={'pk': 0})).status_code == status.HTTP_404_NOT_FOUND
+        assert auth_client.get(reverse('book-detail', kwargs={'pk': 'x'})).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_disabled(self, auth_client, create_authors_and_books, settings):
+        settings.API_CONDITIONAL_REQUESTS = False
+        assert not auth_client.get(reverse('book-list')).has_header('ETag')
+
+
+# --- Tests para ?fields=, ?omit= y ?expand= ---
+
+class TestSparseFieldsets:
+
+    @pytest.fixture(autouse=True)
+    def without_response_cache(self, settings, auth_client):
+        settings.API_CACHE_TIMEOUT = 0
+        load_cached_user(auth_client)
+
+    def get(self, client, name, params, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse(name, kwargs=kwargs or None), params)
+        return response, [query['sql'] for query in ctx.captured_queries]
+
+    def test_fields_narrow_columns_and_skip_authors(self, auth_client, create_authors_and_books):
+        response, queries = self.get(auth_client, 'book-list', {'fields': 'title,price'})
+        assert response.status_code == status.HTTP_200_OK
+        assert {tuple(book) for book in response.json()['results']} == {('title', 'price')}
+        assert not any('summary' in sql for sql in queries)
+        assert not any('books_authors_author' in sql for sql in queries)
+
+    def test_expand_and_nested_fields(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book4']
+        response, _ = self.get(auth_client, 'book-detail', {'fields': 'title', 'expand': 'authors'}, pk=book.pk)
+        assert response.json() == {'title': book.title, 'authors': BookSerializer(book).data['authors']}
+
+        response, queries = self.get(auth_client, 'book-detail', {'fields': 'id,authors.last_name'}, pk=book.pk)
+        assert response.json() == {'id': str(book.pk), 'authors': [{'last_name': 'Allende'},
+                                                                  {'last_name': 'García Márquez'}]}
+        assert not any('bio' in sql for sql in queries)
+
+    def test_omit(self, auth_client, create_authors_and_books):
+        response, _ = self.get(auth_client, 'book-list', {'omit': 'summary,authors.bio'})
+        book = response.json()['results'][0]
+        assert 'summary' not in book and 'isbn' in book
+        assert book['authors'] and all('bio' not in author for author in book['authors'])
+        response, queries = self.get(auth_client, 'book-more-than-one-author', {'omit': 'authors'})
+        assert 'authors' not in response.json()['results'][0]
+        assert not any('books_authors_author' in sql for sql in queries)
+
+    def test_full_representation_by_default(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book1']
+        book.refresh_from_db()
+        response = auth_client.get(reverse('book-detail', kwargs={'pk': book.pk}), {'expand': 'authors'})
+        assert response.json() == json.loads(JSONRenderer().render(BookSerializer(book).data))
+
+    def test_authors_and_cursor_mode(self, auth_client, create_authors_and_books):
+        response, _ = self.get(auth_client, 'author-list', {'fields': 'first_name', 'pagination': 'cursor',
+                                                             'page_size': 2})
+        data = response.json()
+        assert data['results'] == [{'first_name': 'Isabel'}, {'first_name': 'Gabriel'}]
+        assert auth_client.get(data['next']).json()['results'] == [{'first_name': 'Mario'}]
+
+    @pytest.mark.parametrize('params', [{'fields': 'title,nombre'}, {'omit': 'authors.isbn'}, {'expand': 'title'}])
+    def test_unknown_fields(self, auth_client, create_authors_and_books, params):
+        response = auth_client.get(reverse('book-list'), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'fields' in response.json()
+
+    def test_async_views(self, async_get, create_authors_and_books):
+        response = async_get(reverse('async-book-list'), {'fields': 'isbn'})
+        assert {tuple(book) for book in response.json()['results']} == {('isbn',)}
+
+
+# --- Tests para AuthorStats ---
+
+def expected_stats(author):
+    return Author.objects.filter(pk=author.pk).aggregate(
+        total_books=Count('books'), price_sum=Sum('books__price'), min_price=Min('books__price'),
+        max_price=Max('books__price'), total_pages=Sum('books__pages'))
+
+
+def assert_stats_match(author):
+    expected = expected_stats(author)
+    stats = AuthorStats.objects.get(author=author)
+    assert stats.total_books == expected['total_books']
+    assert stats.price_sum == (expected['price_sum'] or 0)
+    assert stats.min_price == expected['min_price']
+    assert stats.max_price == expected['max_price']
+    assert stats.total_pages == (expected['total_pages'] or 0)
+
+
+class TestAuthorStats:
+
+    def test_stats_follow_m2m_changes(self, create_authors_and_books):
+        author1, author2 = create_authors_and_books['author1'], create_authors_and_books['author2']
+        assert_stats_match(author1)
+        assert_stats_match(author2)
+
+        create_authors_and_books['book4'].authors.remove(author2)
+        assert_stats_match(author2)
+        create_authors_and_books['book1'].authors.clear()
+        assert_stats_match(author1)
+        author2.books.add(create_authors_and_books['book2'])
+        assert_stats_match(author2)
+
+    def test_stats_follow_price_and_pages(self, create_authors_and_books):
+        author1 = create_authors_and_books['author1']
+        book = create_authors_and_books['book1']
+        book.price = 99
+        book.pages = 420
+        book.save()
+        assert_stats_match(author1)
+        book.price = 5
+        book.save(update_fields=['price'])
+        assert_stats_match(author1)
+
+    def test_stats_follow_book_delete(self, create_authors_and_books):
+        author1 = create_authors_and_books['author1']
+        create_authors_and_books['book4'].delete()
+        assert_stats_match(author1)
+
+    def test_rebuild_command(self, create_authors_and_books):
+        AuthorStats.objects.all().delete()
+        call_command('rebuild_author_stats', stdout=io.StringIO())
+        for key in ('author1', 'author2', 'author3'):
+            assert_stats_match(create_authors_and_books[key])
+
+    def test_books_statistics_values(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book1']
+        book.price = 30
+        book.save()
+        response = auth_client.get(reverse('author-books-statistics'))
+        by_name = {row['last_name']: row for row in response.data['results']}
+        assert by_name['García Márquez']['total_books'] == 3
+        assert by_name['García Márquez']['avg_price'] == 10.0
+        assert by_name['García Márquez']['max_price'] == 30.0
+        assert by_name['Vargas Llosa']['total_books'] == 0
+        assert by_name['Vargas Llosa']['avg_price'] == 0
+
+    def test_more_books_order_cursor_mode(self, auth_client, create_authors_and_books):
+        url = reverse('author-more-books-order')
+        response = auth_client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        names = [a['last_name'] for a in response.data['results']]
+        response = auth_client.get(response.data['next'])
+        names += [a['last_name'] for a in response.data['results']]
+        assert names == ['García Márquez', 'Allende', 'Vargas Llosa']
+
+
+# --- Tests para las facetas ---
+
+def assert_facets_match():
+    assert summary_counts() == facet_counts(Book.objects.all(), summary=False)
+
+
+class TestFacets:
+
+    def test_summary_follows_book_writes(self, create_authors_and_books):
+        assert_facets_match()
+        book = Book.objects.create(title='Rayuela', isbn='9788437604572', literary_genre=genre('Novela'),
+                                   language=language('Español'), published_date='1963-06-28', price=Decimal('120.00'))
+        assert_facets_match()
+        book.language = language('Inglés')
+        book.price = 15
+        book.save()
+        assert_facets_match()
+        book.published_date = None
+        book.save(update_fields=['published_date'])
+        assert_facets_match()
+        book.title = 'Hopscotch'
+        book.save(update_fields=['title'])
+        assert_facets_match()
+        create_authors_and_books['book1'].delete()
+        assert_facets_match()
+
+    def test_summary_follows_bulk_upsert(self, auth_client, create_authors_and_books):
+        payload = [
+            {'title': 'Ficciones', 'isbn': '9789875666474', 'literary_genre': 'Cuento', 'price': '12.00'},
+            {'title': 'Cien años de soledad', 'isbn': '9780307474728', 'literary_genre': 'Novela',
+             'published_date': '2017-03-01', 'price': '60.00'},
+        ]
+        response = auth_client.post(reverse('book-bulk'), payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert_facets_match()
+
+    def test_filtered_facets(self, auth_client, create_authors_and_books):
+        Book.objects.filter(isbn='9780307474971').update(price=Decimal('25.50'), language=language('Inglés'))
+        response = auth_client.get(reverse('book-facets'), {'literary_genre': 'realismo'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+        assert response.data['literary_genre'] == [{'value': 'Realismo mágico', 'count': 2}]
+        assert response.data['language'] == [{'value': 'Español', 'count': 1}, {'value': 'Inglés', 'count': 1}]
+        assert response.data['price'] == [{'value': '0-10', 'count': 1}, {'value': '20-50', 'count': 1}]
+        assert response.data['decade'] == [{'value': 1960, 'count': 1}, {'value': 1980, 'count': 1}]
+
+    def test_books_without_date_have_null_decade(self, auth_client, create_authors_and_books):
+        Book.objects.create(title='Sin fecha', isbn='9780000000001', literary_genre=genre('Novela'),
+                            language=language('Español'))
+        for params in ({}, {'literary_genre': 'novela'}):
+            response = auth_client.get(reverse('book-facets'), params)
+            assert response.data['decade'][-1] == {'value': None, 'count': 1}
+
+    def test_filtered_facets_use_one_query(self, auth_client, create_authors_and_books):
+        load_cached_user(auth_client)
+        # La primera búsqueda en PostgreSQL consulta además si pg_trgm está instalada.
+        auth_client.get(reverse('book-facets'), {'search': 'soledad'})
+        assert count_queries(auth_client, reverse('book-facets'), {'search': 'amor'}) == 1
+
+    def test_unfiltered_facets_read_summary_table(self, auth_client, create_authors_and_books):
+        FacetCount.objects.filter(facet=FacetCount.GENRE, value='Novela').update(count=99)
+        response = auth_client.get(reverse('book-facets'))
+        assert {'value': 'Novela', 'count': 99} in response.data['literary_genre']
+
+        call_command('rebuild_facet_counts', stdout=io.StringIO())
+        assert_facets_match()
+        response = auth_client.get(reverse('book-facets'))
+        assert response.data['count'] == 4
+        assert {'value': 'Novela', 'count': 1} in response.data['literary_genre']
+
+
+# --- Tests para la carga masiva de libros ---
+
+class TestBookBulk:
+
+    def test_bulk_creates_and_updates(self, auth_client, create_authors_and_books):
+        author1, author3 = create_authors_and_books['author1'], create_authors_and_books['author3']
+        payload = [
+            {'title': 'Ficciones', 'isbn': '9789875666474', 'literary_genre': 'Cuento',
+             'authors_ids': [str(author3.id)]},
+            {'title': 'Cien años de soledad (ed. aniversario)', 'isbn': '9780307474728',
+             'literary_genre': 'Realismo mágico', 'price': '25.00', 'authors_ids': [str(author1.id), str(author3.id)]},
+        ]
+        response = auth_client.post(reverse('book-bulk'), payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert response.data['updated'] == 1
+
+        book = Book.objects.get(isbn='9780307474728')
+        assert book.id == create_authors_and_books['book1'].id
+        assert book.title == 'Cien años de soledad (ed. aniversario)'
+        assert set(book.authors.values_list('id', flat=True)) == {author1.id, author3.id}
+        assert Book.objects.get(isbn='9789875666474').authors.get() == author3
+        assert_stats_match(author3)
+        assert_stats_match(author1)
+
+    def test_bulk_keeps_fields_not_sent(self, auth_client, create_authors_and_books):
+        book1 = create_authors_and_books['book1']
+        book1.pages, book1.price, book1.summary, book1.language = 417, Decimal('20.00'), 'Macondo', language('Inglés')
+        book1.save()
+        payload = [
+            {'title': 'Cien años de soledad (ed. aniversario)', 'isbn': '9780307474728',
+             'literary_genre': 'Realismo mágico'},
+            {'title': 'Ficciones', 'isbn': '9789875666474', 'literary_genre': 'Cuento'},
+        ]
+        response = auth_client.post(reverse('book-bulk'), payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        book = Book.objects.get(pk=book1.pk)
+        assert book.title == 'Cien años de soledad (ed. aniversario)'
+        assert (book.published_date, book.pages, book.price, book.summary, book.language.name) == (
+            date(1967, 5, 30), 417, Decimal('20.00'), 'Macondo', 'Inglés')
+        assert list(book.authors.all()) == [create_authors_and_books['author1']]
+        assert Book.objects.get(isbn='9789875666474').language.name == Language.DEFAULT
+        assert_facets_match()
+
+    def test_bulk_reports_item_errors_without_aborting(self, auth_client, create_authors_and_books):
+        payload = [
+            {'title': 'Válido', 'isbn': '9789875666481', 'literary_genre': 'Cuento'},
+            {'title': 'Sin ISBN', 'literary_genre': 'Cuento'},
+            {'title': 'Repetido', 'isbn': '9789875666481', 'literary_genre': 'Cuento'},
+            {'title': 'Autor inexistente', 'isbn': '9789875666498', 'literary_genre': 'Cuento',
+             'authors_ids': ['00000000-0000-0000-0000-000000000000']},
+        ]
+        response = auth_client.post(reverse('book-bulk'), payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert [error['index'] for error in response.data['errors']] == [1, 2, 3]
+        assert 'isbn' in response.data['errors'][0]['errors']
+        assert 'authors_ids' in response.data['errors'][2]['errors']
+        assert not Book.objects.filter(isbn='9789875666498').exists()
+
+    def test_bulk_ndjson(self, auth_client, create_authors_and_books):
+        body = '\n'.join(json.dumps({'title': f'Libro {i}', 'isbn': isbn13(f'9780000001{i:02d}'),
+                                      'literary_genre': 'Novela'}) for i in range(20))
+        response = auth_client.post(reverse('book-bulk'), body, content_type='application/x-ndjson')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 20
+
+    def test_bulk_query_count_does_not_grow_with_batch(self, auth_client, create_authors_and_books):
+        author1 = create_authors_and_books['author1']
+
+        def payload(prefix, size):
+            return [{'title': f'Libro {i}', 'isbn': isbn13(f'978{prefix}{i:05d}'), 'literary_genre': 'Novela',
+                     'authors_ids': [str(author1.id)]} for i in range(size)]
+
+        load_cached_user(auth_client)
+        with CaptureQueriesContext(connection) as small:
+            auth_client.post(reverse('book-bulk'), payload('1000', 2), format='json')
+        with CaptureQueriesContext(connection) as large:
+            auth_client.post(reverse('book-bulk'), payload('2000', 80), format='json')
+        assert len(large) == len(small)
+
+    @pytest.mark.parametrize('isbn, valid', [
+        ('0306406152', True), ('080442957X', True), ('080442957x', True), ('9780306406157', True),
+        ('9791234567896', True), ('0306406153', False), ('080442957Y', False), ('9780306406158', False),
+        ('978030640615', False), ('97803064061a7', False),
+    ])
+    def test_isbn_check_digit(self, isbn, valid):
+        assert isbn_check_digit_ok(isbn) is valid
+
+    def test_bulk_rejects_invalid_isbn(self, auth_client, create_authors_and_books):
+        payload = [
+            {'title': 'ISBN-10', 'isbn': '080442957x', 'literary_genre': 'Cuento'},
+            {'title': 'Dígito de control', 'isbn': '9789875666473', 'literary_genre': 'Cuento'},
+        ]
+        response = auth_client.post(reverse('book-bulk'), payload, format='json')
+        assert response.data['created'] == 1
+        assert Book.objects.filter(isbn='080442957X').exists()
+        assert [error['index'] for error in response.data['errors']] == [1]
+        assert 'isbn' in response.data['errors'][0]['errors']
+
+    def test_bulk_rejects_non_list(self, auth_client, create_authors_and_books):
+        response = auth_client.post(reverse('book-bulk'), {'title': 'x'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# --- Tests para la exportación en streaming ---
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+class TestExport:
+
+    def test_books_ndjson(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-export'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert len(rows) == Book.objects.count()
+        book4 = create_authors_and_books['book4']
+        row = next(row for row in rows if row['id'] == str(book4.id))
+        assert sorted(row['authors_ids']) == sorted(str(a.id) for a in book4.authors.all())
+
+    def test_books_csv_with_filters(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-export'), {'format': 'csv', 'literary_genre': 'realismo'})
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert {row['title'] for row in rows} == {'Cien años de soledad', 'La casa de los espíritus'}
+
+    def test_books_updated_since_watermark(self, auth_client, create_authors_and_books):
+        watermark = Book.objects.aggregate(Max('updated_at'))['updated_at__max']
+        book = create_authors_and_books['book2']
+        book.title = 'El amor en los tiempos del cólera (reedición)'
+        book.save()
+        response = auth_client.get(reverse('book-export'), {'updated_since': watermark.isoformat()})
+        rows = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert [row['id'] for row in rows] == [str(book.id)]
+
+    def test_invalid_watermark(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-export'), {'updated_since': 'ayer'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_authors_csv(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('author-export'), {'format': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert len(rows) == Author.objects.count()
+        assert set(rows[0]) == {'id', 'first_name', 'last_name', 'birth_date', 'bio', 'created_at', 'updated_at'}
+
+    def test_export_query_count_does_not_grow(self, auth_client, large_catalog):
+        with CaptureQueriesContext(connection) as ctx:
+            read_stream(auth_client.get(reverse('book-export')))
+        # usuario + bloque de libros + autores precargados del bloque
+        assert len(ctx) <= 3
+
+
+# --- Tests para el feed de cambios ---
+
+class TestChangesFeed:
+
+    @pytest.fixture(autouse=True)
+    def without_lag(self, settings):
+        settings.CHANGES_FEED_LAG_SECONDS = 0
+
+    @pytest.fixture
+    def catalog(self, create_authors_and_books):
+        # Sin las bajas de los datos iniciales que borra create_authors_and_books.
+        Tombstone.objects.all().delete()
+        return create_authors_and_books
+
+    def changes(self, client, name='book-changes', since=None):
+        response = client.get(reverse(name), {'since': since} if since else {})
+        assert response.status_code == status.HTTP_200_OK
+        return [json.loads(line) for line in read_stream(response).splitlines()]
+
+    def test_full_feed(self, auth_client, catalog):
+        lines = self.changes(auth_client)
+        books = Book.objects.order_by('updated_at', 'id')
+        assert [line['id'] for line in lines] == [str(book.pk) for book in books]
+        assert {line['op'] for line in lines} == {'upsert'}
+        book4 = next(line for line in lines if line['id'] == str(catalog['book4'].pk))
+        assert sorted(book4['data']['authors_ids']) == sorted(
+            str(author.pk) for author in catalog['book4'].authors.all())
+
+    def test_incremental_sync(self, auth_client, catalog):
+        cursor = self.changes(auth_client)[-1]['cursor']
+        assert self.changes(auth_client, since=cursor) == []
+
+        book1, book2, book3 = (catalog[name] for name in ('book1', 'book2', 'book3'))
+        book1.title = 'Cien años de soledad (edición revisada)'
+        book1.save()
+        book2_id = str(book2.pk)
+        book2.delete()
+        book3.authors.add(catalog['author3'])
+
+        lines = self.changes(auth_client, since=cursor)
+        assert [(line['op'], line['id']) for line in lines] == [
+            ('upsert', str(book1.pk)), ('delete', book2_id), ('upsert', str(book3.pk))]
+        assert lines[0]['data']['title'] == book1.title
+        assert 'data' not in lines[1]
+        assert str(catalog['author3'].pk) in lines[2]['data']['authors_ids']
+        # Cada línea sirve para continuar desde ella.
+        assert self.changes(auth_client, since=lines[0]['cursor']) == lines[1:]
+
+    def test_author_changes(self, auth_client, catalog):
+        cursor = self.changes(auth_client, 'author-changes')[-1]['cursor']
+        author3 = catalog['author3']
+        author3_id = str(author3.pk)
+        author3.delete()
+        assert [(line['op'], line['id']) for line in self.changes(auth_client, 'author-changes', cursor)] == [
+            ('delete', author3_id)]
+
+    def test_streams_in_batches(self, auth_client, catalog, large_catalog, monkeypatch):
+        monkeypatch.setattr(BookViewSet, 'export_chunk_size', 7)
+        for book in large_catalog[:5]:
+            book.delete()
+        with CaptureQueriesContext(connection) as ctx:
+            lines = self.changes(auth_client)
+        assert len(lines) == Book.objects.count() + 5
+        assert [line['op'] for line in lines].count('delete') == 5
+        keys = [(line['changed_at'], line['id']) for line in lines]
+        assert len(set(keys)) == len(keys)
+        # Libros (con sus autores) y bajas por bloques de 7 filas.
+        assert len(ctx) <= 2 * (len(lines) // 7 + 1) + 2
+
+    def test_lag_hides_recent_changes(self, auth_client, catalog, settings):
+        settings.CHANGES_FEED_LAG_SECONDS = 60
+        assert self.changes(auth_client) == []
+
+    def test_invalid_and_expired_cursor(self, auth_client, catalog):
+        response = auth_client.get(reverse('book-changes'), {'since': 'x'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        old = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        response = auth_client.get(reverse('book-changes'), {'since': encode_cursor(old, uuid.uuid4(), 'upsert')})
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_prune_tombstones(self, catalog):
+        catalog['book1'].delete()
+        Tombstone.objects.create(kind=Tombstone.BOOK, object_id=uuid.uuid4(),
+                                 deleted_at=timezone.now() - timedelta(days=40))
+        call_command('prune_tombstones', stdout=io.StringIO())
+        assert Tombstone.objects.filter(kind=Tombstone.BOOK).count() == 1
+
+
+# --- Tests para el comando import_catalog ---
+
+class TestImportCatalog:
+
+    def write_catalog(self, tmp_path, authors, books):
+        (tmp_path / 'authors.json').write_text(json.dumps(authors), encoding='utf-8')
+        (tmp_path / 'books.ndjson').write_text('\n'.join(json.dumps(book) for book in books), encoding='utf-8')
+        return tmp_path / 'authors.json', tmp_path / 'books.ndjson'
+
+    def test_import_json_and_ndjson(self, db, tmp_path):
+        authors = [{'id': str(uuid.uuid4()), 'first_name': f'Nombre {i}', 'last_name': f'Apellido {i}'}
+                   for i in range(5)]
+        books = [{'title': f'Libro {i}', 'isbn': isbn13(f'978100000{i:03d}'), 'literary_genre': 'Novela',
+                  'price': '10.00', 'authors': [authors[i % 5]['id'], authors[(i + 1) % 5]['id']]}
+                 for i in range(23)]
+        books.append({'title': 'Sin ISBN', 'literary_genre': 'Novela'})
+        authors_path, books_path = self.write_catalog(tmp_path, authors, books)
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_catalog', authors=str(authors_path), books=str(books_path), batch_size=10,
+                     stdout=out, stderr=err)
+        assert Author.objects.filter(first_name__startswith='Nombre').count() == 5
+        assert Book.objects.filter(title__startswith='Libro').count() == 23
+        assert Book.authors.through.objects.filter(book__title__startswith='Libro').count() == 46
+        assert 'libros #24' in err.getvalue()
+        assert 'registros/s' in out.getvalue()
+        stats = AuthorStats.objects.get(author_id=authors[0]['id'])
+        assert stats.total_books == Author.objects.get(id=authors[0]['id']).books.count()
+
+        # Reimportar actualiza en lugar de duplicar.
+        books[0]['title'] = 'Libro 0 (revisado)'
+        authors_path, books_path = self.write_catalog(tmp_path, authors, books)
+        call_command('import_catalog', books=str(books_path), stdout=io.StringIO(), stderr=io.StringIO())
+        assert Book.objects.filter(title__startswith='Libro').count() == 23
+        assert Book.objects.get(isbn=isbn13('978100000000')).title == 'Libro 0 (revisado)'
+
+    def test_import_csv_roundtrip_from_export(self, auth_client, create_authors_and_books, tmp_path):
+        response = auth_client.get(reverse('book-export'), {'format': 'csv'})
+        path = tmp_path / 'books.csv'
+        path.write_text(read_stream(response), encoding='utf-8')
+        before = {book.isbn: set(book.authors.values_list('id', flat=True)) for book in Book.objects.all()}
+        Book.authors.through.objects.all().delete()
+
+        call_command('import_catalog', books=str(path), stdout=io.StringIO(), stderr=io.StringIO())
+        after = {book.isbn: set(book.authors.values_list('id', flat=True)) for book in Book.objects.all()}
+        assert after == before
+
+
+# --- Tests para la búsqueda de libros ---
+
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='La búsqueda de texto completo requiere PostgreSQL')
+
+
+class TestBookSearch:
+
+    def test_search_falls_back_to_icontains(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-list'), {'search': 'soledad'})
+        assert [book['title'] for book in response.data['results']] == ['Cien años de soledad']
+
+    def test_search_by_isbn(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-list'), {'search': '9780307474971'})
+        assert [book['title'] for book in response.data['results']] == ['La casa de los espíritus']
+
+    @requires_postgresql
+    def test_search_includes_author_names(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-list'), {'search': 'Allende'})
+        titles = {book['title'] for book in response.data['results']}
+        assert titles == {'La casa de los espíritus', 'Crónica de una muerte anunciada'}
+
+    @requires_postgresql
+    def test_search_vector_follows_author_changes(self, auth_client, create_authors_and_books):
+        create_authors_and_books['book2'].authors.add(create_authors_and_books['author3'])
+        response = auth_client.get(reverse('book-list'), {'search': 'Vargas'})
+        assert [book['title'] for book in response.data['results']] == ['El amor en los tiempos del cólera']
+
+        author = create_authors_and_books['author3']
+        author.last_name = 'Llosa'
+        author.save()
+        response = auth_client.get(reverse('book-list'), {'search': 'Vargas'})
+        assert response.data['results'] == []
+
+    @requires_postgresql
+    def test_search_is_ranked(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book3']
+        book.summary = 'Una historia de soledad familiar.'
+        book.save()
+        response = auth_client.get(reverse('book-list'), {'search': 'soledad'})
+        titles = [book['title'] for book in response.data['results']]
+        # La coincidencia en el título pesa más que la del resumen.
+        assert titles == ['Cien años de soledad', 'La casa de los espíritus']
+
+    @requires_postgresql
+    def test_genre_trigram_index_is_on_genre_names(self, db):
+        if not has_trigram(connection.alias):
+            pytest.skip('pg_trgm no está instalada')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname, tablename FROM pg_indexes WHERE indexname LIKE '%%genre%%trgm'")
+            assert cursor.fetchall() == [('books_genre_name_trgm', 'books_authors_genre')]
+
+    @requires_postgresql
+    def test_bulk_upsert_updates_search_vector(self, auth_client, create_authors_and_books):
+        payload = [{'title': 'Pedro Páramo', 'isbn': '9788437604183', 'literary_genre': 'Novela',
+                    'authors_ids': [str(create_authors_and_books['author3'].id)]}]
+        auth_client.post(reverse('book-bulk'), payload, format='json')
+        response = auth_client.get(reverse('book-list'), {'search': 'páramo'})
+        assert [book['title'] for book in response.data['results']] == ['Pedro Páramo']
+
+
+# --- Tests para el comando audit_indexes ---
+
+class TestAuditIndexes:
+
+    def test_audit_reports_every_action(self, create_authors_and_books):
+        out = io.StringIO()
+        call_command('audit_indexes', json=True, min_rows=0, stdout=out)
+        report = json.loads(out.getvalue())
+        endpoints = {entry['endpoint'] for entry in report}
+        assert {'books price_range', 'books advance_search', 'authors books_statistics'} <= endpoints
+        assert all(entry['sql'].lstrip().upper().startswith('SELECT') for entry in report)
+        if connection.vendor == 'postgresql':
+            assert all(entry['total_cost'] is not None for entry in report)
+
+    def test_fail_on_seq_scan(self, create_authors_and_books):
+        # Con tablas de pocas filas el planificador recorre secuencialmente.
+        with pytest.raises(CommandError):
+            call_command('audit_indexes', fail_on_seq_scan=True, min_rows=0, stdout=io.StringIO())
+        call_command('audit_indexes', fail_on_seq_scan=True, min_rows=10 ** 9, stdout=io.StringIO())
+
+
+# --- Tests para el benchmark de la API ---
+
+class TestBenchmark:
+
+    def test_generate_catalog_is_deterministic(self, db):
+        Book.objects.all().delete()
+        Author.objects.all().delete()
+        result = generate_catalog(authors=20, books=100, seed=7, batch_size=30)
+        assert Book.objects.count() == 100
+        assert Author.objects.count() == 20
+        links = set(Book.authors.through.objects.values_list('book_id', 'author_id'))
+        assert len(links) == result['links']
+        fanout = Book.objects.annotate(n=Count('authors')).aggregate(low=Min('n'), high=Max('n'))
+        assert 1 <= fanout['low'] and fanout['high'] <= 5
+        assert AuthorStats.objects.aggregate(total=Sum('total_books'))['total'] == len(links)
+
+        # Repetir con los mismos parámetros no duplica filas.
+        generate_catalog(authors=20, books=100, seed=7, batch_size=30)
+        assert Book.objects.count() == 100
+        assert set(Book.authors.through.objects.values_list('book_id', 'author_id')) == links
+
+    def test_run_benchmark_command(self, db, tmp_path):
+        generate_catalog(authors=10, books=40)
+        output = tmp_path / 'result.json'
+        call_command('run_benchmark', requests=3, warmup=0, output=str(output), stdout=io.StringIO())
+        result = json.loads(output.read_text())
+        assert {'books price_range', 'books advance_search', 'authors books_statistics'} <= set(result['endpoints'])
+        for metrics in result['endpoints'].values():
+            assert metrics['statuses'] == [200]
+            assert metrics['requests'] == 3
+            assert metrics['p50_ms'] <= metrics['p95_ms'] <= metrics['p99_ms']
+            assert metrics['queries_per_request'] >= 1
+            assert metrics['peak_alloc_kb'] > 0
+        # La memoria es de cada endpoint, no el pico acumulado del proceso.
+        assert len({metrics['peak_alloc_kb'] for metrics in result['endpoints'].values()}) > 1
+        assert result['peak_rss_kb'] > 0
+
+        out = io.StringIO()
+        call_command('run_benchmark', requests=3, warmup=0, baseline=str(output), tolerance=100,
+                     endpoint=['books list'], stdout=out)
+        assert 'Sin regresiones' in out.getvalue()
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {'endpoints': {'books list': {'p95_ms': 10.0, 'queries_per_request': 4}}}
+        current = {'endpoints': {'books list': {'p95_ms': 13.0, 'queries_per_request': 5}}}
+        regressions = compare_results(current, baseline, tolerance=0.2)
+        assert [regression['metric'] for regression in regressions] == ['p95_ms', 'queries_per_request']
+        assert compare_results(current, baseline, tolerance=0.5)[0]['metric'] == 'queries_per_request'
+
+
+# --- Tests para las métricas por request ---
+
+class TestRequestMetrics:
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+
+    def test_server_timing_header(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('book-list'))
+        timing = response['Server-Timing']
+        assert 'db;dur=' in timing and 'serializer;dur=' in timing and 'total;dur=' in timing
+
+    def test_metrics_endpoint_aggregates_by_action(self, auth_client, api_client, create_authors_and_books):
+        auth_client.get(reverse('book-list'))
+        auth_client.get(reverse('book-price-range'), {'min_price': 10, 'max_price': 30})
+        response = api_client.get(reverse('metrics'))
+        assert response.status_code == status.HTTP_200_OK
+        body = response.content.decode()
+        labels = 'view="book-list",action="list",method="GET"'
+        assert f'http_request_db_queries_count{{{labels}}} 1' in body
+        assert 'http_request_duration_seconds_bucket{view="book-price-range",action="price_range"' in body
+        assert f'http_request_serializer_duration_seconds_count{{{labels}}} 1' in body
+        assert f'http_response_size_bytes_count{{{labels}}} 1' in body
+
+    def test_metrics_token(self, api_client, settings):
+        settings.METRICS_TOKEN = 'secreto'
+        assert api_client.get(reverse('metrics')).status_code == status.HTTP_403_FORBIDDEN
+        response = api_client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_pool_stats(self, api_client, monkeypatch):
+        stats = {'default': {'pool_size': 3, 'pool_available': 2, 'pool_max': 10, 'requests_waiting': 0}}
+        monkeypatch.setattr(metrics, 'pool_stats', stats.get)
+        body = api_client.get(reverse('metrics')).content.decode()
+        assert 'db_pool_connections{alias="default"} 3' in body
+        assert '# TYPE db_pool_requests_total counter' in body
+        # Los contadores que psycopg_pool todavía no informa se exportan en 0.
+        assert 'db_pool_requests_errors_total{alias="default"} 0' in body
+
+    def test_health(self, api_client, db, settings):
+        response = api_client.get(reverse('health'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'status': 'ok'}
+
+        settings.METRICS_TOKEN = 'secreto'
+        assert api_client.get(reverse('health'), HTTP_AUTHORIZATION='Bearer otro').json() == {'status': 'ok'}
+        data = api_client.get(reverse('health'), HTTP_AUTHORIZATION='Bearer secreto').json()
+        assert data['databases']['default']['status'] == 'ok'
+        assert 'pool' in data['databases']['default']
+
+    def test_health_failure_hides_details(self, api_client, db, monkeypatch):
+        monkeypatch.setattr('core.health.database_status', lambda alias: {'status': 'error'})
+        response = api_client.get(reverse('health'))
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {'status': 'error'}
+
+    def test_duplicate_queries(self):
+        request_metrics = metrics.RequestMetrics()
+        execute = lambda sql, params, many, context: None  # noqa: E731
+        for params in ([1], [2], [3]):
+            request_metrics(execute, 'SELECT %s', params, False, {})
+        request_metrics(execute, 'SELECT 1', [], False, {})
+        assert request_metrics.queries == 4
+        assert request_metrics.duplicate_queries == 2
+
+
+# --- Tests para los serializadores de solo lectura ---
+
+class TestFastSerializers:
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_books_match_book_serializer(self, create_authors_and_books):
+        book = create_authors_and_books['book1']
+        book.published_date = None
+        book.price = Decimal('7.5')
+        book.save()
+        create_authors_and_books['author1'].birth_date = None
+        create_authors_and_books['author1'].save()
+        queryset = Book.objects.prefetch_related('authors').order_by('title', 'id')
+        fast = FastBookSerializer()
+        expected = self.render(BookSerializer(queryset, many=True).data)
+        assert self.render(fast.to_representation(fast.values(queryset))) == expected
+
+    def test_authors_match_in_other_timezone(self, create_authors_and_books):
+        queryset = Author.objects.order_by('last_name', 'first_name', 'id')
+        fast = FastAuthorSerializer()
+        with timezone.override('America/Bogota'):
+            expected = self.render(AuthorSerializer(queryset, many=True).data)
+            assert self.render(fast.to_representation(fast.values(queryset))) == expected
+        assert b'-05:00' in expected
+
+    def test_endpoints_match_book_serializer(self, auth_client, create_authors_and_books):
+        book = create_authors_and_books['book2']
+        # Asignar los autores actualizó updated_at en la base de datos.
+        book.refresh_from_db()
+        response = auth_client.get(reverse('book-detail', args=[book.id]))
+        assert response.content == self.render(BookSerializer(book).data)
+
+        response = auth_client.get(reverse('book-list'), {'page_size': 100})
+        queryset = Book.objects.prefetch_related('authors').order_by('title', 'id')
+        assert self.render(response.data['results']) == self.render(BookSerializer(queryset, many=True).data)
+
+    def test_retrieve_unknown_or_invalid_id(self, auth_client, create_authors_and_books):
+        assert auth_client.get(reverse('book-detail', args=[uuid.uuid4()])).status_code == 404
+        assert auth_client.get(reverse('author-detail', args=['no-es-uuid'])).status_code == 404
+
+    def test_serializer_benchmark_command(self, create_authors_and_books):
+        out = io.StringIO()
+        call_command('benchmark_serializers', rows=10, repeat=1, json=True, stdout=out)
+        results = json.loads(out.getvalue())
+        assert results['books']['identical'] and results['authors']['identical']
+        assert results['books']['rows'] == Book.objects.count()
+
+
+# --- Tests para FastJSONRenderer ---
+
+class TestFastJSONRenderer:
+
+    def payload(self):
+        return {
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'price': Decimal('19.90'),
+            'published_date': date(2020, 5, 17),
+            'created_at': datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+            'updated_at': timezone.localtime(datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)),
+            'title': 'Línea separada',
+            'results': [{'pages': 10, 'ratio': 0.1, 'ok': True, 'bio': None}],
+        }
+
+    def test_matches_drf_renderer(self):
+        expected = JSONRenderer().render(self.payload())
+        assert FastJSONRenderer().render(self.payload()) == expected
+        assert b'\\u2028' in expected and b'.123456Z' in expected
+
+    def test_falls_back_to_drf(self, monkeypatch):
+        data = {'big': 2 ** 70, 1: 'clave numérica'}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        indented = FastJSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        assert indented == JSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        monkeypatch.setattr('books_authors.renderers.orjson', None)
+        assert FastJSONRenderer().render(self.payload()) == JSONRenderer().render(self.payload())
+
+    def test_api_uses_fast_renderer(self, auth_client, create_authors_and_books):
+        response = auth_client.get(reverse('author-books-statistics'))
+        assert isinstance(response.accepted_renderer, FastJSONRenderer)
+        assert response.content == JSONRenderer().render(response.data)
+
+    def test_renderer_benchmark_command(self, create_authors_and_books):
+        out = io.StringIO()
+        call_command('benchmark_renderers', rows=10, repeat=1, json=True, stdout=out)
+        results = json.loads(out.getvalue())
+        assert all(result['identical'] for result in results.values())
+
+
+# --- Tests para los endpoints asíncronos ---
+
+@pytest.fixture
+def async_get(test_user):
+    token = str(RefreshToken.for_user(test_user).access_token)
+    client = AsyncClient()
+
+    def get(url, params=None, **headers):
+        headers.setdefault('Authorization', f'Bearer {token}')
+        # async_to_sync ejecuta el ORM en este hilo, dentro de la transacción de la prueba.
+        return async_to_sync(client.get)(url, params or {}, headers=headers)
+
+    return get
+
+
+class TestAsyncViews:
+    ENDPOINTS = [
+        ('book-list', 'async-book-list', {}),
+        ('book-list', 'async-book-list', {'page': 2, 'page_size': 2}),
+        ('book-list', 'async-book-list', {'page': 'last', 'page_size': 3}),
+        ('book-list', 'async-book-list', {'pagination': 'cursor', 'page_size': 2}),
+        ('book-list', 'async-book-list', {'search': 'amor'}),
+        ('book-list', 'async-book-list', {'literary_genre': 'realismo'}),
+        ('book-advance-search', 'async-book-advance-search', {'genre': 'Realismo', 'min_pages': 0}),
+        ('author-list', 'async-author-list', {'page_size': 2}),
+        ('author-books-statistics', 'async-author-books-statistics', {}),
+    ]
+
+    @pytest.mark.parametrize('name, async_name, params', ENDPOINTS)
+    def test_matches_sync_endpoint(self, auth_client, async_get, create_authors_and_books, name, async_name,
+                                   params):
+        expected = auth_client.get(reverse(name), params)
+        response = async_get(reverse(async_name), params)
+        assert response.status_code == expected.status_code == status.HTTP_200_OK
+        assert response.content.replace(b'/api/async/', b'/api/') == expected.content
+
+    def test_detail_matches_sync_endpoint(self, auth_client, async_get, create_authors_and_books):
+        book = create_authors_and_books['book4']
+        author = create_authors_and_books['author1']
+        assert async_get(reverse('async-book-detail', args=[book.id])).content == \
+            auth_client.get(reverse('book-detail', args=[book.id])).content
+        assert async_get(reverse('async-author-detail', args=[author.id])).content == \
+            auth_client.get(reverse('author-detail', args=[author.id])).content
+
+    def test_not_found(self, async_get, create_authors_and_books):
+        assert async_get(reverse('async-book-detail', args=[uuid.uuid4()])).status_code == 404
+        assert async_get(reverse('async-author-detail', args=['no-es-uuid'])).status_code == 404
+        assert async_get(reverse('async-book-list'), {'page': 99}).status_code == 404
+        assert async_get(reverse('async-book-list'), {'cursor': 'no-es-un-cursor'}).status_code == 404
+
+    def test_requires_authentication(self, async_get, create_authors_and_books):
+        response = async_get(reverse('async-book-list'), Authorization='')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['WWW-Authenticate'].startswith('Bearer')
+        assert async_get(reverse('async-book-list'), Authorization='Bearer invalido').status_code == 401
+
+    def test_parallel_count_and_page(self, transactional_db, settings, test_user, async_get):
+        settings.ASYNC_PARALLEL_QUERIES = True
+        Book.objects.all().delete()
+        novela, spanish = genre('Novela'), language('Español')
+        Book.objects.bulk_create([Book(title=f'Libro {i}', isbn=f'978200000{i:04d}', literary_genre=novela,
+                                       language=spanish) for i in range(7)])
+        response = async_get(reverse('async-book-list'), {'page': 2, 'page_size': 5})
+        data = json.loads(response.content)
+        assert data['count'] == 7
+        assert [book['title'] for book in data['results']] == ['Libro 5', 'Libro 6']
+
+    def test_load_test_endpoints(self, db):
+        generate_catalog(authors=10, books=40)
+        endpoints = load_test_endpoints()
+        assert {'books list', 'books retrieve', 'books advance_search', 'authors books_statistics'} <= {
+            name for name, _, _ in endpoints}
+        for name, sync_url, async_url in endpoints:
+            assert async_url.replace('/api/async/', '/api/') == sync_url
+
+
+# --- Tests para el enrutamiento a réplicas de lectura ---
+
+class TestReadReplicaRouter:
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = {'replica_1': 2, 'replica_2': 1}
+        settings.DATABASE_REPLICA_POLICY = 'round_robin'
+        settings.DATABASE_READ_YOUR_WRITES_SECONDS = 5
+
+    @pytest.fixture
+    def routed(self):
+        """Ejecuta un request por ReplicaRoutingMiddleware y devuelve la base usada para leer un Book."""
+        router = db_router.ReadReplicaRouter()
+        # Sin la base de pruebas: dentro de su transacción todas las lecturas irían a default.
+        token = str(RefreshToken.for_user(get_user_model()(pk=1, username='lector')).access_token)
+
+        def get_response(request):
+            if request.method == 'POST':
+                router.db_for_write(Book)
+            request.read_alias = router.db_for_read(Book)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+
+        def request(method='get', token=token):
+            request = getattr(RequestFactory(), method)('/api/books/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            middleware(request)
+            return request.read_alias
+
+        return request
+
+    def test_round_robin_is_weighted(self):
+        chosen = [db_router.choose_replica() for _ in range(6)]
+        assert chosen.count('replica_1') == 4 and chosen.count('replica_2') == 2
+        assert chosen[:3] == chosen[3:]
+
+    def test_weighted_choice(self, settings):
+        settings.DATABASE_REPLICA_POLICY = 'weighted'
+        settings.DATABASE_REPLICAS = {'replica_1': 1, 'replica_2': 0}
+        assert {db_router.choose_replica() for _ in range(20)} == {'replica_1'}
+
+    def test_reads_outside_requests_use_primary(self):
+        assert db_router.ReadReplicaRouter().db_for_read(Book) is None
+
+    def test_writes_pin_the_request_to_primary(self, transactional_db):
+        router = db_router.ReadReplicaRouter()
+        token = db_router.activate(db_router.RoutingState('replica_1'))
+        try:
+            assert router.db_for_read(Book) == 'replica_1'
+            with transaction.atomic():
+                assert router.db_for_read(Book) is None
+            assert router.db_for_write(Book) == 'default'
+            assert router.db_for_read(Book) is None
+        finally:
+            db_router.deactivate(token)
+
+    def test_read_your_writes(self, routed):
+        replicas = {'replica_1', 'replica_2'}
+        assert routed() in replicas
+        assert routed('post') is None
+        # El mismo usuario lee de default; otro cliente sigue usando réplicas.
+        assert routed() is None
+        assert routed(token='') in replicas
+        cache.clear()
+        assert routed() in replicas
+
+    def test_no_replicas(self, routed, settings):
+        settings.DATABASE_REPLICAS = {}
+        assert routed() is None
+
+    def test_replicas_are_not_migrated(self):
+        router = db_router.ReadReplicaRouter()
+        assert router.allow_migrate('replica_1', 'books_authors') is False
+        assert router.allow_migrate('default', 'books_authors') is None
+
+
+
+# --- Tests para la autenticación con usuario cacheado ---
+
+def user_queries(ctx):
+    return [query['sql'] for query in ctx.captured_queries if 'auth_user' in query['sql']]
+
+
+class TestCachedAuthentication:
+
+    def test_second_request_has_no_auth_queries(self, auth_client):
+        url = reverse('book-detail', kwargs={'pk': 0})
+        with CaptureQueriesContext(connection) as first:
+            auth_client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            auth_client.get(url)
+        assert len(user_queries(first)) == 1
+        assert user_queries(second) == []
+        assert len(first) - len(second) == 1
+
+    def test_cache_hits_are_exported(self, auth_client):
+        metrics.reset()
+        load_cached_user(auth_client)
+        load_cached_user(auth_client)
+        assert AUTH_USER_CACHE.value(('miss',)) == 1
+        assert AUTH_USER_CACHE.value(('hit',)) == 1
+
+    def test_deactivation_invalidates(self, auth_client, test_user):
+        load_cached_user(auth_client)
+        test_user.is_active = False
+        test_user.save()
+        response = auth_client.get(reverse('book-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_delete_invalidates(self, auth_client, test_user):
+        load_cached_user(auth_client)
+        test_user.delete()
+        response = auth_client.get(reverse('book-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_group_change_invalidates(self, auth_client, test_user):
+        load_cached_user(auth_client)
+        test_user.groups.add(Group.objects.create(name='editores'))
+        with CaptureQueriesContext(connection) as ctx:
+            load_cached_user(auth_client)
+        assert len(user_queries(ctx)) == 1
+
+    def test_requests_get_their_own_copy(self, auth_client, test_user):
+        load_cached_user(auth_client)
+        first = CachedJWTAuthentication().get_user(RefreshToken.for_user(test_user).access_token)
+        first.first_name = 'Otro'
+        second = CachedJWTAuthentication().get_user(RefreshToken.for_user(test_user).access_token)
+        assert second.first_name == ''
+
+    def test_session_user_is_cached(self, test_user):
+        client = APIClient()
+        client.force_login(test_user)
+        load_cached_user(client)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse('book-detail', kwargs={'pk': 0}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        # Ni la sesión (cached_db) ni el usuario se leen de la base de datos.
+        assert [query['sql'] for query in ctx.captured_queries
+                if 'auth_user' in query['sql'] or 'django_session' in query['sql']] == []
+
+    def test_async_views_use_the_cache(self, async_get, create_authors_and_books):
+        url = reverse('async-book-detail', kwargs={'pk': create_authors_and_books['book1'].pk})
+        async_get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            assert async_get(url).status_code == status.HTTP_200_OK
+        assert user_queries(ctx) == []
+
+    def test_ttl_cache(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr('core.ttl_cache.time.monotonic', lambda: now[0])
+        ttl_cache = TTLCache(maxsize=2, ttl=10)
+        ttl_cache.set('a', 1)
+        ttl_cache.set('b', 2)
+        assert ttl_cache.get('a') == 1
+        ttl_cache.set('c', 3)
+        # 'b' era la entrada usada hace más tiempo.
+        assert ttl_cache.get('b') is None
+        now[0] = 11
+        assert ttl_cache.get('a') is None
+        disabled = TTLCache(maxsize=2, ttl=0)
+        disabled.set('a', 1)
+        assert disabled.get('a') is None
+
+
+# --- Tests para los trabajos en segundo plano ---
+
+requires_row_locks = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='SKIP LOCKED y los workers en varios procesos requieren PostgreSQL')
+
+
+def run_worker(**options):
+    call_command('run_worker', burst=True, concurrency=1, stdout=io.StringIO(), **options)
+
+
+class TestJobs:
+
+    @pytest.fixture(autouse=True)
+    def keep_test_connection(self, monkeypatch):
+        # Como el cliente de pruebas de Django: no cerrar la conexión que tiene abierta la transacción del test.
+        monkeypatch.setattr('books_authors.jobs.close_old_connections', lambda: None)
+
+    def submit(self, client, kind, params=None):
+        return client.post(reverse('job-list'), {'kind': kind, 'params': params or {}}, format='json')
+
+    def test_submit_poll_and_run_import(self, auth_client, create_authors_and_books):
+        author = create_authors_and_books['author1']
+        records = [{'title': f'Libro {i}', 'isbn': isbn13(f'9782000000{i:02d}'), 'literary_genre': 'Novela',
+                    'authors_ids': [str(author.id)]} for i in range(2)]
+        records.append({'title': 'Sin ISBN', 'literary_genre': 'Novela'})
+        response = self.submit(auth_client, 'import_books', {'records': records})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response['Location'].endswith(reverse('job-detail', kwargs={'pk': response.data['id']}))
+        assert response.data['status'] == Job.PENDING
+        assert 'params' not in response.data
+        assert not Book.objects.filter(title__startswith='Libro').exists()
+
+        run_worker()
+        job = auth_client.get(response['Location']).data
+        assert job['status'] == Job.SUCCEEDED
+        assert job['progress'] == 100
+        assert job['attempts'] == 1
+        assert job['result']['created'] == 2
+        assert job['result']['failed'] == 1
+        assert job['result']['errors'][0]['index'] == 2
+        assert author.books.filter(title__startswith='Libro').count() == 2
+        assert AuthorStats.objects.get(author=author).total_books == author.books.count()
+
+    @pytest.mark.parametrize('data, field', [
+        ({'kind': 'unknown'}, 'kind'),
+        ({'kind': 'import_books', 'params': {'records': []}}, 'params'),
+        ({'kind': 'import_books', 'params': []}, 'params'),
+        ({'kind': 'export_books', 'params': {'format': 'xml'}}, 'params'),
+    ])
+    def test_invalid_jobs_are_rejected(self, auth_client, data, field):
+        response = auth_client.post(reverse('job-list'), data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert field in response.data
+        assert not Job.objects.exists()
+
+    def test_import_size_limit(self, auth_client, settings):
+        settings.JOB_IMPORT_MAX_ITEMS = 1
+        response = self.submit(auth_client, 'import_authors', {'records': [{'first_name': 'A'}] * 2})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_jobs_are_visible_only_to_their_owner(self, auth_client, db):
+        other = get_user_model().objects.create_user(username='other', password='x')
+        job = Job.objects.create(kind='rebuild_facet_counts', created_by=other)
+        assert auth_client.get(reverse('job-detail', kwargs={'pk': job.pk})).status_code == status.HTTP_404_NOT_FOUND
+        assert auth_client.get(reverse('job-list')).data['count'] == 0
+        other.is_staff = True
+        other.save()
+        auth_client.force_authenticate(other)
+        assert auth_client.get(reverse('job-list'), {'status': Job.PENDING}).data['count'] == 1
+
+    @pytest.mark.parametrize('export_format', ['ndjson', 'csv'])
+    def test_export_download(self, auth_client, create_authors_and_books, settings, tmp_path, export_format):
+        settings.JOB_RESULTS_DIR = tmp_path
+        job_id = self.submit(auth_client, 'export_books', {'format': export_format}).data['id']
+        url = reverse('job-download', kwargs={'pk': job_id})
+        assert auth_client.get(url).status_code == status.HTTP_409_CONFLICT
+
+        run_worker()
+        job = Job.objects.get(pk=job_id)
+        assert job.result['rows'] == Book.objects.count()
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert f'books.{export_format}' in response['Content-Disposition']
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        if export_format == 'csv':
+            assert lines[0].split(',')[:2] == ['id', 'title']
+            lines = lines[1:]
+        assert len(lines) == Book.objects.count()
+        assert [path.name for path in tmp_path.iterdir()] == [f'{job_id}.{export_format}']
+
+    def test_download_requires_an_export(self, auth_client, test_user):
+        job = Job.objects.create(kind='rebuild_facet_counts', created_by=test_user, status=Job.SUCCEEDED)
+        response = auth_client.get(reverse('job-download', kwargs={'pk': job.pk}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_rebuild_author_stats(self, create_authors_and_books, test_user):
+        AuthorStats.objects.all().delete()
+        job = Job.objects.create(kind='rebuild_author_stats', created_by=test_user)
+        run_worker()
+        job.refresh_from_db()
+        assert job.result == {'authors': Author.objects.count()}
+        assert_stats_match(create_authors_and_books['author1'])
+
+    def test_failed_job_keeps_the_error(self, db, monkeypatch):
+        def fail(job):
+            raise RuntimeError('sin espacio')
+
+        monkeypatch.setitem(JOB_TYPES, 'fail', JobType(fail))
+        first = Job.objects.create(kind='fail')
+        second = Job.objects.create(kind='rebuild_facet_counts')
+        run_worker()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.status, first.attempts, first.error) == (Job.FAILED, 1, 'RuntimeError: sin espacio')
+        assert first.finished_at is not None
+        assert second.status == Job.SUCCEEDED
+
+    def test_jobs_run_in_creation_order(self, db):
+        now = timezone.now()
+        newer = Job.objects.create(kind='rebuild_facet_counts', created_at=now)
+        older = Job.objects.create(kind='rebuild_facet_counts', created_at=now - timedelta(minutes=1))
+        assert claim_job('w1').pk == older.pk
+        assert claim_job('w2').pk == newer.pk
+        assert claim_job('w3') is None
+
+    def test_stale_jobs_are_retried_up_to_max_attempts(self, db, settings):
+        settings.JOB_MAX_ATTEMPTS = 2
+        stale = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+        job = Job.objects.create(kind='rebuild_facet_counts', status=Job.RUNNING, attempts=1, worker='dead',
+                                 heartbeat_at=stale)
+        Job.objects.create(kind='rebuild_facet_counts', status=Job.RUNNING, attempts=1, heartbeat_at=timezone.now())
+
+        claimed = claim_job('w1')
+        assert (claimed.pk, claimed.attempts, claimed.worker) == (job.pk, 2, 'w1')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=stale)
+        assert claim_job('w2') is None
+        job.refresh_from_db()
+        assert job.status == Job.FAILED
+        assert '2 intentos' in job.error
+
+    def test_finished_job_is_not_overwritten_after_retry(self, db, monkeypatch):
+        # El primer worker vuelve tarde: su resultado no pisa el del intento siguiente.
+        def reclaimed(job):
+            Job.objects.filter(pk=job.pk).update(attempts=F('attempts') + 1)
+            return {'worker': job.worker}
+
+        monkeypatch.setitem(JOB_TYPES, 'reclaimed', JobType(reclaimed))
+        job = Job.objects.create(kind='reclaimed')
+        run_worker()
+        job.refresh_from_db()
+        assert job.status == Job.RUNNING
+        assert job.result is None
+
+    @requires_row_locks
+    def test_claim_skips_locked_jobs(self, transactional_db):
+        first = Job.objects.create(kind='rebuild_facet_counts', created_at=timezone.now() - timedelta(minutes=1))
+        second = Job.objects.create(kind='rebuild_facet_counts')
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with transaction.atomic():
+                Job.objects.select_for_update().get(pk=first.pk)
+                locked.set()
+                release.wait(10)
+            connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            assert locked.wait(10)
+            assert claim_job('w1').pk == second.pk
+        finally:
+            release.set()
+            thread.join()
+        assert claim_job('w2').pk == first.pk
+
+    @requires_row_locks
+    def test_concurrent_worker_processes(self, transactional_db, monkeypatch):
+        def sleep(job):
+            time.sleep(0.3)
+            return {'pid': os.getpid()}
+
+        monkeypatch.setitem(JOB_TYPES, 'sleep', JobType(sleep))
+        Job.objects.bulk_create([Job(kind='sleep') for _ in range(6)])
+        started = time.monotonic()
+        call_command('run_worker', burst=True, concurrency=3, stdout=io.StringIO())
+        assert time.monotonic() - started < 6 * 0.3
+        jobs = list(Job.objects.all())
+        assert {(job.status, job.attempts) for job in jobs} == {(Job.SUCCEEDED, 1)}
+        assert len({job.result['pid'] for job in jobs}) > 1
+        assert os.getpid() not in {job.result['pid'] for job in jobs}
+
+
+# --- Tests para la validación de authors_ids (AuthorIdsField) ---
+
+class TestAuthorIdsField:
+    @pytest.fixture
+    def authors(self, db):
+        return Author.objects.bulk_create([Author(first_name='Autor', last_name=str(i)) for i in range(6)])
+
+    @staticmethod
+    def book_data(authors, isbn='9780000000001'):
+        return {'title': 'Libro', 'published_date': '2001-01-01', 'isbn': isbn, 'literary_genre': 'Novela',
+                'authors_ids': [str(author.pk) for author in authors]}
+
+    @staticmethod
+    def author_queries(queries):
+        return [query for query in queries if 'FROM "books_authors_author"' in query['sql']]
+
+    def write_queries(self, client, method, url, data):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(client, method)(url, data, format='json')
+        assert response.status_code in (status.HTTP_200_OK, status.HTTP_201_CREATED), response.data
+        return len(ctx)
+
+    def test_create_and_update_queries_do_not_grow_with_authors(self, auth_client, authors):
+        load_cached_user(auth_client)
+        url = reverse('book-list')
+        # El primer libro crea el género y el idioma.
+        self.write_queries(auth_client, 'post', url, self.book_data([], '9780000000000'))
+        author_id_cache.clear()
+        one = self.write_queries(auth_client, 'post', url, self.book_data(authors[:1], '9780000000001'))
+        author_id_cache.clear()
+        many = self.write_queries(auth_client, 'post', url, self.book_data(authors[1:], '9780000000002'))
+        assert one == many
+
+        book = Book.objects.get(isbn='9780000000002')
+        detail = reverse('book-detail', kwargs={'pk': book.pk})
+        author_id_cache.clear()
+        one = self.write_queries(auth_client, 'patch', detail, {'authors_ids': [str(authors[0].pk)]})
+        author_id_cache.clear()
+        many = self.write_queries(auth_client, 'patch', detail, {'authors_ids': [str(a.pk) for a in authors[1:]]})
+        assert one == many
+        assert set(book.authors.values_list('pk', flat=True)) == {author.pk for author in authors[1:]}
+
+    def test_validates_with_one_query_then_from_cache(self, authors):
+        AUTHOR_ID_CACHE.reset()
+        data = self.book_data(authors + authors[:2])
+        with CaptureQueriesContext(connection) as ctx:
+            serializer = BookSerializer(data=data)
+            assert serializer.is_valid(), serializer.errors
+        assert len(self.author_queries(ctx.captured_queries)) == 1
+        assert serializer.validated_data['authors'] == [author.pk for author in authors]
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert BookSerializer(data=data).is_valid()
+        assert self.author_queries(ctx.captured_queries) == []
+        assert AUTHOR_ID_CACHE.value(('miss',)) == 6
+        assert AUTHOR_ID_CACHE.value(('hit',)) == 6
+
+    @pytest.mark.parametrize('value', [['no-es-uuid'], [5], [str(uuid.uuid4())], 'texto', [{}]])
+    def test_errors_match_primary_key_related_field(self, authors, value):
+        class Reference(serializers.Serializer):
+            authors_ids = serializers.PrimaryKeyRelatedField(many=True, queryset=Author.objects.all())
+
+        reference = Reference(data={'authors_ids': value})
+        assert not reference.is_valid()
+        serializer = BookSerializer(data={**self.book_data(authors), 'authors_ids': value})
+        assert not serializer.is_valid()
+        assert serializer.errors['authors_ids'] == reference.errors['authors_ids']
+
+    def test_deleting_an_author_drops_it_from_the_cache(self, authors):
+        data = self.book_data(authors[:2])
+        assert BookSerializer(data=data).is_valid()
+        assert author_id_cache.get(authors[0].pk)
+        authors[0].delete()
+        assert author_id_cache.get(authors[0].pk) is None
+        serializer = BookSerializer(data=data)
+        assert not serializer.is_valid()
+        assert 'authors_ids' in serializer.errors
+
+    def test_stale_cached_id_is_a_validation_error(self, transactional_db):
+        # Autor eliminado por otro proceso: su id sigue en la caché de este.
+        deleted = uuid.uuid4()
+        author_id_cache.set(deleted, True)
+        serializer = BookSerializer(data=self.book_data([Author(pk=deleted)]))
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(serializers.ValidationError) as error:
+            serializer.save()
+        assert f'"{deleted}"' in str(error.value.detail['authors_ids'][0])
+        assert not Book.objects.filter(isbn='9780000000001').exists()
+        assert author_id_cache.get(deleted) is None
+
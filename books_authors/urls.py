@@ -1,8 +1,23 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import AuthorViewSet, BookViewSet
+
+from . import async_views
+from .views import AuthorViewSet, BookViewSet, JobViewSet
 
 router = DefaultRouter()
 router.register(r"authors", AuthorViewSet)
 router.register(r"books", BookViewSet)
+router.register(r"jobs", JobViewSet)
+
+# Lecturas asíncronas para ASGI (books_authors.async_views)
+async_urlpatterns = [
+    path("async/books/", async_views.book_list, name="async-book-list"),
+    path("async/books/advance_search/", async_views.book_advance_search, name="async-book-advance-search"),
+    path("async/books/<str:pk>/", async_views.book_detail, name="async-book-detail"),
+    path("async/authors/", async_views.author_list, name="async-author-list"),
+    path("async/authors/books_statistics/", async_views.author_books_statistics,
+         name="async-author-books-statistics"),
+    path("async/authors/<str:pk>/", async_views.author_detail, name="async-author-detail"),
+]
 
-urlpatterns = router.urls
+urlpatterns = router.urls + async_urlpatterns
@@ -1,26 +1,153 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets, filters
+from rest_framework import mixins, viewsets, status
 from rest_framework.permissions import IsAuthenticated
 
-from django.db.models import Count, Avg, Max, Min, Sum, Q
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Q
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
-from .models import Book, Author
+from .bulk import upsert_books, validate_books
+from .cache import AUTHOR_STATS, AUTHORS, BOOKS, cached_response
+from .changes import changes_response
+from .conditional import ConditionalReadMixin
+from .export import AUTHOR_EXPORT_FIELDS, BOOK_EXPORT_FIELDS, author_rows, book_rows, streaming_export
+from .facets import facet_counts, facets_response_data
+from .fast_serializers import FastAuthorSerializer, FastBookSerializer, get_fast_serializer, requested_fieldset
+from .jobs import JobSerializer, result_path
+from .models import Book, Author, Genre, Language, Job, Tombstone
+from .pagination import AuthorPagination, BookPagination
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from .search import BookSearchFilter
 from .serializers import BookSerializer, AuthorSerializer
 
-class AuthorViewSet(viewsets.ModelViewSet):
+def filter_updated_since(queryset, request):
+    """
+    Aplica el watermark ``?updated_since=`` (fecha y hora ISO 8601) sobre updated_at.
+
+    Las zonas horarias ausentes se interpretan en la zona horaria del proyecto.
+    """
+    value = request.query_params.get('updated_since')
+    if not value:
+        return queryset
+    watermark = parse_datetime(value)
+    if watermark is None:
+        raise ValidationError({'updated_since': 'Fecha y hora inválida, se espera ISO 8601.'})
+    if timezone.is_naive(watermark):
+        watermark = timezone.make_aware(watermark)
+    return queryset.filter(updated_at__gt=watermark)
+
+
+def filter_language(queryset, language):
+    """
+    Filtra por idioma sin distinguir mayúsculas. El nombre se busca en la tabla
+    Language (índice único LOWER(name)) y los libros por igualdad sobre
+    language_id, que es el prefijo del índice book_language_pages_idx.
+    """
+    return queryset.filter(language__in=Language.objects.named(language))
+
+
+def filter_genre(queryset, genre):
+    """
+    Filtra por género literario que contenga ``genre`` sin distinguir mayúsculas.
+    El texto se compara solo contra la tabla Genre; los libros se filtran por
+    literary_genre_id.
+    """
+    return queryset.filter(literary_genre__in=Genre.objects.containing(genre))
+
+
+class FastReadMixin(ConditionalReadMixin):
+    """
+    Listado, detalle y acciones personalizadas de tipo listado con el serializador
+    de solo lectura ``read_serializer_class`` (books_authors.fast_serializers):
+    las filas se leen con ``.values()`` y se paginan igual que la acción list.
+    Las escrituras siguen usando ``serializer_class``.
+
+    Con ``?fields=``, ``?omit=`` y ``?expand=`` el cliente elige los campos de la
+    respuesta; solo se leen esas columnas.
+
+    Antes de leer las filas se responde 304 si el cliente ya tiene la versión
+    actual (books_authors.conditional).
+    """
+    read_serializer_class = None
+
+    def get_read_serializer(self):
+        # ?fields=, ?omit= y ?expand= (books_authors.fast_serializers.requested_fieldset).
+        serializer = get_fast_serializer(self.read_serializer_class)
+        return serializer.select(*requested_fieldset(self.request.query_params))
+
+    def keyset_fields(self):
+        """Columnas del orden keyset, necesarias en cada fila para construir el cursor."""
+        get_ordering = getattr(self, 'get_keyset_ordering', None)
+        ordering = (get_ordering() if get_ordering else None) or getattr(self.paginator, 'keyset_ordering', ())
+        return [field.lstrip('-') for field in ordering]
+
+    def paginated_response(self, queryset):
+        serializer = self.get_read_serializer()
+        rows = serializer.values(queryset, *self.keyset_fields())
+        if self.paginator is not None and self.paginator.is_keyset_mode(self.request):
+            # Sin sondeo: el ETag sale de la página leída (books_authors.conditional).
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                response = self.get_paginated_response(serializer.to_representation(page))
+                return self.check_content_not_modified(response.data) or response
+        not_modified = self.check_not_modified(queryset)
+        if not_modified is not None:
+            return not_modified
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(rows))
+
+    def list(self, request, *args, **kwargs):
+        return self.paginated_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_read_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            not_modified = self.check_not_modified(queryset.filter(**lookup), detail=True)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        if not_modified is not None:
+            return not_modified
+        row = get_object_or_404(serializer.values(queryset), **lookup)
+        self.check_object_permissions(request, row)
+        return Response(serializer.to_representation([row])[0])
+
+
+class AuthorViewSet(FastReadMixin, viewsets.ModelViewSet):
     """
     ViewSet para administrar operaciones del modelo Author a través de la API REST.
 
     Proporciona operaciones CRUD para autores e incluye:
     - Operaciones estándar de listado, creación, actualización y eliminación
-    - Serialización completa de datos de autores
+    - Serialización completa de datos de autores (lecturas con FastAuthorSerializer)
     - Acción personalizada para obtener autores ordenados por cantidad de libros
+    - Paginación keyset opcional (?pagination=cursor) sobre last_name, first_name, id
+    - Caché de respuestas GET, invalidada por señales de los modelos
+    - ETag/Last-Modified y respuestas 304 calculadas sobre updated_at (books_authors.conditional)
 
     Acciones personalizadas:
         more_books_order: Devuelve la lista de autores ordenada por cantidad de libros escritos
                          (GET /api/authors/more_books_order/)
+        books_statistics: Devuelve estadísticas de libros por autor desde AuthorStats
+                         (GET /api/authors/books_statistics/)
+        export: Exporta todos los autores en streaming NDJSON/CSV
+                         (GET /api/authors/export/)
+        changes: Feed de cambios (altas, modificaciones y bajas) desde un cursor
+                         (GET /api/authors/changes/?since=)
 
     Campos disponibles:
         - first_name
@@ -33,27 +160,54 @@ class AuthorViewSet(viewsets.ModelViewSet):
     
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
+    read_serializer_class = FastAuthorSerializer
+    pagination_class = AuthorPagination
     permission_classes = [IsAuthenticated]
 
+    export_chunk_size = 2000
+
+    MORE_BOOKS_ORDERING = ('-num_books', 'last_name', 'first_name', 'id')
+    STATS_ACTIONS = ('more_books_order', 'books_statistics')
+
+    def get_conditional_fields(self):
+        # Las acciones de estadísticas muestran además las filas de AuthorStats.
+        if self.action in self.STATS_ACTIONS:
+            return ('updated_at', 'stats__updated_at')
+        return super().get_conditional_fields()
+
+    def get_keyset_ordering(self):
+        if self.action == 'more_books_order':
+            return self.MORE_BOOKS_ORDERING
+        return None
+
+    @cached_response(AUTHORS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response(AUTHORS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False, methods=['get'])
+    @cached_response(AUTHOR_STATS)
     def more_books_order(self, request):
         """
         Devuelve los autores ordenados por la cantidad de libros que han escrito.
-        
-        Este método realiza una anotación sobre el queryset de autores,
-        contando la cantidad de libros asociados a cada autor mediante la 
-        relación 'books', y ordenando el resultado de forma descendente por
-        dicha cantidad.
-        
+
+        La cantidad de libros se lee de la tabla desnormalizada AuthorStats
+        (los autores sin libros cuentan como 0), por lo que no se agrega la
+        relación 'books' en cada consulta. Empates por apellido, nombre e id.
+
         Returns:
-            Response: Lista serializada de autores ordenada por número de libros.
-            Cada autor incluye todos sus campos junto con la cantidad de libros.
+            Response: Lista paginada de autores ordenada por número de libros.
         """
-        authors = Author.objects.annotate(num_books=Count('books')).order_by('-num_books')
-        serializer = self.get_serializer(authors, many=True)
-        return Response(serializer.data)
+        authors = Author.objects.annotate(
+            num_books=Coalesce('stats__total_books', 0)
+        ).order_by(*self.MORE_BOOKS_ORDERING)
+        return self.paginated_response(authors)
 
     @action(detail=False, methods=['get'])
+    @cached_response(AUTHOR_STATS)
     def books_statistics(self, request):
         """
         Devuelve estadísticas de los libros por autor.
@@ -65,43 +219,96 @@ class AuthorViewSet(viewsets.ModelViewSet):
         - Libro más barato 
         - Total de páginas escritas
 
+        Los valores se leen de la tabla AuthorStats, que se mantiene al día de
+        forma incremental, en lugar de agregar todos los libros en cada consulta.
+
         Returns:
-            Response: Diccionario con las estadísticas calculadas
+            Response: Lista paginada con las estadísticas de cada autor
         """
-        authors = Author.objects.annotate(
-            total_books=Count('books'),
-            avg_price=Avg('books__price'),
-            max_price=Max('books__price'),
-            min_price=Min('books__price'),
-            total_pages=Sum('books__pages')
-        ).values('id', 'first_name', 'last_name', 'total_books', 'avg_price', 'max_price', 'min_price', 'total_pages').order_by('last_name', 'first_name')
-
-        result = []
-        for author in authors:
-            author_dict = {
-                'id': author['id'],
-                'first_name': author['first_name'],
-                'last_name': author['last_name'],
-                'total_books': author['total_books'],
-                'avg_price': round(float(author['avg_price'] or 0), 2),
-                'max_price': float(author['max_price'] or 0),
-                'min_price': float(author['min_price'] or 0),
-                'total_pages': author['total_pages'] or 0
-            }
-            result.append(author_dict)
+        authors = self.books_statistics_queryset()
+        keyset = self.paginator is not None and self.paginator.is_keyset_mode(request)
+        if not keyset:
+            not_modified = self.check_not_modified(authors)
+            if not_modified is not None:
+                return not_modified
+        page = self.paginate_queryset(authors)
+        rows = page if page is not None else authors
+        result = [self.books_statistics_row(author) for author in rows]
 
+        if page is not None:
+            response = self.get_paginated_response(result)
+            if keyset:
+                return self.check_content_not_modified(response.data) or response
+            return response
         return Response(result)
 
+    @staticmethod
+    def books_statistics_queryset():
+        return Author.objects.values(
+            'id', 'first_name', 'last_name', 'stats__total_books', 'stats__price_sum', 'stats__max_price',
+            'stats__min_price', 'stats__total_pages'
+        ).order_by('last_name', 'first_name', 'id')
+
+    @staticmethod
+    def books_statistics_row(author):
+        total_books = author['stats__total_books'] or 0
+        price_sum = author['stats__price_sum'] or 0
+        return {
+            'id': author['id'],
+            'first_name': author['first_name'],
+            'last_name': author['last_name'],
+            'total_books': total_books,
+            'avg_price': round(float(price_sum / total_books if total_books else 0), 2),
+            'max_price': float(author['stats__max_price'] or 0),
+            'min_price': float(author['stats__min_price'] or 0),
+            'total_pages': author['stats__total_pages'] or 0
+        }
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Exporta todos los autores en streaming (NDJSON por defecto o CSV con ?format=csv).
+
+        Query params:
+        - updated_since: solo autores modificados después de esta fecha y hora
+
+        Returns:
+            StreamingHttpResponse: Autores ordenados por updated_at e id.
+        """
+        queryset = filter_updated_since(Author.objects.all(), request).order_by('updated_at', 'id')
+        rows = author_rows(queryset, self.export_chunk_size)
+        return streaming_export(rows, AUTHOR_EXPORT_FIELDS, request.accepted_renderer.format, 'authors')
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer])
+    def changes(self, request):
+        """
+        Feed de cambios de autores en streaming NDJSON (ver books_authors.changes).
+
+        Query params:
+        - since: cursor de la última línea aplicada; sin él se recorre todo el catálogo
+
+        Returns:
+            StreamingHttpResponse: Altas, modificaciones y bajas en orden, cada una con su cursor.
+        """
+        return changes_response(request, Author.objects.all(), author_rows, Tombstone.AUTHOR, self.export_chunk_size)
 
-class BookViewSet(viewsets.ModelViewSet):
+
+class BookViewSet(FastReadMixin, viewsets.ModelViewSet):
     """
     ViewSet para administrar operaciones del modelo Book a través de la API REST.
 
     Proporciona operaciones CRUD para libros e incluye:
     - Filtrado por published_date e isbn
     - Funcionalidad de búsqueda para título, isbn y género literario
-    - Queryset personalizado con prefetch_related para autores
+    - Lecturas con FastBookSerializer (.values() y una consulta agrupada de autores)
     - Acción personalizada para obtener libros con múltiples autores
+    - Conteos por género, idioma, rango de precio y década (GET /api/books/facets/)
+    - Paginación keyset opcional (?pagination=cursor) sobre title, id
+    - Caché de respuestas GET, invalidada por señales de los modelos
+    - ETag/Last-Modified y respuestas 304 calculadas sobre updated_at (books_authors.conditional)
+    - Carga masiva con upsert por ISBN (POST /api/books/bulk/)
+    - Exportación completa en streaming NDJSON/CSV (GET /api/books/export/)
+    - Feed de cambios con bajas desde un cursor (GET /api/books/changes/?since=)
 
     Parámetros de filtrado:
         published_date: Filtrar libros por fecha de publicación
@@ -112,42 +319,78 @@ class BookViewSet(viewsets.ModelViewSet):
         - título
         - isbn
         - género literario
+        - nombres de los autores y resumen (solo PostgreSQL)
+
+    En PostgreSQL ?search= usa el índice de texto completo y trigramas
+    (ver books_authors.search) y ordena por relevancia; en otros motores
+    busca con icontains sobre search_fields.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    read_serializer_class = FastBookSerializer
+    pagination_class = BookPagination
+    filter_backends = [DjangoFilterBackend, BookSearchFilter]
     filterset_fields = ["published_date", "isbn"]
-    search_fields = ['title', 'isbn', 'literary_genre']
+    search_fields = ['title', 'isbn', 'literary_genre__name']
     permission_classes = [IsAuthenticated]
+    bulk_max_items = 50000
+    export_chunk_size = 2000
+
+    def get_conditional_fields(self):
+        # Guardar o reasignar autores actualiza updated_at de sus libros (books_authors.signals),
+        # así que a los listados les basta la tabla de libros, sin unir la de autores.
+        if self.action == 'retrieve':
+            return ('updated_at', 'authors__updated_at')
+        return super().get_conditional_fields()
 
     def get_queryset(self):
-        queryset = Book.objects.all().prefetch_related('authors')
+        """
+        Queryset base compartido por el listado, el detalle y las acciones personalizadas.
+
+        Precarga los autores en una sola consulta y une el género y el idioma para
+        que la serialización no ejecute consultas por libro (las lecturas con
+        FastBookSerializer descartan ambas cosas y leen los nombres y los autores
+        por su cuenta), omite el vector
+        de búsqueda, que no se serializa, y ordena explícitamente por título e id
+        porque Meta.ordering no se aplica a las consultas con GROUP BY.
+        """
+        queryset = (Book.objects.defer('search_vector').select_related('literary_genre', 'language')
+                    .prefetch_related('authors').order_by('title', 'id'))
         literary_genre = self.request.GET.get('literary_genre')
         if literary_genre:
-            queryset = queryset.filter(literary_genre__icontains=literary_genre)
+            queryset = filter_genre(queryset, literary_genre)
         return queryset
 
+    @cached_response(BOOKS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response(BOOKS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False, methods=['get'])
+    @cached_response(BOOKS)
     def more_than_one_author(self,request):
         """
         Devuelve una lista de libros que tienen más de un autor.
 
         Este método realiza las siguientes operaciones:
-        1. Obtiene todos los libros
+        1. Obtiene los libros desde el queryset compartido (autores precargados)
         2. Anota cada libro con el número de autores que tiene
         3. Filtra para obtener solo los libros con más de un autor
-        4. Serializa los resultados
+        4. Pagina y serializa los resultados
 
         Returns:
-            Response: Lista serializada de libros que tienen múltiples autores,
+            Response: Lista paginada de libros que tienen múltiples autores,
                      incluyendo todos los campos del modelo Book.
         """
-        qs = Book.objects.all()
-        qs = qs.annotate(num_authors=Count("authors")).filter(num_authors__gt=1)
-        serializer = self.get_serializer(qs,many=True)
-        return Response(serializer.data)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.annotate(num_authors=Count("authors")).filter(num_authors__gt=1)
+        return self.paginated_response(queryset)
 
     @action(detail=False, methods=['get'])
+    @cached_response(BOOKS)
     def price_range(self, request):
         """
         Filtra libros por rango de precios.
@@ -157,21 +400,20 @@ class BookViewSet(viewsets.ModelViewSet):
         - max_price: precio máximo
 
         Returns:
-            Response: Lista de libros dentro del rango de precios especificado
+            Response: Lista paginada de libros dentro del rango de precios especificado
         """
         min_price = request.query_params.get('min_price')
         max_price = request.query_params.get('max_price')
 
-        queryset = Book.objects.all()
+        queryset = self.filter_queryset(self.get_queryset())
         if min_price:
             queryset = queryset.filter(price__gte=min_price)
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
 
     @action(detail=False, methods=['get'])
+    @cached_response(BOOKS)
     def advance_search(self, request):
         """
         Realiza una búsqueda compleja combinando múltiples criterios.
@@ -182,20 +424,179 @@ class BookViewSet(viewsets.ModelViewSet):
         - language: idioma del libro
 
         Returns:
-            Response: Lista de libros que cumplen todos los criterios
+            Response: Lista paginada de libros que cumplen todos los criterios
         """
+        return self.paginated_response(self.advance_search_queryset(request))
+
+    def advance_search_queryset(self, request):
         genre = request.query_params.get('genre')
         min_pages = request.query_params.get('min_pages')
         language = request.query_params.get('language')
 
         query = Q()
-        if genre:
-            query &= Q(literary_genre__icontains=genre)
         if min_pages:
             query &= Q(pages__gte=min_pages)
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(query)
+        if genre:
+            queryset = filter_genre(queryset, genre)
         if language:
-            query &= Q(language__iexact=language)
+            queryset = filter_language(queryset, language)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    @cached_response(BOOKS)
+    def facets(self, request):
+        """
+        Cantidad de libros por género literario, idioma, rango de precio y década
+        de publicación, con los mismos filtros que el listado.
+
+        Con filtros todas las facetas se cuentan en una sola consulta agrupada; sin
+        filtros se leen de la tabla FacetCount (ver books_authors.facets).
+
+        Returns:
+            Response: ``{'count', 'literary_genre', 'language', 'price', 'decade'}``,
+                     cada faceta como lista de ``{'value', 'count'}``.
+        """
+        counts = facet_counts(self.filter_queryset(self.get_queryset()))
+        return Response(facets_response_data(counts))
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Crea o actualiza libros en bloque, identificándolos por ISBN.
+
+        Acepta una lista JSON o NDJSON (Content-Type: application/x-ndjson) con
+        los mismos campos que la creación de un libro. Si un elemento incluye
+        ``authors_ids`` se reemplazan sus autores; si no, se conservan.
 
-        queryset = Book.objects.filter(query)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        Los elementos inválidos (datos, ISBN repetido en el lote o autores
+        inexistentes) se reportan en ``errors`` con su índice y no impiden
+        que se guarde el resto.
+
+        Returns:
+            Response: Resumen con cantidades creadas/actualizadas, el id de cada
+                     libro escrito y los errores por elemento.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Se esperaba una lista de libros.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response({'detail': f'El lote supera el máximo de {self.bulk_max_items} libros.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        valid, errors = validate_books(items)
+        written = upsert_books([data for _, data in valid])
+
+        results = []
+        for index, data in valid:
+            book_id, created = written[data['isbn']]
+            results.append({'index': index, 'id': book_id, 'isbn': data['isbn'],
+                            'status': 'created' if created else 'updated'})
+        created = sum(1 for result in results if result['status'] == 'created')
+        return Response({
+            'created': created,
+            'updated': len(results) - created,
+            'failed': len(errors),
+            'results': results,
+            'errors': errors,
+        }, status=status.HTTP_400_BAD_REQUEST if errors and not results else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Exporta el catálogo de libros en streaming (NDJSON por defecto o CSV con ?format=csv).
+
+        Acepta los mismos filtros que el listado (published_date, isbn, search,
+        literary_genre) además de:
+        - language: idioma del libro
+        - min_price / max_price: rango de precios
+        - updated_since: solo libros modificados después de esta fecha y hora
+
+        Returns:
+            StreamingHttpResponse: Libros ordenados por updated_at e id, con ``authors_ids``.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        language = request.query_params.get('language')
+        min_price = request.query_params.get('min_price')
+        max_price = request.query_params.get('max_price')
+        if language:
+            queryset = filter_language(queryset, language)
+        if min_price:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price:
+            queryset = queryset.filter(price__lte=max_price)
+        queryset = filter_updated_since(queryset, request).order_by('updated_at', 'id')
+
+        rows = book_rows(queryset, self.export_chunk_size)
+        return streaming_export(rows, BOOK_EXPORT_FIELDS, request.accepted_renderer.format, 'books')
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer])
+    def changes(self, request):
+        """
+        Feed de cambios de libros en streaming NDJSON (ver books_authors.changes).
+
+        Query params:
+        - since: cursor de la última línea aplicada; sin él se recorre todo el catálogo
+
+        Returns:
+            StreamingHttpResponse: Altas, modificaciones y bajas en orden, cada una con su cursor
+            (los libros con ``authors_ids``, como en export).
+        """
+        queryset = Book.objects.defer('search_vector')
+        return changes_response(request, queryset, book_rows, Tombstone.BOOK, self.export_chunk_size)
+
+
+class JobViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                 viewsets.GenericViewSet):
+    """
+    Trabajos en segundo plano (books_authors.jobs) que ejecuta ``manage.py run_worker``.
+
+    - POST /api/jobs/ con ``{"kind", "params"}`` encola un trabajo y responde 202
+      con su estado y la URL para consultarlo en ``Location``
+    - GET /api/jobs/ y /api/jobs/{id}/ informan estado, progreso y resultado
+      (?status= y ?kind= filtran el listado)
+    - GET /api/jobs/{id}/download/ descarga el archivo de una exportación terminada
+
+    Cada usuario ve sus trabajos; el staff ve todos.
+    """
+    queryset = Job.objects.defer('params').order_by('-created_at')
+    serializer_class = JobSerializer
+    filterset_fields = ['status', 'kind']
+    permission_classes = [IsAuthenticated]
+    download_content_types = {'ndjson': 'application/x-ndjson; charset=utf-8', 'csv': 'text/csv; charset=utf-8'}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(created_by=request.user)
+        location = reverse('job-detail', args=[job.pk], request=request)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Descarga el archivo generado por un trabajo export_books o export_authors.
+
+        Returns:
+            FileResponse: El archivo NDJSON o CSV; 409 si el trabajo todavía no terminó.
+        """
+        job = self.get_object()
+        if not job.kind.startswith('export_'):
+            raise Http404
+        if job.status != Job.SUCCEEDED:
+            return Response({'detail': 'El trabajo todavía no terminó correctamente.', 'status': job.status},
+                            status=status.HTTP_409_CONFLICT)
+        export_format = job.result['format']
+        path = result_path(job, export_format)
+        if not path.exists():
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True,
+                            filename=f"{job.kind.removeprefix('export_')}.{export_format}",
+                            content_type=self.download_content_types[export_format])
@@ -0,0 +1,130 @@
+"""
+Autenticación JWT sin consultas a la base de datos en los requests repetidos.
+
+``JWTAuthentication`` valida la firma del token (HS256, sin base de datos) y
+después busca el usuario por id en cada request. ``CachedJWTAuthentication``
+guarda el usuario resuelto (con ``is_active`` y el hash de la contraseña que
+usa ``CHECK_REVOKE_TOKEN``) en una caché en memoria del proceso, acotada por
+``JWT_USER_CACHE_SIZE`` entradas y ``JWT_USER_CACHE_TTL`` segundos.
+``CachedModelBackend`` usa la misma caché para el usuario de la sesión.
+
+La entrada de un usuario se borra al guardarlo (también al desactivarlo),
+eliminarlo o cambiar sus grupos o permisos. Las señales solo llegan al proceso
+que hizo el cambio: los demás workers, y los cambios con ``QuerySet.update()``,
+se ven como mucho ``JWT_USER_CACHE_TTL`` segundos después.
+"""
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core import metrics
+from core.ttl_cache import TTLCache
+
+user_cache = TTLCache(settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TTL)
+
+AUTH_USER_CACHE = metrics.Counter('auth_user_cache_total', 'Búsquedas del usuario autenticado en la caché.',
+                                  ('result',))
+metrics.REGISTRY.append(AUTH_USER_CACHE)
+
+
+def cached_user(user_id):
+    """
+    Copia del usuario ``user_id`` guardado en la caché, o None.
+
+    Cada request recibe su propia copia para que los atributos que se le asignen
+    (p. ej. la caché de permisos) no se compartan entre requests.
+    """
+    user = user_cache.get(str(user_id))
+    AUTH_USER_CACHE.inc(('hit' if user is not None else 'miss',))
+    return copy.copy(user) if user is not None else None
+
+
+def cache_user(user):
+    user_cache.set(str(user.pk), copy.copy(user))
+
+
+def invalidate_user(user_id):
+    user_cache.pop(str(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que resuelve el usuario desde ``user_cache`` si está."""
+
+    def get_cached_user(self, validated_token):
+        """Usuario del token si está en la caché y sigue siendo válido; None si hay que consultarlo."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return None
+        user = cached_user(user_id)
+        if user is None:
+            return None
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        # Las mismas comprobaciones que JWTAuthentication.get_user() hace tras la consulta.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+        return user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend que resuelve el usuario de la sesión desde ``user_cache``."""
+
+    def get_user(self, user_id):
+        user = cached_user(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache_user(user)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+
+def _invalidate_saved_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def _invalidate_user_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user(instance.pk)
+    elif pk_set is not None:
+        # Cambio desde el grupo o permiso: afecta a los usuarios de pk_set.
+        for user_id in pk_set:
+            invalidate_user(user_id)
+    else:
+        # clear() desde el lado inverso no informa los usuarios afectados.
+        user_cache.clear()
+
+
+def connect_signals():
+    user_model = get_user_model()
+    post_save.connect(_invalidate_saved_user, sender=user_model, dispatch_uid='auth-user-cache-save')
+    post_delete.connect(_invalidate_saved_user, sender=user_model, dispatch_uid='auth-user-cache-delete')
+    for field in ('groups', 'user_permissions'):
+        through = getattr(getattr(user_model, field, None), 'through', None)
+        if through is not None:
+            m2m_changed.connect(_invalidate_user_relations, sender=through,
+                                dispatch_uid=f'auth-user-cache-{field}')
+
+
+connect_signals()
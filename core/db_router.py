@@ -0,0 +1,139 @@
+"""
+Lecturas en réplicas de la base de datos.
+
+``DATABASE_REPLICAS`` (settings) asigna un peso a cada alias de réplica de
+``DATABASES``. ``ReplicaRoutingMiddleware`` (core.db_router_middleware) elige
+una réplica para cada request de lectura (GET/HEAD/OPTIONS) y la deja en una
+``ContextVar``; ``ReadReplicaRouter`` envía a ella las lecturas del request.
+Todo lo demás usa ``default``:
+
+- las escrituras, y las lecturas posteriores a una escritura en el mismo request;
+- las lecturas dentro de una transacción de ``default``;
+- las lecturas fuera de un request (comandos de gestión, señales de importaciones);
+- los requests de un usuario (JWT) o una sesión que escribió en los últimos
+  ``DATABASE_READ_YOUR_WRITES_SECONDS`` segundos, para que lea sus propios cambios
+  aunque la réplica tenga retraso.
+
+La réplica se elige al azar según los pesos (``DATABASE_REPLICA_POLICY='weighted'``)
+o por turnos ponderados (``'round_robin'``) y se mantiene durante todo el request.
+"""
+import random
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+_current = ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    """Réplica elegida para el request actual; ``None`` envía las lecturas a ``default``."""
+
+    __slots__ = ('alias', 'wrote')
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.wrote = False
+
+
+def current():
+    return _current.get()
+
+
+def activate(state):
+    return _current.set(state)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+class _RoundRobin:
+    """Turnos ponderados suaves (como nginx): con pesos 2 y 1 se elige a, b, a, a, b, a..."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._replicas = None
+        self._current = {}
+
+    def choose(self, replicas):
+        with self._lock:
+            if replicas != self._replicas:
+                self._replicas = dict(replicas)
+                self._current = dict.fromkeys(replicas, 0)
+            total = sum(replicas.values())
+            for alias, weight in replicas.items():
+                self._current[alias] += weight
+            alias = max(self._current, key=self._current.get)
+            self._current[alias] -= total
+            return alias
+
+
+_round_robin = _RoundRobin()
+
+
+def choose_replica():
+    """Devuelve el alias de réplica para un request de lectura, o None si no hay réplicas."""
+    replicas = {alias: weight for alias, weight in settings.DATABASE_REPLICAS.items() if weight > 0}
+    if not replicas:
+        return None
+    if settings.DATABASE_REPLICA_POLICY == 'round_robin':
+        return _round_robin.choose(replicas)
+    return random.choices(list(replicas), weights=list(replicas.values()))[0]
+
+
+def _write_key(identity):
+    return f'db-router:wrote:{identity}'
+
+
+def record_write(identity):
+    """Marca que ``identity`` (usuario o sesión) acaba de escribir."""
+    if identity and settings.DATABASE_READ_YOUR_WRITES_SECONDS:
+        cache.set(_write_key(identity), True, settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+
+
+def wrote_recently(identity):
+    return bool(identity and settings.DATABASE_READ_YOUR_WRITES_SECONDS and cache.get(_write_key(identity)))
+
+
+async def arecord_write(identity):
+    if identity and settings.DATABASE_READ_YOUR_WRITES_SECONDS:
+        await cache.aset(_write_key(identity), True, settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+
+
+async def awrote_recently(identity):
+    return bool(identity and settings.DATABASE_READ_YOUR_WRITES_SECONDS and await cache.aget(_write_key(identity)))
+
+
+class ReadReplicaRouter:
+    """Router de ``DATABASE_ROUTERS``; sin réplicas configuradas no cambia nada."""
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or state.alias is None or connections[PRIMARY].in_atomic_block:
+            return None
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            # A partir de aquí el request lee de default (ve su propia escritura).
+            state.alias = None
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación desde default.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
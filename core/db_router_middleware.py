@@ -0,0 +1,88 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core import db_router
+
+_jwt_authentication = JWTAuthentication()
+
+
+def client_identity(request):
+    """
+    Identifica al cliente para read-your-writes sin consultar la base de datos:
+    el usuario del JWT (solo se valida la firma) o, si no hay token, la sesión.
+    """
+    token = None
+    header = _jwt_authentication.get_header(request)
+    if header is not None:
+        try:
+            raw_token = _jwt_authentication.get_raw_token(header)
+            if raw_token is not None:
+                token = _jwt_authentication.get_validated_token(raw_token)
+        except AuthenticationFailed:
+            # Cabecera o token inválidos: la vista responderá 401.
+            return None
+    if token is not None:
+        user_id = token.get(jwt_settings.USER_ID_CLAIM)
+        return f'user:{user_id}' if user_id is not None else None
+    session = getattr(request, 'session', None)
+    session_key = session.session_key if session is not None else None
+    return f'session:{session_key}' if session_key else None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Elige la base de datos de lectura de cada request (core.db_router).
+
+    Los requests de lectura usan una réplica salvo que el cliente haya escrito
+    hace menos de ``DATABASE_READ_YOUR_WRITES_SECONDS``; los que escriben
+    dejan registrada la escritura para el cliente. Debe ir después de
+    SessionMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        identity = client_identity(request)
+        state = db_router.RoutingState()
+        if request.method in SAFE_METHODS and not db_router.wrote_recently(identity):
+            state.alias = db_router.choose_replica()
+        token = db_router.activate(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.deactivate(token)
+        if state.wrote:
+            db_router.record_write(identity)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        identity = client_identity(request)
+        state = db_router.RoutingState()
+        if request.method in SAFE_METHODS and not await db_router.awrote_recently(identity):
+            state.alias = db_router.choose_replica()
+        token = db_router.activate(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_router.deactivate(token)
+        if state.wrote:
+            await db_router.arecord_write(identity)
+        return response
@@ -0,0 +1,47 @@
+"""
+Endpoint de estado para balanceadores y healthchecks de contenedores.
+
+Verifica cada base de datos de ``DATABASES`` con ``SELECT 1``. La respuesta
+pública es solo el estado (``ok``/``error``, con 200 o 503); el detalle de cada
+base de datos (configuración de conexiones y, si se usa el pool de psycopg, sus
+estadísticas) se agrega con ``Authorization: Bearer <METRICS_TOKEN>``, como en
+``/metrics``. Sin METRICS_TOKEN definido no se muestra nunca.
+"""
+import time
+
+from django.db import DatabaseError, connections
+from django.http import JsonResponse
+
+from core.metrics import has_metrics_token, pool_stats
+
+
+def database_status(alias):
+    connection = connections[alias]
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        error = None
+    except DatabaseError as exc:
+        # Solo el tipo: el mensaje puede incluir el host o el usuario.
+        error = type(exc).__name__
+    return {
+        'status': 'ok' if error is None else 'error',
+        'error': error,
+        'vendor': connection.vendor,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 3),
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'conn_health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        'pool': pool_stats(alias),
+    }
+
+
+def health_view(request):
+    """Devuelve 200 si todas las bases de datos responden y 503 si alguna falla."""
+    databases = {alias: database_status(alias) for alias in connections}
+    healthy = all(status['status'] == 'ok' for status in databases.values())
+    data = {'status': 'ok' if healthy else 'error'}
+    if has_metrics_token(request):
+        data['databases'] = databases
+    return JsonResponse(data, status=200 if healthy else 503)
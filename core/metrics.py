@@ -0,0 +1,297 @@
+"""
+Métricas de requests en formato Prometheus.
+
+``RequestMetricsMiddleware`` (core.metrics_middleware) crea un ``RequestMetrics``
+por request y lo deja en una ``ContextVar``; ``track_query`` (instalado como
+wrapper de ejecución en cada conexión) y ``timed()`` acumulan en él tiempos y
+consultas. La ``ContextVar`` se copia a los hilos de ``sync_to_async``, así que
+también se cuentan las consultas del ORM asíncrono. Al terminar el
+request los valores se agregan en histogramas en memoria del proceso, que
+``metrics_view`` expone en el formato de texto de Prometheus.
+
+Los histogramas son por proceso: con varios workers de gunicorn cada scrape
+devuelve los datos del worker que atiende la petición. Si hay pools de
+conexiones de psycopg (``POSTGRES_POOL``) también se exportan sus estadísticas.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+_current = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestMetrics:
+    """Tiempos y consultas SQL acumulados durante un request."""
+
+    __slots__ = ('started', 'db_time', 'queries', 'statements', 'timings', '_lock')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.statements = set()
+        self.timings = {}
+        # Las vistas asíncronas pueden ejecutar consultas del mismo request en varios hilos.
+        self._lock = threading.Lock()
+
+    @property
+    def duplicate_queries(self):
+        """Consultas cuyo SQL (sin parámetros) ya se había ejecutado en el mismo request."""
+        return self.queries - len(self.statements)
+
+    def add_timing(self, name, seconds):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def add_query(self, sql, seconds):
+        with self._lock:
+            self.db_time += seconds
+            self.queries += 1
+            self.statements.add(sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Firma de connection.execute_wrapper().
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add_query(sql, time.perf_counter() - started)
+
+
+def current():
+    return _current.get()
+
+
+def activate(request_metrics):
+    return _current.set(request_metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def track_query(execute, sql, params, many, context):
+    """Wrapper de ejecución que cuenta la consulta en las métricas del request actual (si hay)."""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    return request_metrics(execute, sql, params, many, context)
+
+
+def install_query_tracking(connection):
+    """Agrega ``track_query`` a los wrappers de la conexión (``connections[alias]`` del hilo actual)."""
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_query)
+
+
+def on_connection_created(sender, connection, **kwargs):
+    # Receptor de connection_created: cubre las conexiones de hilos nuevos (sync_to_async).
+    install_query_tracking(connection)
+
+
+@contextmanager
+def timed(name):
+    """Suma el tiempo del bloque a ``name`` en las métricas del request actual (si hay)."""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.add_timing(name, time.perf_counter() - started)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [*zip(labelnames, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """Histograma acumulativo con etiquetas, seguro entre hilos."""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                label_text = _format_labels(self.labelnames, labels, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Contador con etiquetas, seguro entre hilos."""
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def value(self, labels):
+        return self._series.get(labels, 0)
+
+    def collect(self):
+        with self._lock:
+            snapshot = dict(self._series)
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_LABELS = ('view', 'action', 'method', 'status')
+VIEW_LABELS = ('view', 'action', 'method')
+
+REQUESTS = Counter('http_requests_total', 'Requests atendidos.', REQUEST_LABELS)
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Tiempo total del request.', REQUEST_LABELS,
+                             DURATION_BUCKETS)
+DB_DURATION = Histogram('http_request_db_duration_seconds', 'Tiempo en consultas SQL por request.', VIEW_LABELS,
+                        DURATION_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', 'Consultas SQL por request.', VIEW_LABELS, QUERY_BUCKETS)
+DUPLICATE_QUERIES = Counter('http_request_duplicate_queries_total',
+                            'Consultas SQL repetidas dentro de un mismo request.', VIEW_LABELS)
+SERIALIZER_DURATION = Histogram('http_request_serializer_duration_seconds', 'Tiempo de serialización por request.',
+                                VIEW_LABELS, DURATION_BUCKETS)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Tamaño del cuerpo de la respuesta (sin streaming).',
+                          VIEW_LABELS, SIZE_BUCKETS)
+
+REGISTRY = [REQUESTS, REQUEST_DURATION, DB_DURATION, DB_QUERIES, DUPLICATE_QUERIES, SERIALIZER_DURATION,
+            RESPONSE_SIZE]
+
+
+def record(view, action, method, status, request_metrics, duration, size=None):
+    """Agrega las métricas de un request terminado a los histogramas."""
+    labels = (view, action, method)
+    REQUESTS.inc((*labels, status))
+    REQUEST_DURATION.observe((*labels, status), duration)
+    DB_DURATION.observe(labels, request_metrics.db_time)
+    DB_QUERIES.observe(labels, request_metrics.queries)
+    if request_metrics.duplicate_queries:
+        DUPLICATE_QUERIES.inc(labels, request_metrics.duplicate_queries)
+    if 'serializer' in request_metrics.timings:
+        SERIALIZER_DURATION.observe(labels, request_metrics.timings['serializer'])
+    if size is not None:
+        RESPONSE_SIZE.observe(labels, size)
+
+
+# Estadísticas de psycopg_pool expuestas como métricas: (clave de get_stats(), nombre, tipo, descripción).
+POOL_METRICS = (
+    ('pool_size', 'db_pool_connections', 'gauge', 'Conexiones abiertas en el pool.'),
+    ('pool_available', 'db_pool_connections_available', 'gauge', 'Conexiones libres en el pool.'),
+    ('pool_max', 'db_pool_connections_max', 'gauge', 'Tamaño máximo del pool.'),
+    ('requests_waiting', 'db_pool_requests_waiting', 'gauge', 'Pedidos de conexión esperando.'),
+    ('requests_num', 'db_pool_requests_total', 'counter', 'Pedidos de conexión atendidos.'),
+    ('requests_wait_ms', 'db_pool_requests_wait_milliseconds_total', 'counter',
+     'Tiempo total de espera por una conexión.'),
+    ('requests_errors', 'db_pool_requests_errors_total', 'counter', 'Pedidos de conexión con error o timeout.'),
+    ('connections_num', 'db_pool_connects_total', 'counter', 'Conexiones abiertas por el pool.'),
+    ('connections_lost', 'db_pool_connections_lost_total', 'counter', 'Conexiones perdidas detectadas.'),
+)
+
+
+def pool_stats(alias):
+    """Estadísticas del pool de psycopg de ``alias``, o None si la conexión no usa pool."""
+    pool = getattr(connections[alias], 'pool', None)
+    return pool.get_stats() if pool is not None else None
+
+
+def collect_pool_stats():
+    stats = {alias: pool_stats(alias) for alias in connections}
+    stats = {alias: values for alias, values in stats.items() if values is not None}
+    if not stats:
+        return []
+    lines = []
+    for key, name, kind, documentation in POOL_METRICS:
+        lines += [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+        # psycopg_pool omite los contadores que todavía valen 0.
+        lines += [f'{name}{_format_labels(("alias",), (alias,))} {values.get(key, 0)}'
+                  for alias, values in sorted(stats.items())]
+    return lines
+
+
+def render_metrics():
+    lines = [line for metric in REGISTRY for line in metric.collect()]
+    return '\n'.join(lines + collect_pool_stats()) + '\n'
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.reset()
+
+
+def has_metrics_token(request):
+    """Indica si ``METRICS_TOKEN`` está definido y el request lo envía como ``Authorization: Bearer <token>``."""
+    token = settings.METRICS_TOKEN
+    return bool(token) and request.headers.get('Authorization') == f'Bearer {token}'
+
+
+def metrics_view(request):
+    """
+    Expone las métricas en el formato de texto de Prometheus.
+
+    Si ``METRICS_TOKEN`` está definido se exige ``Authorization: Bearer <token>``.
+    """
+    if settings.METRICS_TOKEN and not has_metrics_token(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,90 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from core import metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide cada request: tiempo total, tiempo y cantidad de consultas SQL (y
+    cuántas se repiten), tiempo de serialización y tamaño de la respuesta.
+
+    Los valores se agregan por vista y acción de viewset en core.metrics y se
+    informan en la cabecera ``Server-Timing``. Las respuestas en streaming solo
+    miden hasta que se envían las cabeceras. Funciona tanto bajo WSGI como
+    en una cadena asíncrona (ASGI).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        connection_created.connect(metrics.on_connection_created, dispatch_uid='request_metrics')
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled(request):
+            return self.get_response(request)
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.activate(request_metrics)
+        try:
+            # Conexiones abiertas antes de conectar la señal (p. ej. en las pruebas).
+            for alias in connections:
+                metrics.install_query_tracking(connections[alias])
+            response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self.finish(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        if not self.enabled(request):
+            return await self.get_response(request)
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.activate(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self.finish(request, response, request_metrics)
+
+    @staticmethod
+    def enabled(request):
+        return settings.METRICS_ENABLED and request.path != settings.METRICS_PATH
+
+    def finish(self, request, response, request_metrics):
+        duration = time.perf_counter() - request_metrics.started
+        view, action = self.view_labels(request)
+        size = None if response.streaming else len(response.content)
+        metrics.record(view, action, request.method, str(response.status_code), request_metrics, duration, size)
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = self.server_timing(request_metrics, duration)
+        return response
+
+    @staticmethod
+    def view_labels(request):
+        """(nombre de la ruta, acción del viewset); las rutas no resueltas se agrupan para acotar las series."""
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched', ''
+        actions = getattr(match.func, 'actions', None) or {}
+        return match.view_name or match.route, actions.get(request.method.lower(), '')
+
+    @staticmethod
+    def server_timing(request_metrics, duration):
+        entries = [f'db;dur={request_metrics.db_time * 1000:.2f};desc="{request_metrics.queries} queries"']
+        if request_metrics.duplicate_queries:
+            entries.append(f'dup;desc="{request_metrics.duplicate_queries} duplicate queries"')
+        for name, seconds in request_metrics.timings.items():
+            entries.append(f'{name};dur={seconds * 1000:.2f}')
+        entries.append(f'total;dur={duration * 1000:.2f}')
+        return ', '.join(entries)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from datetime import timedelta
+from decimal import Decimal
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text and trigram search
     'drf_yasg',
     'rest_framework',
     'django_filters',  # For filtering in DRF
@@ -45,9 +47,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics_middleware.RequestMetricsMiddleware',  # Per-request SQL/timing metrics (core.metrics)
     'django.middleware.security.SecurityMiddleware',
     'core.jwt_logging_middleware.JWTAuthLoggingMiddleware',  # Log JWT login attempts
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.db_router_middleware.ReplicaRoutingMiddleware',  # Read replicas (core.db_router)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -85,9 +89,119 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'books'),
         'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        # Conexiones persistentes: segundos que se reutiliza una conexión (0 = una por request,
+        # "None" = sin límite). CONN_HEALTH_CHECKS verifica la conexión antes de reutilizarla.
+        'CONN_MAX_AGE': None if os.getenv('POSTGRES_CONN_MAX_AGE') == 'None' else int(
+            os.getenv('POSTGRES_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': os.getenv('POSTGRES_CONN_HEALTH_CHECKS', 'False') == 'True',
+        'OPTIONS': {},
     }
 }
 
+# Pool de conexiones de psycopg 3 (paquete psycopg-pool) compartido por los hilos de cada proceso.
+# Reemplaza a las conexiones persistentes: con POSTGRES_POOL=True, CONN_MAX_AGE debe ser 0.
+if os.getenv('POSTGRES_POOL', 'False') == 'True':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.getenv('POSTGRES_POOL_MAX_IDLE', '600')),
+    }
+
+# Réplicas de lectura (core.db_router): POSTGRES_REPLICAS=host[:puerto][=peso],... con la misma
+# base, usuario y contraseña que default. Cada una queda como alias replica_1, replica_2, ...
+# Las lecturas de los requests GET van a una réplica elegida por peso (weighted) o por turnos
+# (round_robin); las escrituras y las lecturas de quien escribió hace menos de
+# DATABASE_READ_YOUR_WRITES_SECONDS van a default.
+DATABASE_REPLICAS = {}
+for _index, _replica in enumerate(filter(None, os.getenv('POSTGRES_REPLICAS', '').split(',')), start=1):
+    _address, _, _weight = _replica.strip().partition('=')
+    _host, _, _port = _address.partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS[f'replica_{_index}'] = int(_weight or 1)
+DATABASE_REPLICA_POLICY = os.getenv('POSTGRES_REPLICA_POLICY', 'weighted')
+DATABASE_READ_YOUR_WRITES_SECONDS = int(os.getenv('DATABASE_READ_YOUR_WRITES_SECONDS', '5'))
+DATABASE_ROUTERS = ['core.db_router.ReadReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Con varios workers de gunicorn usar un backend compartido, por ejemplo:
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache CACHE_LOCATION=/app/cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'gestor-libros'),
+    }
+}
+
+# Caché de respuestas de la API (books_authors.cache); 0 lo desactiva
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', 'default')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', '300'))
+
+# Límites superiores de los rangos de precio de las facetas (books_authors.facets); al cambiarlos
+# hay que ejecutar rebuild_facet_counts.
+BOOK_FACET_PRICE_BANDS = [Decimal(bound) for bound in os.getenv('BOOK_FACET_PRICE_BANDS', '10,20,50,100').split(',')]
+
+# Feed de cambios (books_authors.changes): antigüedad mínima de los cambios informados, para no
+# adelantar el cursor sobre transacciones todavía abiertas, y días que se conservan las bajas.
+CHANGES_FEED_LAG_SECONDS = int(os.getenv('CHANGES_FEED_LAG_SECONDS', '5'))
+CHANGES_TOMBSTONE_RETENTION_DAYS = int(os.getenv('CHANGES_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Trabajos en segundo plano (books_authors.jobs, manage.py run_worker): procesos por worker, segundos
+# de espera con la cola vacía, cada cuántos segundos el worker renueva la señal de su trabajo y tras
+# cuántos sin señal otro worker lo retoma, intentos por trabajo, máximo de registros por importación
+# y carpeta de los archivos exportados (compartida entre web y worker).
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', '1'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', '10'))
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '60'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_IMPORT_MAX_ITEMS = int(os.getenv('JOB_IMPORT_MAX_ITEMS', '50000'))
+JOB_RESULTS_DIR = Path(os.getenv('JOB_RESULTS_DIR', BASE_DIR / 'job_results'))
+
+# ETag/Last-Modified y respuestas 304 en las lecturas de libros y autores (books_authors.conditional)
+API_CONDITIONAL_REQUESTS = os.getenv('API_CONDITIONAL_REQUESTS', 'True') == 'True'
+
+# Sesiones leídas de la caché y guardadas también en la base de datos
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# Usuario autenticado (JWT y sesión) cacheado en memoria de cada proceso (core.authentication):
+# máximo de usuarios y segundos que puede tardar un worker en ver un cambio hecho en otro; 0 lo desactiva.
+AUTHENTICATION_BACKENDS = ['core.authentication.CachedModelBackend']
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '1024'))
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', '60'))
+
+# Ids de autores existentes cacheados en memoria de cada proceso al validar authors_ids de un libro
+# (books_authors.serializers.AuthorIdsField): máximo de ids y segundos que puede tardar un worker en ver
+# que otro eliminó un autor; 0 lo desactiva.
+AUTHOR_ID_CACHE_SIZE = int(os.getenv('AUTHOR_ID_CACHE_SIZE', '10000'))
+AUTHOR_ID_CACHE_TTL = int(os.getenv('AUTHOR_ID_CACHE_TTL', '60'))
+
+# Métricas por request (core.metrics): cabecera Server-Timing y endpoint Prometheus.
+# Con METRICS_TOKEN definido el endpoint exige "Authorization: Bearer <token>", que también muestra el
+# detalle de las bases de datos en /health/.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'True') == 'True'
+METRICS_PATH = os.getenv('METRICS_PATH', '/metrics')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Vistas asíncronas (/api/async/, books_authors.async_views): ejecutar en paralelo, cada una
+# con su propia conexión, las consultas independientes de un request (COUNT(*) y página).
+# Sin pool (POSTGRES_POOL) ni conexiones persistentes cada consulta paralela abre una conexión
+# nueva, lo que solo compensa cuando el COUNT(*) es lento (ver python manage.py load_test).
+ASYNC_PARALLEL_QUERIES = os.getenv('ASYNC_PARALLEL_QUERIES', 'False') == 'True'
+
+# Configuración de texto completo de PostgreSQL para la búsqueda de libros
+# (tras cambiarla ejecutar: python manage.py rebuild_search_vectors)
+BOOK_SEARCH_CONFIG = os.getenv('BOOK_SEARCH_CONFIG', 'spanish')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -132,18 +246,23 @@ SWAGGER_USE_COMPAT_RENDERERS = False
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # Enable DRF login form
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # orjson si está instalado; si no, el JSONRenderer de DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'books_authors.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
 }
 
-MIDDLEWARE.insert(0, "whitenoise.middleware.WhiteNoiseMiddleware")
+MIDDLEWARE.insert(0, "core.whitenoise_middleware.AsyncWhiteNoiseMiddleware")  # WhiteNoise, also async-capable under ASGI
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from drf_yasg import openapi
@@ -24,6 +25,9 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
+from core.health import health_view
+from core.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Books Authors API",
@@ -44,4 +48,6 @@ urlpatterns = [
     path('api/', include('books_authors.urls')),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path(settings.METRICS_PATH.lstrip('/'), metrics_view, name='metrics'),
+    path('health/', health_view, name='health'),
 ]